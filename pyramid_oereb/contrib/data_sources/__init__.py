@@ -5,8 +5,21 @@ useful in general.
 from functools import cmp_to_key
 import logging
 
+from pyramid.config import ConfigurationError
+from pyramid.httpexceptions import HTTPInternalServerError
+from sqlalchemy import LargeBinary, and_, bindparam, case, func, or_, orm
+
 log = logging.getLogger(__name__)
 
+LOADER_STRATEGIES = {
+    'joined': 'joinedload',
+    'selectin': 'selectinload',
+    'subquery': 'subqueryload',
+    'lazy': 'lazyload'
+}
+
+CLIP_GEOMETRIES = ('real_estate', 'bbox')
+
 
 def plr_sort_within_themes_by_type_code(extract):
     """
@@ -51,3 +64,250 @@ def plr_sort_within_themes_by_type_code(extract):
                       format(public_law_restriction.theme.code, public_law_restriction.type_code))
 
     return extract
+
+
+def get_loader_options(model, loader_strategies):
+    """
+    Creates the SQLAlchemy loader options which load the related objects of the queried model with a fixed
+    number of statements instead of one statement per accessed relationship.
+
+    Args:
+        model (sqlalchemy.ext.declarative.DeclarativeMeta): The queried model.
+        loader_strategies (dict): The loader strategy by relationship path. The path is a dot separated
+            list of relationship names starting at the model, e.g. `public_law_restriction.legend_entry`.
+            The strategy is one of `joined`, `selectin`, `subquery` or `lazy`.
+
+    Returns:
+        list of sqlalchemy.orm.Load: The options to pass to the query.
+
+    Raises:
+        ConfigurationError: If a strategy is unknown.
+    """
+    # Backref attributes are only available on the models after the mappers have been configured.
+    orm.configure_mappers()
+    options = list()
+    for path, strategy in loader_strategies.items():
+        if strategy not in LOADER_STRATEGIES:
+            raise ConfigurationError('Unknown loader strategy "{0}" for {1}. Use one of: {2}'.format(
+                strategy,
+                path,
+                ', '.join(LOADER_STRATEGIES.keys())
+            ))
+        names = path.split('.')
+        option = None
+        current_model = model
+        for index, name in enumerate(names):
+            attribute = getattr(current_model, name, None)
+            related_mapper = getattr(getattr(attribute, 'property', None), 'mapper', None)
+            if related_mapper is None:
+                log.warning('The model {0} has no relationship {1}. Loader strategy for {2} ignored.'.format(
+                    current_model.__name__,
+                    name,
+                    path
+                ))
+                option = None
+                break
+            loader = LOADER_STRATEGIES[strategy] if index == len(names) - 1 else 'defaultload'
+            option = getattr(orm if option is None else option, loader)(attribute)
+            current_model = related_mapper.class_
+        if option is not None:
+            options.append(option)
+    return options
+
+
+def bind_geometry(geometry, srid):
+    """
+    Binds the geometry as WKB parameter. The returned expression can be used several times in a statement,
+    the geometry is passed only once with the statement and the SQL text does not depend on it.
+
+    Args:
+        geometry (shapely.geometry.base.BaseGeometry): The geometry to bind.
+        srid (int): The SRID of the geometry.
+
+    Returns:
+        sqlalchemy.sql.functions.Function: The expression creating the geometry in the database.
+    """
+    return func.ST_GeomFromWKB(bindparam('geometry', geometry.wkb, type_=LargeBinary, unique=True), srid)
+
+
+def get_published_filter(model, as_of_date):
+    """
+    Creates the filter which limits the queried model to the objects published at the passed date. It
+    replaces the check of the `published` property of the records, so unpublished objects are not loaded
+    at all.
+
+    Args:
+        model (sqlalchemy.ext.declarative.DeclarativeMeta): The model providing the `published_from` and
+            `published_until` columns.
+        as_of_date (datetime.date): The date the objects have to be published at.
+
+    Returns:
+        sqlalchemy.sql.elements.BooleanClauseList: The filter.
+    """
+    return and_(
+        model.published_from <= as_of_date,
+        or_(model.published_until.is_(None), model.published_until >= as_of_date)
+    )
+
+
+class ReadLimits(object):
+    """
+    Keeps track of the public law restrictions and the geometry data a source reads for one extract and
+    stops the reading as soon as one of the configured limits is exceeded. A source streaming its results
+    this way never holds more than the limits in memory, even for very large real estates.
+
+    Args:
+        code (str): The code of the theme read by the source.
+        max_records (int or None): The maximum number of public law restrictions. No limit if None.
+        max_geometry_size (int or None): The maximum size in bytes of the geometries loaded from the
+            database, measured on their WKB. No limit if None.
+    """
+
+    def __init__(self, code, max_records=None, max_geometry_size=None):
+        self._code_ = code
+        self._max_records_ = max_records
+        self._max_geometry_size_ = max_geometry_size
+        self.records = 0
+        self.geometry_size = 0
+
+    def add_records(self, count):
+        """
+        Counts public law restrictions to read.
+
+        Args:
+            count (int): The number of public law restrictions.
+
+        Raises:
+            HTTPInternalServerError: If the maximum number of public law restrictions is exceeded.
+        """
+        self.records += count
+        if self._max_records_ is not None and self.records > self._max_records_:
+            self.exceeded_('more than {0} public law restrictions'.format(self._max_records_))
+
+    def add_geometry(self, geometry):
+        """
+        Counts the size of a loaded geometry.
+
+        Args:
+            geometry (geoalchemy2.elements.WKBElement or None): The loaded geometry.
+
+        Raises:
+            HTTPInternalServerError: If the maximum size of the geometries is exceeded.
+        """
+        if geometry is None:
+            return
+        self.geometry_size += len(geometry.data)
+        if self._max_geometry_size_ is not None and self.geometry_size > self._max_geometry_size_:
+            self.exceeded_('more than {0} bytes of geometries'.format(self._max_geometry_size_))
+
+    def exceeded_(self, reason):
+        message = 'Reading of theme {0} stopped: {1}'.format(self._code_, reason)
+        log.error(message)
+        raise HTTPInternalServerError(message)
+
+
+def collect_geometry_shares(session, geometry_id, public_law_restriction_id, geometry, spatial_filter,
+                            real_estate, srid, clip=None, bbox=None):
+    """
+    Calculates the shares of the geometries on the real estate in the database. Multi geometries and
+    geometry collections are dumped to their parts, because the tolerance check is applied to each part on
+    its own. Only the parts which intersect the real estate are returned and no geometry leaves the
+    database.
+
+    Args:
+        session (sqlalchemy.orm.Session): The requested clean session instance ready for use
+        geometry_id (sqlalchemy.orm.attributes.InstrumentedAttribute): The id column of the geometries.
+        public_law_restriction_id (sqlalchemy.orm.attributes.InstrumentedAttribute): The column of the
+            geometries referencing their public law restriction.
+        geometry (sqlalchemy.sql.elements.ColumnElement): The geometry of the geometries.
+        spatial_filter (sqlalchemy.sql.elements.ClauseElement): The filter for the geometries which have
+            spatial relation with the real estate.
+        real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real
+            estate in its record representation.
+        srid (int): The SRID of the geometries.
+        clip (str or None): If set, the parts clipped to the `real_estate` or to the `bbox` are returned
+            too. Possible values are `real_estate` and `bbox`.
+        bbox (shapely.geometry.base.BaseGeometry or None): The bbox of the visible extent. It is required
+            to clip to the bbox.
+
+    Returns:
+        list of tuple: The geometry id, the public law restriction id, the index of the part (starting at
+        1 in the order of the parts of the geometry), the dimension of the part and its share on the real
+        estate. The share is the number of points, the length or the area depending on the dimension. If
+        `clip` is set, the clipped part is appended as WKB element.
+    """
+    limit = bind_geometry(real_estate.limit, srid)
+    parts = session.query(
+        geometry_id.label('geometry_id'),
+        public_law_restriction_id.label('public_law_restriction_id'),
+        func.ST_Dump(geometry).label('part')
+    ).filter(spatial_filter).subquery()
+    part_geometry = parts.c.part.geom
+    path = parts.c.part.path
+    dimension = func.ST_Dimension(part_geometry)
+    intersection = func.ST_Intersection(part_geometry, limit)
+    share = case(
+        [
+            (dimension == 0, func.ST_NPoints(func.ST_CollectionExtract(intersection, 1))),
+            (dimension == 1, func.ST_Length(func.ST_CollectionExtract(intersection, 2)))
+        ],
+        else_=func.ST_Area(func.ST_CollectionExtract(intersection, 3))
+    )
+    columns = [
+        parts.c.geometry_id,
+        parts.c.public_law_restriction_id,
+        func.coalesce(path[func.array_length(path, 1)], 1),
+        dimension,
+        share
+    ]
+    if clip is not None:
+        if clip == 'bbox':
+            min_x, min_y, max_x, max_y = bbox.bounds
+            clipped = func.ST_ClipByBox2D(
+                part_geometry,
+                func.ST_MakeEnvelope(min_x, min_y, max_x, max_y, srid)
+            )
+        else:
+            clipped = intersection
+        # Keep only the parts of the same dimension, e.g. no lines where a polygon touches the real estate.
+        columns.append(func.ST_CollectionExtract(clipped, dimension + 1))
+    return session.query(*columns).filter(
+        func.ST_Intersects(part_geometry, limit)
+    ).all()
+
+
+def filter_geometry_shares(geometry_shares, real_estate, thresholds):
+    """
+    Applies the thresholds of the theme to the shares calculated by :func:`collect_geometry_shares` the
+    same way :meth:`pyramid_oereb.core.records.geometry.GeometryRecord.calculate` does.
+
+    Args:
+        geometry_shares (list of tuple): The shares calculated by :func:`collect_geometry_shares`.
+        real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real
+            estate in its record representation.
+        thresholds (dict): The thresholds of the theme.
+
+    Returns:
+        dict: The shares of the parts which pass the tolerance check as keyword arguments for
+        :meth:`pyramid_oereb.core.records.geometry.GeometryRecord.set_shares` by the tuple of the
+        geometry id and the part index.
+    """
+    min_length = thresholds.get('length').get('limit')
+    min_area = thresholds.get('area').get('limit')
+    passed = dict()
+    for geometry_id, _, part, dimension, share in [row[:5] for row in geometry_shares]:
+        if not share:
+            continue
+        if dimension == 0:
+            passed[(geometry_id, part)] = {'nr_of_points': int(share)}
+        elif dimension == 1 and share >= min_length:
+            passed[(geometry_id, part)] = {
+                'length_share': share,
+                'units': thresholds.get('length').get('unit')
+            }
+        elif dimension == 2 and share / real_estate.areas_ratio >= min_area:
+            passed[(geometry_id, part)] = {
+                'area_share': share / real_estate.areas_ratio,
+                'units': thresholds.get('area').get('unit')
+            }
+    return passed
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import optparse
+import logging
+
+from pyramid.path import DottedNameResolver
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+
+from pyramid_oereb.core.config import Config
+from pyramid_oereb.contrib.data_sources.interlis_2_3.models.flat import create_flat_view_sql, \
+    refresh_flat_view_sql
+from pyramid_oereb.contrib.data_sources.interlis_2_3.sources.plr import StandardThemeConfigParser
+from pyramid_oereb.contrib.data_sources.interlis_2_3.sources.plr_flat import FlatDatabaseSource
+
+logging.basicConfig()
+log = logging.getLogger(__name__)
+
+
+def create_flat_views_from_configuration(configuration_yaml_path, section='pyramid_oereb',
+                                         c2ctemplate_style=False, refresh=False, sql_file=None):
+    """
+    Creates or refreshes the flat views of all themes of the passed yaml file which are read by the flat
+    Interlis source. Themes sharing a schema share its view.
+
+    Args:
+        configuration_yaml_path (str): The absolute path to the yaml file which contains the plr
+            definitions.
+        section (str): The section in yaml file where the plrs are configured in. Default is 'pyramid_oereb'.
+        c2ctemplate_style (bool): True if the yaml use a c2c template style (vars.[section]).
+            Default is False.
+        refresh (bool): True to refresh the existing views after an import instead of creating them.
+            Default is False.
+        sql_file (file): the file to generate. Default is None (in the database).
+    """
+    if Config.get_config() is None:
+        Config.init(configuration_yaml_path, section, c2ctemplate_style)
+
+    handled_schemas = set()
+    for theme_config in Config.get('plrs'):
+        source_class = DottedNameResolver().maybe_resolve(theme_config.get('source').get('class'))
+        if not issubclass(source_class, FlatDatabaseSource):
+            continue
+        config_parser = StandardThemeConfigParser(**theme_config)
+        key = (config_parser.db_connection, config_parser.schema_name)
+        if key in handled_schemas:
+            continue
+        handled_schemas.add(key)
+        models = config_parser.get_models()
+        if refresh:
+            sqls = [refresh_flat_view_sql(models)]
+        else:
+            sqls = create_flat_view_sql(models, postgresql.dialect())
+        if sql_file is None:
+            engine = create_engine(config_parser.db_connection)
+            with engine.begin() as connection:
+                for sql in sqls:
+                    connection.execute(text(sql))
+            log.info('Flat view of schema {0} {1}'.format(
+                config_parser.schema_name,
+                'refreshed' if refresh else 'created'
+            ))
+        else:
+            sql_file.write('\n'.join(sqls) + '\n')
+
+
+def create_interlis_flat_views():
+    parser = optparse.OptionParser(
+        usage='usage: %prog [options]',
+        description='Create or refresh the flat views read by the flat Interlis source'
+    )
+    parser.add_option(
+        '-c', '--configuration',
+        dest='configuration',
+        metavar='YAML',
+        type='string',
+        help='The absolute path to the configuration yaml file.'
+    )
+    parser.add_option(
+        '-s', '--section',
+        dest='section',
+        metavar='SECTION',
+        type='string',
+        default='pyramid_oereb',
+        help='The section which contains configuration (default is: pyramid_oereb).'
+    )
+    parser.add_option(
+        '--refresh',
+        dest='refresh',
+        action='store_true',
+        default=False,
+        help='Refresh the existing views, to be run after every import of the Interlis schemas.'
+    )
+    parser.add_option(
+        '--sql-file',
+        type='string',
+        help='Generate an SQL file.'
+    )
+    parser.add_option(
+        '--c2ctemplate-style',
+        dest='c2ctemplate_style',
+        action='store_true',
+        default=False,
+        help='Is the yaml file using a c2ctemplate style (starting with vars)'
+    )
+    options, args = parser.parse_args()
+    if not options.configuration:
+        parser.error('No configuration file set.')
+
+    if options.sql_file is None:
+        create_flat_views_from_configuration(
+            configuration_yaml_path=options.configuration,
+            section=options.section,
+            c2ctemplate_style=options.c2ctemplate_style,
+            refresh=options.refresh
+        )
+    else:
+        with open(options.sql_file, 'w') as sql_file:
+            create_flat_views_from_configuration(
+                configuration_yaml_path=options.configuration,
+                section=options.section,
+                c2ctemplate_style=options.c2ctemplate_style,
+                refresh=options.refresh,
+                sql_file=sql_file
+            )
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+import optparse
+import logging
+
+from pyramid.path import DottedNameResolver
+from sqlalchemy import create_engine, text
+
+from pyramid_oereb.core.config import Config
+from pyramid_oereb.contrib.data_sources.interlis_2_3.sources.plr import DatabaseSource, \
+    StandardThemeConfigParser
+
+logging.basicConfig()
+log = logging.getLogger(__name__)
+
+
+def create_index_sql(table, column_name, method='btree'):
+    """
+    Args:
+        table (sqlalchemy.schema.Table): The table to index.
+        column_name (str): The name of the indexed column.
+        method (str): The index method. Default is 'btree'.
+    Returns:
+        a string with the sql statement used to create the index
+    """
+    return 'CREATE INDEX IF NOT EXISTS {name} ON {table} USING {method} ({column});'.format(
+        name='{0}_{1}_oereb_idx'.format(table.name, column_name),
+        table=table.fullname,
+        method=method,
+        column=column_name
+    )
+
+
+def create_indexes_sql(models):
+    """
+    Returns the indexes used by the queries of the Interlis source. These are the spatial indexes of the
+    three geometry columns, which the spatial filter uses one by one, and the indexes of the foreign keys
+    used to load the related objects of the public law restrictions. Schemas created by ili2pg with
+    --createGeomIdx and --createFkIdx already contain equivalent indexes.
+
+    Args:
+        models (pyramid_oereb.contrib.data_sources.interlis_2_3.models.theme.Models): The models of the
+            Interlis schema.
+    Returns:
+        list of str: The sql statements used to create the indexes
+    """
+    geometry_table = models.Geometry.__table__
+    public_law_restriction_table = models.PublicLawRestriction.__table__
+    public_law_restriction_document_table = models.PublicLawRestrictionDocument.__table__
+    return [
+        create_index_sql(geometry_table, models.Geometry.point.name, method='gist'),
+        create_index_sql(geometry_table, models.Geometry.line.name, method='gist'),
+        create_index_sql(geometry_table, models.Geometry.surface.name, method='gist'),
+        create_index_sql(geometry_table, models.Geometry.public_law_restriction_id.name),
+        create_index_sql(public_law_restriction_table, models.PublicLawRestriction.legend_entry_id.name),
+        create_index_sql(
+            public_law_restriction_document_table,
+            models.PublicLawRestrictionDocument.public_law_restriction_id.name
+        ),
+        create_index_sql(
+            public_law_restriction_document_table,
+            models.PublicLawRestrictionDocument.document_id.name
+        )
+    ]
+
+
+def create_indexes_from_configuration(configuration_yaml_path, section='pyramid_oereb',
+                                      c2ctemplate_style=False, sql_file=None):
+    """
+    Creates the indexes for all themes of the passed yaml file which are read by the Interlis source. Themes
+    sharing a schema are indexed once.
+
+    Args:
+        configuration_yaml_path (str): The absolute path to the yaml file which contains the plr
+            definitions.
+        section (str): The section in yaml file where the plrs are configured in. Default is 'pyramid_oereb'.
+        c2ctemplate_style (bool): True if the yaml use a c2c template style (vars.[section]).
+            Default is False.
+        sql_file (file): the file to generate. Default is None (in the database).
+    """
+    if Config.get_config() is None:
+        Config.init(configuration_yaml_path, section, c2ctemplate_style)
+
+    indexed_schemas = set()
+    for theme_config in Config.get('plrs'):
+        source_class = DottedNameResolver().maybe_resolve(theme_config.get('source').get('class'))
+        if not issubclass(source_class, DatabaseSource):
+            continue
+        config_parser = StandardThemeConfigParser(**theme_config)
+        key = (config_parser.db_connection, config_parser.schema_name)
+        if key in indexed_schemas:
+            continue
+        indexed_schemas.add(key)
+        sqls = create_indexes_sql(config_parser.get_models())
+        if sql_file is None:
+            engine = create_engine(config_parser.db_connection)
+            with engine.begin() as connection:
+                for sql in sqls:
+                    connection.execute(text(sql))
+            log.info('Indexes of schema {0} created'.format(config_parser.schema_name))
+        else:
+            sql_file.write('\n'.join(sqls) + '\n')
+
+
+def create_interlis_indexes():
+    parser = optparse.OptionParser(
+        usage='usage: %prog [options]',
+        description='Create the indexes used by the Interlis source in the Interlis schemas'
+    )
+    parser.add_option(
+        '-c', '--configuration',
+        dest='configuration',
+        metavar='YAML',
+        type='string',
+        help='The absolute path to the configuration yaml file.'
+    )
+    parser.add_option(
+        '-s', '--section',
+        dest='section',
+        metavar='SECTION',
+        type='string',
+        default='pyramid_oereb',
+        help='The section which contains configuration (default is: pyramid_oereb).'
+    )
+    parser.add_option(
+        '--sql-file',
+        type='string',
+        help='Generate an SQL file.'
+    )
+    parser.add_option(
+        '--c2ctemplate-style',
+        dest='c2ctemplate_style',
+        action='store_true',
+        default=False,
+        help='Is the yaml file using a c2ctemplate style (starting with vars)'
+    )
+    options, args = parser.parse_args()
+    if not options.configuration:
+        parser.error('No configuration file set.')
+
+    if options.sql_file is None:
+        create_indexes_from_configuration(
+            configuration_yaml_path=options.configuration,
+            section=options.section,
+            c2ctemplate_style=options.c2ctemplate_style
+        )
+    else:
+        with open(options.sql_file, 'w') as sql_file:
+            create_indexes_from_configuration(
+                configuration_yaml_path=options.configuration,
+                section=options.section,
+                c2ctemplate_style=options.c2ctemplate_style,
+                sql_file=sql_file
+            )
@@ -1,4 +1,8 @@
 # -*- coding: utf-8 -*-
+from sqlalchemy import inspect
+
+LANGUAGES = ['de', 'fr', 'it', 'rm', 'en']
+
 
 def from_multilingual_text_to_dict(de=None, fr=None, it=None, rm=None, en=None):
     if de is None and fr is None and it is None and rm is None and en is None:
@@ -18,6 +22,37 @@ def from_multilingual_text_to_dict(de=None, fr=None, it=None, rm=None, en=None):
         return dict_var
 
 
+def from_multilingual_attributes_to_dict(obj, name):
+    """
+    Returns the texts of the language attributes `<name>_<language>` of a model instance. Attributes not
+    loaded, because the columns of other languages are deferred, are skipped without loading them.
+
+    obj (sqlalchemy.ext.declarative.DeclarativeMeta): The model instance.
+    name (str): The name of the multilingual text, e.g. `title`.
+    """
+    unloaded = inspect(obj).unloaded
+    return from_multilingual_text_to_dict(**dict([
+        (language, getattr(obj, '{0}_{1}'.format(name, language)))
+        for language in LANGUAGES
+        if '{0}_{1}'.format(name, language) not in unloaded
+    ]))
+
+
+def get_other_language_attributes(model, languages):
+    """
+    Returns the attributes of the model holding a multilingual text in another than the passed languages.
+
+    model (sqlalchemy.ext.declarative.DeclarativeMeta): The model.
+    languages (list of str): The languages to keep.
+    """
+    attributes = []
+    for column_property in inspect(model).column_attrs:
+        name, _, language = column_property.key.rpartition('_')
+        if name and language in LANGUAGES and language not in languages:
+            attributes.append(getattr(model, column_property.key))
+    return attributes
+
+
 def from_multilingual_uri_to_dict(obj):
     """
     obj (pyramid_oereb.contrib.models.models.MultilingualUri)
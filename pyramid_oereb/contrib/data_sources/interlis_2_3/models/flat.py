@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+The flat view of the public law restrictions of an Interlis schema. It is a materialized view with one row
+per geometry carrying everything needed to create the record of its public law restriction: the columns of
+the geometry and of the public law restriction, the URIs of the view service and the responsible office
+and the documents as JSON. It replaces the joins of all the related tables by a single statement, but has
+to be refreshed after every import of the schema.
+"""
+from itertools import chain
+
+from sqlalchemy import column, func, literal, select, table, type_coerce
+from sqlalchemy.orm import aliased
+from sqlalchemy.types import JSON, NullType
+
+from pyramid_oereb.contrib.data_sources.interlis_2_3.interlis_2_3_utils import LANGUAGES
+
+FLAT_VIEW_NAME = 'flat_public_law_restriction'
+
+
+def get_geometry_columns(models):
+    return [
+        ('point', models.Geometry.point),
+        ('line', models.Geometry.line),
+        ('surface', models.Geometry.surface)
+    ]
+
+
+def multilingual_text_(entity, name):
+    return func.json_strip_nulls(func.json_build_object(*chain(*[
+        (literal(language), getattr(entity, '{0}_{1}'.format(name, language)))
+        for language in LANGUAGES
+    ]), type_=JSON), type_=JSON)
+
+
+def multilingual_uri_(models, foreign_key, owner_id):
+    return select(
+        func.json_object_agg(models.LocalisedUri.language, models.LocalisedUri.text, type_=JSON)
+    ).select_from(
+        models.MultilingualUri.__table__.join(
+            models.LocalisedUri.__table__,
+            models.LocalisedUri.multilingualuri_id == models.MultilingualUri.t_id
+        )
+    ).where(
+        foreign_key == owner_id,
+        models.LocalisedUri.language.isnot(None)
+    ).scalar_subquery()
+
+
+def office_(models, office_id):
+    office = aliased(models.Office)
+    return select(func.json_build_object(
+        literal('name'), multilingual_text_(office, 'name'),
+        literal('uid'), office.uid,
+        literal('uri'), multilingual_uri_(models, models.MultilingualUri.office_id, office.t_id),
+        literal('line1'), office.line1,
+        literal('line2'), office.line2,
+        literal('street'), office.street,
+        literal('number'), office.number,
+        literal('postal_code'), office.postal_code,
+        literal('city'), office.city,
+        type_=JSON
+    )).where(office.t_id == office_id).scalar_subquery()
+
+
+def documents_(models, public_law_restriction_id):
+    document = models.Document
+    legal_provision = models.PublicLawRestrictionDocument
+    return select(func.json_agg(func.json_build_object(
+        literal('document_type'), document.document_type,
+        literal('index'), document.index,
+        literal('law_status'), document.law_status,
+        literal('title'), multilingual_text_(document, 'title'),
+        literal('abbreviation'), multilingual_text_(document, 'abbreviation'),
+        literal('official_number'), multilingual_text_(document, 'official_number'),
+        literal('only_in_municipality'), document.only_in_municipality,
+        literal('published_from'), document.published_from,
+        literal('published_until'), document.published_until,
+        literal('text_at_web'), multilingual_uri_(models, models.MultilingualUri.document_id, document.t_id),
+        literal('responsible_office'), office_(models, document.office_id)
+    ), type_=JSON)).select_from(
+        legal_provision.__table__.join(document.__table__, legal_provision.document_id == document.t_id)
+    ).where(
+        legal_provision.public_law_restriction_id == public_law_restriction_id
+    ).scalar_subquery()
+
+
+def get_flat_select(models):
+    """
+    Returns the statement selecting the rows of the flat view.
+
+    Args:
+        models (pyramid_oereb.contrib.data_sources.interlis_2_3.models.theme.Models): The models of the
+            Interlis schema.
+
+    Returns:
+        sqlalchemy.sql.expression.Select: The statement.
+    """
+    geometry = models.Geometry
+    public_law_restriction = models.PublicLawRestriction
+    # The geometries are selected as they are, not converted to WKB like the geometry columns of a query.
+    geometries = [
+        type_coerce(attribute, NullType()).label(name)
+        for name, attribute in get_geometry_columns(models)
+    ]
+    return select(
+        geometry.t_id.label('geometry_id'),
+        *geometries,
+        geometry.law_status.label('geometry_law_status'),
+        geometry.published_from.label('geometry_published_from'),
+        geometry.published_until.label('geometry_published_until'),
+        geometry.geo_metadata.label('geo_metadata'),
+        public_law_restriction.t_id.label('public_law_restriction_id'),
+        public_law_restriction.law_status.label('law_status'),
+        public_law_restriction.published_from.label('published_from'),
+        public_law_restriction.published_until.label('published_until'),
+        public_law_restriction.legend_entry_id.label('legend_entry_id'),
+        public_law_restriction.view_service_id.label('view_service_id'),
+        multilingual_uri_(
+            models,
+            models.MultilingualUri.view_service_id,
+            public_law_restriction.view_service_id
+        ).label('view_service_uri'),
+        office_(models, public_law_restriction.office_id).label('responsible_office'),
+        documents_(models, public_law_restriction.t_id).label('documents')
+    ).select_from(
+        geometry.__table__.join(
+            public_law_restriction.__table__,
+            geometry.public_law_restriction_id == public_law_restriction.t_id
+        )
+    )
+
+
+def get_flat_table(models):
+    """
+    Returns the flat view as table to query.
+
+    Args:
+        models (pyramid_oereb.contrib.data_sources.interlis_2_3.models.theme.Models): The models of the
+            Interlis schema.
+
+    Returns:
+        sqlalchemy.sql.expression.TableClause: The table.
+    """
+    types = dict([(name, attribute.type) for name, attribute in get_geometry_columns(models)])
+    return table(
+        FLAT_VIEW_NAME,
+        *[
+            column(selected.key, types.get(selected.key, selected.type))
+            for selected in get_flat_select(models).selected_columns
+        ],
+        schema=models.schema_name
+    )
+
+
+def create_flat_view_sql(models, dialect):
+    """
+    Args:
+        models (pyramid_oereb.contrib.data_sources.interlis_2_3.models.theme.Models): The models of the
+            Interlis schema.
+        dialect (sqlalchemy.engine.interfaces.Dialect): The dialect used to compile the statement.
+    Returns:
+        list of str: The sql statements used to create the flat view and its indexes
+    """
+    flat_table = get_flat_table(models)
+    statement = get_flat_select(models).compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+    return [
+        'CREATE MATERIALIZED VIEW IF NOT EXISTS {0} AS {1};'.format(flat_table.fullname, statement),
+        # The unique index is required to refresh the view concurrently.
+        'CREATE UNIQUE INDEX IF NOT EXISTS {0}_geometry_id_idx ON {1} (geometry_id);'.format(
+            FLAT_VIEW_NAME,
+            flat_table.fullname
+        ),
+        'CREATE INDEX IF NOT EXISTS {0}_public_law_restriction_id_idx ON {1} ({2});'.format(
+            FLAT_VIEW_NAME,
+            flat_table.fullname,
+            'public_law_restriction_id'
+        )
+    ]
+
+
+def refresh_flat_view_sql(models):
+    """
+    Args:
+        models (pyramid_oereb.contrib.data_sources.interlis_2_3.models.theme.Models): The models of the
+            Interlis schema.
+    Returns:
+        str: The sql statement used to refresh the flat view without blocking its readers
+    """
+    return 'REFRESH MATERIALIZED VIEW CONCURRENTLY {0};'.format(get_flat_table(models).fullname)
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+import datetime
+import logging
+from collections import namedtuple
+from itertools import groupby
+
+from geoalchemy2.shape import to_shape
+from sqlalchemy import or_
+
+from pyramid_oereb import Config
+from pyramid_oereb.contrib import eliminate_duplicated_document_records
+from pyramid_oereb.contrib.data_sources.interlis_2_3.models.flat import get_flat_table, \
+    get_geometry_columns
+from pyramid_oereb.contrib.data_sources.interlis_2_3.sources.plr import DatabaseSource
+
+log = logging.getLogger(__name__)
+
+FlatPublicLawRestriction = namedtuple('FlatPublicLawRestriction', ['t_id', 'rows'])
+
+
+def from_json_to_dict(texts, languages=None):
+    """
+    Returns the multilingual texts of the flat view as dictionary.
+
+    Args:
+        texts (dict or None): The texts by language. Languages without text are missing.
+        languages (tuple of str or None): The languages to keep. All languages are kept if None.
+
+    Returns:
+        dict or None: The texts by language or None if there is no text.
+    """
+    if texts is None:
+        return None
+    if languages is not None:
+        texts = dict([(language, text) for language, text in texts.items() if language in languages])
+    return texts or None
+
+
+def from_json_to_date(value):
+    if value is None:
+        return None
+    return datetime.date.fromisoformat(value[:10])
+
+
+class FlatDatabaseSource(DatabaseSource):
+    """
+    The source reading the public law restrictions of an Interlis schema from its flat view, see
+    :mod:`pyramid_oereb.contrib.data_sources.interlis_2_3.models.flat`. All public law restrictions of the
+    theme are loaded with their geometries, responsible offices, view services and documents by one
+    statement instead of one per relationship. The view has to be created with `create_interlis_flat_views`
+    and refreshed after every import of the schema, otherwise the extracts show the former data.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Keyword Arguments:
+            The same as :class:`pyramid_oereb.contrib.data_sources.interlis_2_3.sources.plr.DatabaseSource`.
+        """
+        super(FlatDatabaseSource, self).__init__(**kwargs)
+        self.flat_table = get_flat_table(self.models)
+
+    def collect_public_law_restrictions(self, session, plr_ids, as_of_date, languages=None):
+        """
+        Loads the rows of the public law restrictions from the flat view. Only the rows of published
+        geometries are loaded. If the tolerance check is done in the database, the geometries are not loaded
+        as their records are already calculated.
+
+        Args:
+            session (sqlalchemy.orm.Session): The requested clean session instance ready for use
+            plr_ids (list): The ids of the public law restrictions.
+            as_of_date (datetime.date): The date the objects have to be published at.
+            languages (tuple of str or None): Unused, the languages are projected when the records are
+                created.
+
+        Returns:
+            list of FlatPublicLawRestriction: The public law restrictions with their rows ordered by their id.
+        """
+        flat_table = self.flat_table
+        columns = flat_table.c
+        if self._database_tolerance_check_:
+            geometry_names = [name for name, _ in get_geometry_columns(self.models)]
+            columns = [column for column in flat_table.c if column.key not in geometry_names]
+        rows = session.execute(
+            flat_table.select().with_only_columns(*columns).where(
+                flat_table.c.public_law_restriction_id.in_(plr_ids),
+                flat_table.c.geometry_published_from <= as_of_date,
+                or_(
+                    flat_table.c.geometry_published_until.is_(None),
+                    flat_table.c.geometry_published_until >= as_of_date
+                )
+            ).order_by(
+                flat_table.c.public_law_restriction_id,
+                flat_table.c.geometry_id
+            )
+        ).all()
+        self.collect_missing_legend_entries_(session, rows, languages)
+        return [
+            FlatPublicLawRestriction(plr_id, list(plr_rows))
+            for plr_id, plr_rows in groupby(rows, lambda row: row.public_law_restriction_id)
+        ]
+
+    def collect_legend_entries(self, session, legend_entry_ids, languages=None):
+        """
+        Loads the legend entries and keeps their ids for the current extract, see
+        :meth:`get_legend_entry_from_db`.
+
+        Args:
+            session (sqlalchemy.orm.Session): The requested clean session instance ready for use
+            legend_entry_ids (list): The ids of the legend entries.
+            languages (tuple of str or None): The languages of the loaded legend texts. The texts of all
+                languages are loaded if None.
+
+        Returns:
+            list: The legend entries.
+        """
+        self._context_.legend_entry_ids = set(legend_entry_ids)
+        return super(FlatDatabaseSource, self).collect_legend_entries(session, legend_entry_ids, languages)
+
+    def collect_missing_legend_entries_(self, session, rows, languages):
+        # The view is not refreshed with the tables, so its rows may refer to legend entries which have not
+        # been loaded for the visible extent.
+        missing_ids = set([row.legend_entry_id for row in rows]) - \
+            getattr(self._context_, 'legend_entry_ids', set())
+        legend_entries = dict()
+        if len(missing_ids) > 0:
+            for legend_entry in super(FlatDatabaseSource, self).collect_legend_entries(
+                    session,
+                    sorted(missing_ids),
+                    languages
+            ):
+                legend_entries[legend_entry.t_id] = legend_entry
+        self._context_.missing_legend_entries = legend_entries
+
+    def get_legend_entry_from_db(self, legend_entry_id, legend_entries_from_db):
+        """
+        Returns the legend entry of a public law restriction, from the legend entries of the visible extent
+        or else from the ones loaded with the rows of the flat view.
+
+        Args:
+            legend_entry_id (int): The id of the legend entry.
+            legend_entries_from_db (list): The legend entries of the visible extent.
+
+        Returns:
+            sqlalchemy.ext.declarative.DeclarativeMeta or None: The legend entry or None if it does not exist
+            anymore.
+        """
+        legend_entry_from_db = next(
+            (legend_entry for legend_entry in legend_entries_from_db if legend_entry.t_id == legend_entry_id),
+            None
+        )
+        if legend_entry_from_db is None:
+            missing_legend_entries = getattr(self._context_, 'missing_legend_entries', dict())
+            legend_entry_from_db = missing_legend_entries.get(legend_entry_id)
+        return legend_entry_from_db
+
+    def from_json_to_office_record(self, office, languages=None):
+        return self._office_record_class(
+            from_json_to_dict(office.get('name'), languages),
+            office.get('uid'),
+            from_json_to_dict(office.get('uri'), languages),
+            office.get('line1'),
+            office.get('line2'),
+            office.get('street'),
+            office.get('number'),
+            office.get('postal_code'),
+            office.get('city')
+        )
+
+    def from_json_to_document_records(self, documents, as_of_date, languages=None):
+        document_records = []
+        for document in documents or []:
+            published_from = from_json_to_date(document.get('published_from'))
+            published_until = from_json_to_date(document.get('published_until'))
+            # Like the other sources, unpublished documents are skipped.
+            if published_from > as_of_date or (published_until is not None and published_until < as_of_date):
+                continue
+            document_records.append(self._documents_record_class(
+                document_type=Config.get_document_type_by_data_code(
+                    self._plr_info.get('code'),
+                    document.get('document_type')
+                ),
+                index=document.get('index'),
+                law_status=Config.get_law_status_by_data_code(
+                    self._plr_info.get('code'),
+                    document.get('law_status')
+                ),
+                title=from_json_to_dict(document.get('title'), languages),
+                responsible_office=self.from_json_to_office_record(
+                    document.get('responsible_office'),
+                    languages
+                ),
+                published_from=published_from,
+                published_until=published_until,
+                text_at_web=from_json_to_dict(document.get('text_at_web'), languages),
+                abbreviation=from_json_to_dict(document.get('abbreviation'), languages),
+                official_number=from_json_to_dict(document.get('official_number'), languages),
+                only_in_municipality=document.get('only_in_municipality'),
+                article_numbers=None,
+                file=None
+            ))
+        return document_records
+
+    def from_rows_to_geometry_records(self, rows):
+        geometry_records = []
+        for row in rows:
+            geom = row.point if row.point is not None else row.line if row.line is not None else row.surface
+            geometry_records.extend(self.create_geometry_records_(
+                Config.get_law_status_by_data_code(self._plr_info.get('code'), row.geometry_law_status),
+                row.geometry_published_from,
+                row.geometry_published_until,
+                to_shape(geom),
+                row.geo_metadata
+            ))
+        return geometry_records
+
+    def from_db_to_plr_record(self, params, public_law_restriction_from_db, legend_entries_from_db,
+                              geometry_records=None):
+        """
+        Creates the record of a public law restriction from its rows of the flat view.
+
+        Args:
+            params (pyramid_oereb.views.webservice.Parameter): The parameters of the extract request.
+            public_law_restriction_from_db (FlatPublicLawRestriction): The public law restriction with its
+                rows.
+            legend_entries_from_db (list): The legend entries of the visible extent.
+            geometry_records (list or None): The records of the geometries if they are already calculated.
+
+        Returns:
+            pyramid_oereb.core.records.plr.PlrRecord or None: The record of the public law restriction or None
+            if its legend entry does not exist anymore.
+        """
+        row = public_law_restriction_from_db.rows[0]
+        languages = getattr(self._context_, 'languages', None)
+        thresholds = self._plr_info.get('thresholds')
+        legend_entry_from_db = self.get_legend_entry_from_db(row.legend_entry_id, legend_entries_from_db)
+        if legend_entry_from_db is None:
+            log.warning('Public law restriction {0} of {1} skipped, its legend entry {2} does not exist. '
+                        'The flat view may have to be refreshed.'.format(
+                            public_law_restriction_from_db.t_id,
+                            self._plr_info.get('code'),
+                            row.legend_entry_id
+                        ))
+            return None
+        legend_entry_record = self.from_db_to_legend_entry_record(legend_entry_from_db)
+        legend_entry_records = self.from_db_to_legend_entry_records(
+            legend_entries_from_db,
+            legend_entry_record.theme.sub_code
+        )
+        multilingual_uri = from_json_to_dict(row.view_service_uri)
+        layer_index, layer_opacity = Config.get_index_and_opacity_of_view_service(multilingual_uri)
+        view_service_record = self._view_service_record_class(
+            multilingual_uri,
+            layer_index,
+            layer_opacity,
+            legends=legend_entry_records
+        )
+        theme = Config.get_theme_by_code_sub_code(legend_entry_from_db.theme, legend_entry_from_db.sub_theme)
+        document_records = eliminate_duplicated_document_records(
+            theme.document_records,
+            self.from_json_to_document_records(row.documents, params.as_of_date, languages)
+        )
+        if geometry_records is None:
+            geometry_records = self.from_rows_to_geometry_records(public_law_restriction_from_db.rows)
+        sub_theme_legend_entry_record = \
+            legend_entry_record.theme if legend_entry_record.theme.sub_code else None
+        return self._plr_record_class(
+            Config.get_theme_by_code_sub_code(legend_entry_record.theme.code),
+            legend_entry_record,
+            Config.get_law_status_by_data_code(self._plr_info.get('code'), row.law_status),
+            row.published_from,
+            row.published_until,
+            self.from_json_to_office_record(row.responsible_office, languages),
+            legend_entry_record.symbol,
+            view_service_record,
+            geometry_records,
+            sub_theme=sub_theme_legend_entry_record,
+            type_code=legend_entry_from_db.type_code,
+            type_code_list=legend_entry_from_db.type_code_list,
+            documents=document_records,
+            min_area=thresholds.get('area').get('limit'),
+            min_length=thresholds.get('length').get('limit'),
+            area_unit=thresholds.get('area').get('unit'),
+            length_unit=thresholds.get('length').get('unit'),
+            view_service_id=row.view_service_id
+        )
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
+import copy
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait
 
 from pyramid_oereb import Config
+from pyramid_oereb.core.cache import MemoryCache, TieredCache, create_cache
 from pyramid_oereb.contrib.data_sources.oereblex.sources.document import OEREBlexSource
 from pyramid_oereb.contrib.data_sources.standard.sources.plr import DatabaseSource
 
@@ -12,8 +16,25 @@ class DatabaseOEREBlexSource(DatabaseSource):
     """
     A source to get models documents attached to public law restrictions in replacement
     of standards documents. Be sure to use a model with an OEREBlex "geolink" integer
-    column for plrs that use this source.
+    column for plrs that use this source. The documents are fetched in the requested language.
+
+    The documents of a geoLink can be kept between the requests by the `cache` of the OEREBlex configuration.
+    The cache is shared by all sources of the process. With the `prefetch` configuration, the geoLinks of all
+    public law restrictions of the theme are fetched concurrently before the records are created.
     """
+    language_dependent_records = True
+
+    _geolink_cache_ = None
+    _geolink_cache_lock_ = threading.Lock()
+    _prefetch_executor_ = None
+    _prefetch_executor_lock_ = threading.Lock()
+
+    # The documents are not read from the database, so the legal provisions do not have to be loaded.
+    default_loader_strategies = {
+        path: strategy for path, strategy in DatabaseSource.default_loader_strategies.items()
+        if not path.startswith('legal_provisions')
+    }
+
     def __init__(self, **kwargs):
         """
         Keyword Arguments:
@@ -38,7 +59,127 @@ class DatabaseOEREBlexSource(DatabaseSource):
         config = Config.get_oereblex_config()
         config["code"] = self._plr_info.get('code')
         self._oereblex_source = OEREBlexSource(**config)
-        self._queried_geolinks = {}
+        self._oereblex_config_ = config
+        self.init_geolink_cache(config.get('cache'))
+        prefetch_config = config.get('prefetch') or {}
+        self._prefetch_timeout_ = prefetch_config.get('timeout')
+        self.init_prefetch_executor(prefetch_config.get('max_workers') or 1)
+
+    @classmethod
+    def init_geolink_cache(cls, cache_config):
+        """
+        Creates the cache of the geoLink documents of the process, if it is configured and does not exist
+        yet. It keeps the documents in the memory of the process, evicting the least recently used ones, and
+        optionally in a store shared by all processes.
+
+        Args:
+            cache_config (dict or None): The configuration of the cache with the `max_size` and the `ttl`
+                (seconds) of the memory store and the optional `shared` store configured by its `class`
+                and `params`.
+        """
+        if not cache_config:
+            return
+        with cls._geolink_cache_lock_:
+            if cls._geolink_cache_ is None:
+                cls._geolink_cache_ = TieredCache(
+                    MemoryCache(
+                        max_size=cache_config.get('max_size', 1000),
+                        ttl=cache_config.get('ttl', 3600)
+                    ),
+                    create_cache(cache_config.get('shared'))
+                )
+
+    @classmethod
+    def init_prefetch_executor(cls, max_workers):
+        """
+        Creates the thread pool of the process fetching the geoLinks concurrently, if it does not exist yet.
+        No pool is created for a single worker, the geoLinks are fetched one by one then.
+
+        Args:
+            max_workers (int): The maximum number of geoLinks fetched at the same time.
+        """
+        if max_workers <= 1:
+            return
+        with cls._prefetch_executor_lock_:
+            if cls._prefetch_executor_ is None:
+                cls._prefetch_executor_ = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix='oereblex'
+                )
+
+    def get_geolink_cache_key(self, geolink, language, oereblex_params):
+        """
+        Returns the key of the documents of a geoLink in the cache of the process. The records depend on the
+        theme, as its document types and law status are used.
+
+        Args:
+            geolink (int): The ID of the geoLink.
+            language (str): The language of the documents.
+            oereblex_params (str or None): The URL parameters of the request.
+
+        Returns:
+            str: The cache key.
+        """
+        return '|'.join([
+            'geolink',
+            str(self._oereblex_config_.get('host')),
+            str(self._oereblex_source._version),
+            str(self._plr_info.get('code')),
+            str(geolink),
+            str(language),
+            str(oereblex_params)
+        ])
+
+    @property
+    def _queried_geolinks(self):
+        """
+        dict: The documents of the geoLinks already fetched for the extract currently processed by this
+        thread. It is reset at the beginning of every read.
+        """
+        context = self._context_
+        if not hasattr(context, 'queried_geolinks'):
+            context.queried_geolinks = {}
+        return context.queried_geolinks
+
+    def read(self, params, real_estate, bbox):  # pylint: disable=W:0221
+        """
+        Resets the fetched geoLinks of the current thread and reads the public law restrictions.
+
+        Args:
+            params (pyramid_oereb.views.webservice.Parameter): The parameters of the extract request.
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real
+                estate in its record representation.
+            bbox (shapely.geometry.base.BaseGeometry): The bbox to search the records.
+        """
+        self._context_.queried_geolinks = {}
+        self._context_.params = params
+        super(DatabaseOEREBlexSource, self).read(params, real_estate, bbox)
+
+    def collect_public_law_restrictions(self, session, plr_ids, as_of_date):
+        """
+        Prefetches the geoLinks of the public law restrictions before they are loaded.
+
+        Args:
+            session (sqlalchemy.orm.Session): The requested clean session instance ready for use
+            plr_ids (list): The ids of the public law restrictions.
+            as_of_date (datetime.date): The date the objects have to be published at.
+
+        Returns:
+            iterable: The public law restrictions ordered by their id.
+        """
+        if self._prefetch_executor_ is not None:
+            plr_model = self.public_law_restriction_model
+            geolinks = session.query(plr_model.geolink).filter(plr_model.id.in_(plr_ids)).distinct().all()
+            self.prefetch_geolinks(
+                self._context_.params,
+                [geolink for geolink, in geolinks],
+                self.get_oereblex_params()
+            )
+        return super(DatabaseOEREBlexSource, self).collect_public_law_restrictions(
+            session,
+            plr_ids,
+            as_of_date
+        )
 
     @staticmethod
     def get_config_value_for_plr_code(url_param_config, plr_code):
@@ -54,17 +195,101 @@ class DatabaseOEREBlexSource(DatabaseSource):
                     return None
         return None
 
-    def get_document_records(self, params, public_law_restriction_from_db):
+    def get_oereblex_params(self):
         """
-        Override the parent's get_document_records method to obtain the models document instead.
+        Returns the URL parameters of the OEREBlex requests of the theme.
+
+        Returns:
+            str or None: The URL parameters.
         """
-        oereblex_params = None
         url_param_config = self._oereblex_source._url_param_config
         if url_param_config:
-            plr_code = self._theme_record.code
-            oereblex_params = DatabaseOEREBlexSource.get_config_value_for_plr_code(url_param_config, plr_code)
+            return DatabaseOEREBlexSource.get_config_value_for_plr_code(
+                url_param_config,
+                self._plr_info.get('code')
+            )
+        return None
+
+    def get_document_records(self, params, public_law_restriction_from_db):
+        """
+        Override the parent's get_document_records method to obtain the models document instead.
+        """
         return self.document_records_from_oereblex(params, public_law_restriction_from_db.geolink,
-                                                   oereblex_params)
+                                                   self.get_oereblex_params())
+
+    def get_cached_geolink_(self, params, geolink, oereblex_params):
+        cache = self._geolink_cache_
+        if cache is None:
+            return None
+        records = cache.get(self.get_geolink_cache_key(
+            geolink,
+            params.language or self._oereblex_source._language,
+            oereblex_params
+        ))
+        if records is None:
+            return None
+        log.debug('use the documents of geolink "{}" from the cache'.format(geolink))
+        # The cached records are shared by all requests of the process.
+        return copy.deepcopy(records)
+
+    def fetch_geolink_(self, params, geolink, oereblex_params):
+        # The records of the OEREBlex source are kept per thread, so the geoLinks can be fetched concurrently.
+        self._oereblex_source.read(params, geolink, oereblex_params)
+        records = self._oereblex_source.records
+        log.debug("fetched {} records of geolink {}".format(len(records), geolink))
+        cache = self._geolink_cache_
+        if cache is not None:
+            cache.set(
+                self.get_geolink_cache_key(
+                    geolink,
+                    params.language or self._oereblex_source._language,
+                    oereblex_params
+                ),
+                copy.deepcopy(records)
+            )
+        return records
+
+    def prefetch_geolinks(self, params, geolinks, oereblex_params):
+        """
+        Fetches the passed geoLinks concurrently, except the ones already fetched for the current extract or
+        found in the cache. The geoLinks have to be fetched within the configured timeout (seconds) in total.
+
+        Args:
+            params (pyramid_oereb.views.webservice.Parameter): The parameters of the extract request.
+            geolinks (list of int): The IDs of the geoLinks.
+            oereblex_params (str or None): URL parameter to add to the requests.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the geoLinks have not been fetched within the timeout.
+        """
+        missing = []
+        for geolink in sorted(set(geolinks)):
+            identifier = '{}{}'.format(geolink, params.language)
+            if identifier in self._queried_geolinks:
+                continue
+            records = self.get_cached_geolink_(params, geolink, oereblex_params)
+            if records is None:
+                missing.append(geolink)
+            else:
+                self._queried_geolinks[identifier] = records
+        if self._prefetch_executor_ is None or len(missing) == 0:
+            return
+        futures = [
+            self._prefetch_executor_.submit(self.fetch_geolink_, params, geolink, oereblex_params)
+            for geolink in missing
+        ]
+        done, not_done = wait(futures, timeout=self._prefetch_timeout_)
+        if len(not_done) > 0:
+            for future in futures:
+                future.cancel()
+            log.error(u'Fetching {0} geoLinks of {1} did not finish within {2} seconds'.format(
+                len(not_done),
+                self._plr_info.get('code'),
+                self._prefetch_timeout_
+            ))
+            raise TimeoutError()
+        for geolink, future in zip(missing, futures):
+            self._queried_geolinks['{}{}'.format(geolink, params.language)] = future.result()
 
     def document_records_from_oereblex(self, params, geolink, oereblex_params):
         """
@@ -86,9 +311,9 @@ class DatabaseOEREBlexSource(DatabaseSource):
         if identifier in self._queried_geolinks:
             log.debug('skip querying this geolink "{}" because it was fetched already.'.format(identifier))
             log.debug('use already queried instead')
-        else:
-            self._oereblex_source.read(params, geolink, oereblex_params)
-            log.debug("document_records_from_oereblex() returning {} records"
-                      .format(len(self._oereblex_source.records)))
-            self._queried_geolinks[identifier] = self._oereblex_source.records
-        return self._queried_geolinks[identifier]
+            return self._queried_geolinks[identifier]
+        records = self.get_cached_geolink_(params, geolink, oereblex_params)
+        if records is None:
+            records = self.fetch_geolink_(params, geolink, oereblex_params)
+        self._queried_geolinks[identifier] = records
+        return records
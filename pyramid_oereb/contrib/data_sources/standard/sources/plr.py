@@ -2,19 +2,25 @@
 import logging
 import importlib
 
-from geoalchemy2.shape import to_shape, from_shape
+from geoalchemy2.shape import to_shape
 from shapely.geometry import Point, LineString, Polygon, MultiPoint, MultiLineString, MultiPolygon, \
     GeometryCollection
-from sqlalchemy import text, or_
+from pyramid.config import ConfigurationError
+from sqlalchemy import and_, func, literal, literal_column, select, or_
+from sqlalchemy.orm import defaultload, defer, with_loader_criteria
 
 from pyramid_oereb import Config
 from pyramid_oereb.core import b64
+from pyramid_oereb.core.cache import SourceRecordCache
 from pyramid_oereb.core.records.availability import AvailabilityRecord
 from pyramid_oereb.core.records.image import ImageRecord
 from pyramid_oereb.core.records.plr import EmptyPlrRecord
 from pyramid_oereb.core.sources import BaseDatabaseSource
 from pyramid_oereb.core.sources.plr import PlrBaseSource
+from pyramid_oereb.core.timing import get_timings
 from pyramid_oereb.contrib import eliminate_duplicated_document_records
+from pyramid_oereb.contrib.data_sources import get_loader_options, bind_geometry, \
+    collect_geometry_shares, filter_geometry_shares, get_published_filter, ReadLimits, CLIP_GEOMETRIES
 
 log = logging.getLogger(__name__)
 
@@ -79,6 +85,21 @@ def parse_multiple_standard_themes(config):
 
 
 class DatabaseSource(BaseDatabaseSource, PlrBaseSource):
+
+    default_loader_strategies = {
+        'legend_entry': 'selectin',
+        'view_service': 'selectin',
+        'responsible_office': 'selectin',
+        'geometries': 'selectin',
+        'legal_provisions': 'selectin',
+        'legal_provisions.document': 'joined',
+        'legal_provisions.document.responsible_office': 'selectin'
+    }
+    """
+    dict: The strategies used to load the objects related to the found public law restrictions. They can be
+    overridden per theme with the `loader_strategies` parameter of the source.
+    """
+
     def __init__(self, **kwargs):
         """
         Keyword Arguments:
@@ -110,8 +131,33 @@ class DatabaseSource(BaseDatabaseSource, PlrBaseSource):
         PlrBaseSource.__init__(self, **kwargs)
 
         self.legend_entry_model = models.LegendEntry
+        self.public_law_restriction_model = models.PublicLawRestriction
+        # Models which replace the documents, like the one of OEREBlex, have no document model.
+        self.document_model = getattr(models, 'Document', None)
+        self.data_integration_model = models.DataIntegration
         availability_model = models.Availability
 
+        self._loader_strategies_ = dict(self.default_loader_strategies)
+        self._loader_strategies_.update(kwargs.get('source').get('params').get('loader_strategies') or {})
+        self._clip_geometries_ = kwargs.get('source').get('params').get('clip_geometries')
+        if self._clip_geometries_ is not None and self._clip_geometries_ not in CLIP_GEOMETRIES:
+            raise ConfigurationError('Unknown value "{0}" for clip_geometries. Use one of: {1}'.format(
+                self._clip_geometries_,
+                ', '.join(CLIP_GEOMETRIES)
+            ))
+        # The shares of clipped geometries have to be calculated on the original geometries, which is only
+        # possible in the database.
+        self._database_tolerance_check_ = self._clip_geometries_ is not None or \
+            kwargs.get('source').get('params').get('database_tolerance_check', False)
+        if self._database_tolerance_check_:
+            # The geometries are loaded after the tolerance check, only the ones concerning the real estate.
+            self._loader_strategies_['geometries'] = 'lazy'
+        self._loader_options_ = None
+        self._legend_entry_records_ = SourceRecordCache()
+        self._yield_per_ = kwargs.get('source').get('params').get('yield_per', 100)
+        self._max_records_ = kwargs.get('source').get('params').get('max_records')
+        self._max_geometry_size_ = kwargs.get('source').get('params').get('max_geometry_size')
+
         self.availabilities = []
 
         session = self._adapter_.get_session(self._key_)
@@ -127,7 +173,57 @@ class DatabaseSource(BaseDatabaseSource, PlrBaseSource):
         finally:
             session.close()
 
+    @property
+    def loader_options(self):
+        """
+        list of sqlalchemy.orm.Load: The options loading the found public law restrictions with all their
+        related objects by a fixed number of statements.
+        """
+        if self._loader_options_ is None:
+            self._loader_options_ = get_loader_options(
+                self.public_law_restriction_model,
+                self._loader_strategies_
+            )
+            # The symbol is only needed to build the legend entry records which are not kept in memory yet.
+            self._loader_options_.append(
+                defaultload(self.public_law_restriction_model.legend_entry).defer(
+                    self.legend_entry_model.symbol
+                )
+            )
+        return self._loader_options_
+
+    def get_data_integration_date(self):
+        """
+        Returns the date of the latest data integration of this theme.
+
+        Returns:
+            datetime.datetime or None: The date of the latest data integration.
+        """
+        session = self._adapter_.get_session(self._key_)
+        try:
+            return session.query(func.max(self.data_integration_model.date)).scalar()
+        finally:
+            session.close()
+
     def from_db_to_legend_entry_record(self, legend_entry_from_db):
+        """
+        Returns the record of the legend entry. The records are built once with their decoded symbol and
+        kept in memory until the next data integration of the theme.
+
+        Args:
+            legend_entry_from_db (sqlalchemy.ext.declarative.DeclarativeMeta): The legend entry from the
+                database.
+
+        Returns:
+            pyramid_oereb.core.records.view_service.LegendEntryRecord: The legend entry record. It must not be
+            modified.
+        """
+        return self._legend_entry_records_.get(
+            legend_entry_from_db.id,
+            lambda: self.create_legend_entry_record_(legend_entry_from_db)
+        )
+
+    def create_legend_entry_record_(self, legend_entry_from_db):
         theme = Config.get_theme_by_code_sub_code(legend_entry_from_db.theme, legend_entry_from_db.sub_theme)
         legend_entry_record = self._legend_entry_record_class(
             ImageRecord(b64.decode(legend_entry_from_db.symbol)),
@@ -301,7 +397,8 @@ class DatabaseSource(BaseDatabaseSource, PlrBaseSource):
             ))
         return document_records
 
-    def from_db_to_plr_record(self, params, public_law_restriction_from_db, legend_entries_from_db):
+    def from_db_to_plr_record(self, params, public_law_restriction_from_db, legend_entries_from_db,
+                              geometry_records=None):
         thresholds = self._plr_info.get('thresholds')
         min_length = thresholds.get('length').get('limit')
         length_unit = thresholds.get('length').get('unit')
@@ -314,7 +411,7 @@ class DatabaseSource(BaseDatabaseSource, PlrBaseSource):
             legend_entries_from_db,
             legend_entry_record.theme.sub_code
         )
-        symbol = ImageRecord(b64.decode(public_law_restriction_from_db.legend_entry.symbol))
+        symbol = legend_entry_record.symbol
         view_service_record = self.from_db_to_view_service_record(
             public_law_restriction_from_db.view_service,
             legend_entry_records
@@ -326,7 +423,8 @@ class DatabaseSource(BaseDatabaseSource, PlrBaseSource):
             theme.document_records,
             self.get_document_records(params, public_law_restriction_from_db)
         )
-        geometry_records = self.from_db_to_geometry_records(public_law_restriction_from_db.geometries)
+        if geometry_records is None:
+            geometry_records = self.from_db_to_geometry_records(public_law_restriction_from_db.geometries)
         law_status = Config.get_law_status_by_data_code(
             self._plr_info.get('code'),
             public_law_restriction_from_db.law_status
@@ -363,7 +461,9 @@ class DatabaseSource(BaseDatabaseSource, PlrBaseSource):
                                  'legal_provisions attribute. Check the model implementation.'
                                  .format(type(public_law_restriction_from_db)))
         for legal_provision in public_law_restriction_from_db.legal_provisions:
-            documents_from_db.append(legal_provision.document)
+            # Unpublished documents are not loaded.
+            if legal_provision.document is not None:
+                documents_from_db.append(legal_provision.document)
         document_records = self.from_db_to_document_records(documents_from_db)
         return document_records
 
@@ -386,93 +486,234 @@ class DatabaseSource(BaseDatabaseSource, PlrBaseSource):
         Raises:
             HTTPBadRequest
         """
-        srid = Config.get('srid')
-        sql_text_point = 'ST_Intersects(ST_CollectionExtract({0}, 1), ST_GeomFromText(\'{1}\', {2}))'.format(
-            db_path,
-            real_estate_geometry.wkt,
-            srid
+        column = literal_column(db_path)
+        geometry = bind_geometry(real_estate_geometry, Config.get('srid'))
+        return or_(
+            func.ST_Intersects(func.ST_CollectionExtract(column, 1), geometry),
+            func.ST_Intersects(func.ST_CollectionExtract(column, 2), geometry),
+            func.ST_Intersects(func.ST_CollectionExtract(column, 3), geometry)
         )
-        sql_text_line = 'ST_Intersects(ST_CollectionExtract({0}, 2), ST_GeomFromText(\'{1}\', {2}))'.format(
-            db_path,
-            real_estate_geometry.wkt,
-            srid
-        )
-        sql_text_polygon = 'ST_Intersects(ST_CollectionExtract({0}, 3), ' \
-                           'ST_GeomFromText(\'{1}\', {2}))'.format(
-                                db_path,
-                                real_estate_geometry.wkt,
-                                srid
-                            )
-        clause_blocks = [
-            text(sql_text_point),
-            text(sql_text_line),
-            text(sql_text_polygon)
-        ]
-        return or_(*clause_blocks)
 
-    def handle_collection(self, session, geometry_to_check):
+    def get_spatial_filter(self, geometry_to_check):
+        """
+        Returns the filter for geometries of the topic which have spatial relation with the passed geometry.
+
+        Args:
+            geometry_to_check (shapely.geometry.base.BaseGeometry): The geometry to check.
+
+        Returns:
+            sqlalchemy.sql.elements.ClauseElement: The clause element.
+        """
         geometry_types = Config.get('geometry_types')
         collection_types = geometry_types.get('collection').get('types')
         # Check for Geometry type, cause we can't handle geometry collections the same as specific geometries
         if self._plr_info.get('geometry_type') in [x.upper() for x in collection_types]:
 
             # The PLR is defined as a collection type. We need to do a special handling
-            query = session.query(self._model_).filter(
-                self.extract_geometry_collection_db(
-                    '{schema}.{table}.geom'.format(
-                        schema=self._model_.__table__.schema,
-                        table=self._model_.__table__.name
-                    ),
-                    geometry_to_check
-                )
+            return self.extract_geometry_collection_db(
+                '{schema}.{table}.geom'.format(
+                    schema=self._model_.__table__.schema,
+                    table=self._model_.__table__.name
+                ),
+                geometry_to_check
             )
 
-        else:
-            # The PLR is not problematic at all cause we do not have a collection type here
-            query = session.query(self._model_).filter(self._model_.geom.ST_Intersects(
-                from_shape(geometry_to_check, srid=Config.get('srid'))
-            ))
-        return query
+        # The PLR is not problematic at all cause we do not have a collection type here
+        return self._model_.geom.ST_Intersects(
+            bind_geometry(geometry_to_check, Config.get('srid'))
+        )
+
+    def handle_collection(self, session, geometry_to_check):
+        return session.query(self._model_).filter(self.get_spatial_filter(geometry_to_check))
 
-    def collect_related_geometries_by_real_estate(self, session, real_estate):
+    def get_probe(self, real_estate):
         """
-        Extracts all geometries in the topic which have spatial relation with the passed real estate
+        Returns the probe which tells if the topic has geometries with spatial relation to the real estate.
+
+        Args:
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real
+                estate in its record representation.
+
+        Returns:
+            tuple or None: The database connection string and the probe or None if the topic is not
+            available for the real estate.
+        """
+        if not self._is_available(real_estate):
+            return None
+        return self._key_, select(literal(1)).select_from(
+            self._model_.__table__
+        ).where(
+            self.get_spatial_filter(real_estate.limit)
+        ).exists()
+
+    def collect_related_plr_ids(self, session, real_estate, bbox, as_of_date):
+        """
+        Finds by one query the public law restrictions of the topic which have spatial relation with the
+        passed real estate and the legend entries of all public law restrictions within the bounding box of
+        the visible extent. The bounding box contains the real estate, so the relation to the real estate is
+        only checked for the geometries within the bounding box. Only published public law restrictions and
+        geometries are taken into account. No geometry is loaded.
 
         Args:
             session (sqlalchemy.orm.Session): The requested clean session instance ready for use
             real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real
                 estate in its record representation.
+            bbox (shapely.geometry.base.BaseGeometry): The bbox to search the records.
+            as_of_date (datetime.date): The date the objects have to be published at.
 
         Returns:
-            list: The result of the related geometries unique by the public law restriction id
+            tuple of list: The ids of the public law restrictions related to the real estate and the ids of
+            the legend entries within the bounding box.
         """
-        return self.handle_collection(session, real_estate.limit).distinct(
-            self._model_.public_law_restriction_id
+        plr_model = self.public_law_restriction_model
+        results = session.query(
+            plr_model.id,
+            plr_model.legend_entry_id,
+            func.bool_or(self.get_spatial_filter(real_estate.limit))
+        ).select_from(
+            self._model_
+        ).join(
+            self._model_.public_law_restriction
+        ).filter(
+            self.get_spatial_filter(bbox),
+            get_published_filter(self._model_, as_of_date),
+            get_published_filter(plr_model, as_of_date)
+        ).group_by(
+            plr_model.id,
+            plr_model.legend_entry_id
         ).all()
+        plr_ids = [plr_id for plr_id, _, on_real_estate in results if on_real_estate]
+        legend_entry_ids = list(set([legend_entry_id for _, legend_entry_id, _ in results]))
+        return plr_ids, legend_entry_ids
 
-    def collect_legend_entries_by_bbox(self, session, bbox):
+    def collect_public_law_restrictions(self, session, plr_ids, as_of_date):
         """
-        Extracts all legend entries in the topic which have spatial relation with the passed bounding box of
-        visible extent.
+        Loads the public law restrictions with all their related objects. Of the related geometries and
+        documents only the published ones are loaded. If `yield_per` is configured, the public law
+        restrictions are streamed in batches of this size and the related objects are loaded per batch.
 
         Args:
             session (sqlalchemy.orm.Session): The requested clean session instance ready for use
-            bbox (shapely.geometry.base.BaseGeometry): The bbox to search the records.
+            plr_ids (list): The ids of the public law restrictions.
+            as_of_date (datetime.date): The date the objects have to be published at.
 
         Returns:
-            list: The result of the related geometries unique by the public law restriction id
+            iterable: The public law restrictions ordered by their id.
         """
-        distinct_legend_entry_ids = []
-        geometries = self.handle_collection(session, bbox).distinct(
-            self._model_.public_law_restriction_id
-        ).all()
+        plr_model = self.public_law_restriction_model
+        options = list(self.loader_options)
+        for model in [self._model_, self.document_model]:
+            if model is not None:
+                options.append(with_loader_criteria(model, get_published_filter(model, as_of_date)))
+        query = session.query(plr_model).options(
+            *options
+        ).filter(
+            plr_model.id.in_(plr_ids)
+        ).order_by(plr_model.id)
+        if self._yield_per_:
+            return query.yield_per(self._yield_per_)
+        return query.all()
+
+    def collect_calculated_geometry_records(self, session, real_estate, bbox, as_of_date, limits):
+        """
+        Applies the tolerance check to the geometries of the topic in the database and creates the records of
+        the geometries which pass it. Only these geometries are loaded from the database. If the geometries
+        are clipped, only their clipped parts are loaded. Unpublished geometries are ignored.
 
-        for geometry in geometries:
-            if geometry.public_law_restriction.legend_entry_id not in distinct_legend_entry_ids:
-                distinct_legend_entry_ids.append(geometry.public_law_restriction.legend_entry_id)
+        Args:
+            session (sqlalchemy.orm.Session): The requested clean session instance ready for use
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real
+                estate in its record representation.
+            bbox (shapely.geometry.base.BaseGeometry): The bbox of the visible extent.
+            as_of_date (datetime.date): The date the geometries have to be published at.
+            limits (pyramid_oereb.contrib.data_sources.ReadLimits): The limits of the loaded geometries.
 
-        return session.query(self.legend_entry_model).filter(
-            self.legend_entry_model.id.in_((distinct_legend_entry_ids))).all()
+        Returns:
+            dict: The lists of the calculated geometry records by the id of their public law restriction.
+        """
+        geometry_shares = collect_geometry_shares(
+            session,
+            self._model_.id,
+            self._model_.public_law_restriction_id,
+            self._model_.geom,
+            and_(
+                self.get_spatial_filter(real_estate.limit),
+                get_published_filter(self._model_, as_of_date)
+            ),
+            real_estate,
+            Config.get('srid'),
+            clip=self._clip_geometries_,
+            bbox=bbox
+        )
+        clipped_parts = dict()
+        if self._clip_geometries_ is not None:
+            for geometry_share in geometry_shares:
+                clipped_parts.setdefault(geometry_share[0], dict())[geometry_share[2]] = geometry_share[5]
+        geometry_shares = filter_geometry_shares(
+            geometry_shares,
+            real_estate,
+            self._plr_info.get('thresholds')
+        )
+        geometry_records = dict()
+        geometry_ids = set([geometry_id for geometry_id, _ in geometry_shares])
+        if len(geometry_ids) == 0:
+            return geometry_records
+        query = session.query(self._model_)
+        if self._clip_geometries_ is not None:
+            query = query.options(defer(self._model_.geom))
+        query = query.filter(
+            self._model_.id.in_(geometry_ids)
+        ).order_by(self._model_.id)
+        if self._yield_per_:
+            query = query.yield_per(self._yield_per_)
+        for geometry_from_db in query:
+            if self._clip_geometries_ is None:
+                limits.add_geometry(geometry_from_db.geom)
+                records = self.from_db_to_geometry_records([geometry_from_db])
+                parts = dict([(part, [record]) for part, record in enumerate(records, 1)])
+            else:
+                law_status = Config.get_law_status_by_data_code(
+                    self._plr_info.get('code'),
+                    geometry_from_db.law_status
+                )
+                parts = dict()
+                for part, clipped in clipped_parts.get(geometry_from_db.id, dict()).items():
+                    limits.add_geometry(clipped)
+                    parts[part] = self.create_geometry_records_(
+                        law_status,
+                        geometry_from_db.published_from,
+                        geometry_from_db.published_until,
+                        to_shape(clipped),
+                        geometry_from_db.geo_metadata
+                    )
+            for part in sorted(parts.keys()):
+                shares = geometry_shares.get((geometry_from_db.id, part))
+                if shares is None or len(parts[part]) == 0:
+                    continue
+                # A part may be clipped to several pieces. Its shares are carried by the first one.
+                parts[part][0].set_shares(**shares)
+                for geometry_record in parts[part][1:]:
+                    geometry_record.set_shares(units=shares.get('units'))
+                geometry_records.setdefault(geometry_from_db.public_law_restriction_id, []).extend(
+                    parts[part]
+                )
+        return geometry_records
+
+    def collect_legend_entries(self, session, legend_entry_ids):
+        """
+        Loads the legend entries.
+
+        Args:
+            session (sqlalchemy.orm.Session): The requested clean session instance ready for use
+            legend_entry_ids (list): The ids of the legend entries.
+
+        Returns:
+            list: The legend entries.
+        """
+        return session.query(self.legend_entry_model).options(
+            defer(self.legend_entry_model.symbol)
+        ).filter(
+            self.legend_entry_model.id.in_(legend_entry_ids)).all()
 
     def read(self, params, real_estate, bbox):  # pylint: disable=W:0221
         """
@@ -484,37 +725,67 @@ class DatabaseSource(BaseDatabaseSource, PlrBaseSource):
                 estate in its record representation.
             bbox (shapely.geometry.base.BaseGeometry): The bbox to search the records.
         """
+        timings = get_timings()
         # Check if the plr is marked as available
         if self._is_available(real_estate):
+            self._legend_entry_records_.validate(self)
+            limits = ReadLimits(self._plr_info['code'], self._max_records_, self._max_geometry_size_)
             session = self._adapter_.get_session(self._key_)
             try:
-                if session.query(self._model_).count() == 0:
-                    # We can stop here already because there are no items in the database
-                    self.records = [EmptyPlrRecord(Config.get_theme_by_code_sub_code(self._plr_info['code']))]
-                else:
-                    # We need to investigate more in detail
-
-                    # Try to find geometries which have spatial relation with real estate
-                    geometry_results = self.collect_related_geometries_by_real_estate(
-                        session, real_estate
+                # Find the public law restrictions which have spatial relation with the real estate and
+                # the legend entries of the visible extent. An empty table simply leads to no results, so
+                # there is no need to count the entries of the table first.
+                with timings.measure('{0}.query'.format(self._plr_info['code'])):
+                    plr_ids, legend_entry_ids = self.collect_related_plr_ids(
+                        session,
+                        real_estate,
+                        bbox,
+                        params.as_of_date
                     )
-                    if len(geometry_results) == 0:
-                        # We checked if there are spatially related elements in database. But there is none.
-                        # So we can stop here.
-                        self.records = [EmptyPlrRecord(
-                            Config.get_theme_by_code_sub_code(self._plr_info['code'])
-                        )]
-                    else:
-                        # We found spatially related elements. This means we need to extract the actual plr
-                        # information related to the found geometries.
-                        self.records = []
-                        legend_entries_from_db = self.collect_legend_entries_by_bbox(session, bbox)
-                        for geometry_result in geometry_results:
+                geometry_records = dict()
+                if len(plr_ids) > 0 and self._database_tolerance_check_:
+                    # Apply the tolerance check in the database, so only the public law restrictions
+                    # concerning the real estate and their geometries on it are loaded.
+                    with timings.measure('{0}.tolerance_check'.format(self._plr_info['code'])):
+                        geometry_records = self.collect_calculated_geometry_records(
+                            session,
+                            real_estate,
+                            bbox,
+                            params.as_of_date,
+                            limits
+                        )
+                    # The geometries are checked without their public law restrictions, which may be
+                    # unpublished although their geometries are published.
+                    plr_ids = sorted(set(plr_ids).intersection(geometry_records.keys()))
+                if len(plr_ids) == 0:
+                    # We checked if there are spatially related elements in database. But there is none.
+                    # So we can stop here.
+                    self.records = [EmptyPlrRecord(
+                        Config.get_theme_by_code_sub_code(self._plr_info['code'])
+                    )]
+                else:
+                    # We found spatially related elements. This means we need to extract the actual plr
+                    # information related to the found geometries.
+                    limits.add_records(len(plr_ids))
+                    self.records = []
+                    with timings.measure('{0}.legend'.format(self._plr_info['code'])):
+                        legend_entries_from_db = self.collect_legend_entries(session, legend_entry_ids)
+                    with timings.measure('{0}.records'.format(self._plr_info['code'])):
+                        public_law_restrictions = self.collect_public_law_restrictions(
+                            session,
+                            plr_ids,
+                            params.as_of_date
+                        )
+                        for public_law_restriction in public_law_restrictions:
+                            if not self._database_tolerance_check_:
+                                for geometry_from_db in public_law_restriction.geometries:
+                                    limits.add_geometry(geometry_from_db.geom)
                             self.records.append(
                                 self.from_db_to_plr_record(
                                     params,
-                                    geometry_result.public_law_restriction,
-                                    legend_entries_from_db
+                                    public_law_restriction,
+                                    legend_entries_from_db,
+                                    geometry_records.get(public_law_restriction.id)
                                 )
                             )
 
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from copy import deepcopy
 from datetime import datetime, timedelta
 import io
 import json
@@ -42,6 +43,10 @@ class Renderer(JsonRenderer):
             self._multilingual_text(item, 'Title')
             self._multilingual_text(item, 'Abbreviation')
 
+    def get_static_fragment(self, name, records, build):
+        # The extract is modified in place to make it printable, so the shared parts have to be copied.
+        return deepcopy(super(Renderer, self).get_static_fragment(name, records, build))
+
     def __call__(self, value, system):
         """
         Implements a subclass of pyramid_oereb.core.renderer.extract.json_.Renderer to create a print result
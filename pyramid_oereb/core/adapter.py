@@ -3,7 +3,7 @@ import logging
 import os
 
 from io import open
-from sqlalchemy import create_engine, orm
+from sqlalchemy import create_engine, event, exc, orm
 
 
 log = logging.getLogger(__name__)
@@ -30,6 +30,7 @@ class DatabaseAdapter(object):
         """
         if connection_string not in self._connections_:
             engine = create_engine(connection_string, pool_recycle=30)
+            self._bind_pool_to_process_(engine)
             session = orm.scoped_session(orm.sessionmaker(bind=engine))
             self._connections_[connection_string] = {
                 'engine': engine,
@@ -38,6 +39,34 @@ class DatabaseAdapter(object):
         else:
             log.info('Connection already exists: {0}'.format(connection_string))
 
+    @staticmethod
+    def _bind_pool_to_process_(engine):
+        """
+        Prevents the use of pooled connections in another process than the one which has opened them. The
+        configuration already reads from the database, so the pools of a server forking its workers after
+        loading the application (e.g. gunicorn with `--preload`) would share their sockets otherwise. Such
+        connections are dropped from the pool of the forked process and replaced by new ones.
+
+        Args:
+            engine (sqlalchemy.engine.Engine): The engine of the connection.
+        """
+
+        @event.listens_for(engine, 'connect')
+        def connect(dbapi_connection, connection_record):
+            connection_record.info['pid'] = os.getpid()
+
+        @event.listens_for(engine, 'checkout')
+        def checkout(dbapi_connection, connection_record, connection_proxy):
+            pid = os.getpid()
+            if connection_record.info['pid'] != pid:
+                connection_record.dbapi_connection = connection_proxy.dbapi_connection = None
+                raise exc.DisconnectionError(
+                    'Connection record belongs to pid {0}, attempting to check out in pid {1}'.format(
+                        connection_record.info['pid'],
+                        pid
+                    )
+                )
+
     def get_connections(self):
         """
         Returns a dictionary with the available connections.
@@ -0,0 +1,577 @@
+# -*- coding: utf-8 -*-
+"""
+This package provides the cache stores which can be used to keep expensive results between requests. The
+store to use is configured like a source: a `class` given as dotted name and the `params` passed to it::
+
+    cache:
+      class: pyramid_oereb.core.cache.MemoryCache
+      params:
+        max_size: 1000
+        ttl: 3600
+
+All stores offer the same interface (`get`, `set` and `clear`) and are safe to use from several threads.
+"""
+import copy
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+from collections import OrderedDict
+from datetime import datetime
+
+from pyramid.config import ConfigurationError
+from pyramid.path import DottedNameResolver
+
+from pyramid_oereb.core.config import Config
+
+log = logging.getLogger(__name__)
+
+
+class BaseCache(object):
+    """
+    The basic cache store. It is not meant to be used directly but as a basic class for the concrete stores.
+
+    Args:
+        ttl (int or None): The number of seconds a value is kept. None keeps the values until they are
+            evicted by the store.
+    """
+
+    def __init__(self, ttl=None):
+        self._ttl_ = ttl
+
+    @property
+    def ttl(self):
+        """
+        int or None: The number of seconds a value is kept.
+        """
+        return self._ttl_
+
+    def _expires(self):
+        return None if self._ttl_ is None else time.time() + self._ttl_
+
+    @staticmethod
+    def _expired(expires):
+        return expires is not None and expires < time.time()
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value.
+
+        Args:
+            key (str): The key of the value.
+            default (*): The value returned if there is no valid value for the key.
+
+        Returns:
+            *: The cached value or the default.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value):
+        """
+        Stores a value.
+
+        Args:
+            key (str): The key of the value.
+            value (*): The value to store. Stores which are not in process require it to be picklable.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Removes all values from the store.
+        """
+        raise NotImplementedError
+
+
+class MemoryCache(BaseCache):
+    """
+    A cache store keeping the values in the memory of the process. If the store is full, the least recently
+    used value is evicted.
+
+    Args:
+        max_size (int): The maximum number of values kept.
+        ttl (int or None): The number of seconds a value is kept.
+    """
+
+    def __init__(self, max_size=1000, ttl=None):
+        super(MemoryCache, self).__init__(ttl=ttl)
+        self._max_size_ = max_size
+        self._values_ = OrderedDict()
+        self._lock_ = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock_:
+            entry = self._values_.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if self._expired(expires):
+                del self._values_[key]
+                return default
+            self._values_.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock_:
+            self._values_[key] = (self._expires(), value)
+            self._values_.move_to_end(key)
+            while len(self._values_) > self._max_size_:
+                self._values_.popitem(last=False)
+
+    def clear(self):
+        with self._lock_:
+            self._values_.clear()
+
+    def __len__(self):
+        return len(self._values_)
+
+
+class DiskCache(BaseCache):
+    """
+    A cache store keeping the pickled values as files in a local directory. The directory can be shared by
+    the processes of one host.
+
+    Args:
+        path (str): The directory of the cache files. It is created if it does not exist.
+        ttl (int or None): The number of seconds a value is kept.
+    """
+
+    def __init__(self, path, ttl=None):
+        super(DiskCache, self).__init__(ttl=ttl)
+        self._path_ = os.path.abspath(path)
+        os.makedirs(self._path_, exist_ok=True)
+
+    def _file_name(self, key):
+        return os.path.join(self._path_, '{0}.cache'.format(hashlib.sha256(key.encode('utf-8')).hexdigest()))
+
+    def get(self, key, default=None):
+        file_name = self._file_name(key)
+        try:
+            with open(file_name, 'rb') as f:
+                expires, value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception as ex:
+            log.warning(u'Cache file {0} could not be read: {1}'.format(file_name, ex))
+            return default
+        if self._expired(expires):
+            try:
+                os.remove(file_name)
+            except OSError:
+                pass
+            return default
+        return value
+
+    def set(self, key, value):
+        # Write to a temporary file first, so other processes never read a partially written file.
+        handle, temp_name = tempfile.mkstemp(dir=self._path_, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                pickle.dump((self._expires(), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, self._file_name(key))
+        except Exception:
+            os.remove(temp_name)
+            raise
+
+    def clear(self):
+        for file_name in os.listdir(self._path_):
+            if file_name.endswith('.cache'):
+                os.remove(os.path.join(self._path_, file_name))
+
+
+class RedisCache(BaseCache):
+    """
+    A cache store keeping the pickled values in a Redis compatible server, which can be shared by all
+    processes and hosts. It requires the `redis` package to be installed.
+
+    Args:
+        url (str): The URL of the server, e.g. ``redis://localhost:6379/0``.
+        ttl (int or None): The number of seconds a value is kept.
+        prefix (str): The prefix of all keys written by this store.
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', ttl=None, prefix='pyramid_oereb:'):
+        super(RedisCache, self).__init__(ttl=ttl)
+        try:
+            import redis
+        except ImportError:
+            raise ConfigurationError('The package "redis" has to be installed to use the RedisCache.')
+        self._client_ = redis.Redis.from_url(url)
+        self._prefix_ = prefix
+
+    def get(self, key, default=None):
+        value = self._client_.get(self._prefix_ + key)
+        if value is None:
+            return default
+        return pickle.loads(value)
+
+    def set(self, key, value):
+        self._client_.set(
+            self._prefix_ + key,
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            ex=self._ttl_
+        )
+
+    def clear(self):
+        keys = list(self._client_.scan_iter(match=self._prefix_ + '*'))
+        if keys:
+            self._client_.delete(*keys)
+
+
+class TieredCache(BaseCache):
+    """
+    A cache store combining a store in the memory of the process with a store shared by all processes, e.g. a
+    DiskCache or a RedisCache. Values are read from the local store first. Values found in the shared store
+    only are kept in the local store for the next reads.
+
+    Args:
+        local (pyramid_oereb.core.cache.BaseCache): The store of the process.
+        shared (pyramid_oereb.core.cache.BaseCache or None): The shared store. Only the local store is used
+            if None.
+    """
+
+    def __init__(self, local, shared=None):
+        super(TieredCache, self).__init__(ttl=local.ttl)
+        self._local_ = local
+        self._shared_ = shared
+
+    def get(self, key, default=None):
+        value = self._local_.get(key)
+        if value is None and self._shared_ is not None:
+            value = self._shared_.get(key)
+            if value is not None:
+                self._local_.set(key, value)
+        return default if value is None else value
+
+    def set(self, key, value):
+        self._local_.set(key, value)
+        if self._shared_ is not None:
+            self._shared_.set(key, value)
+
+    def clear(self):
+        self._local_.clear()
+        if self._shared_ is not None:
+            self._shared_.clear()
+
+
+def create_cache(cache_config):
+    """
+    Creates the cache store described by the passed configuration.
+
+    Args:
+        cache_config (dict or None): The configuration with the dotted name of the store `class` and its
+            `params`.
+
+    Returns:
+        pyramid_oereb.core.cache.BaseCache or None: The cache store or None if no store is configured.
+    """
+    if not cache_config or not cache_config.get('class'):
+        return None
+    cache_class = DottedNameResolver().maybe_resolve(cache_config.get('class'))
+    return cache_class(**(cache_config.get('params') or {}))
+
+
+class DataIntegrationDates(object):
+    """
+    Provides the latest data integration date of PLR sources. The date of a source is queried at most once
+    per check interval.
+
+    Args:
+        data_check_interval (int): The number of seconds a queried date is reused.
+    """
+
+    def __init__(self, data_check_interval=60):
+        self._data_check_interval_ = data_check_interval
+        self._dates_ = dict()
+        self._lock_ = threading.Lock()
+
+    def get(self, plr_source):
+        """
+        Returns the latest data integration date of the passed source.
+
+        Args:
+            plr_source (pyramid_oereb.core.sources.plr.PlrBaseSource): The PLR source.
+
+        Returns:
+            str: The date in ISO format or 'None' if the source does not provide it.
+        """
+        code = plr_source.info.get('code')
+        now = time.time()
+        with self._lock_:
+            checked, date = self._dates_.get(code, (None, None))
+        if checked is None or now - checked >= self._data_check_interval_:
+            date = plr_source.get_data_integration_date()
+            date = date.isoformat() if isinstance(date, datetime) else str(date)
+            with self._lock_:
+                self._dates_[code] = (now, date)
+        return date
+
+
+class ExtractCache(object):
+    """
+    Caches the processed extracts, which are rendered again with a new identifier and creation date for
+    every request. The cache keys contain a data version built from the latest data integration date of
+    each PLR source, the version of the municipalities, disclaimers and glossary loaded by the
+    configuration and a hash of the real estate data. A change of any of them therefore leads to new keys
+    and the previously cached extracts are not used anymore.
+
+    Args:
+        store (pyramid_oereb.core.cache.BaseCache): The store keeping the extracts.
+        plr_sources (list of pyramid_oereb.core.sources.plr.PlrBaseSource): The PLR sources of the
+            extract.
+        data_check_interval (int): The number of seconds the data version is reused before the data
+            integration dates are queried again.
+    """
+
+    def __init__(self, store, plr_sources, data_check_interval=60):
+        self._store_ = store
+        self._plr_sources_ = plr_sources
+        self._data_integration_dates_ = DataIntegrationDates(data_check_interval)
+
+    @property
+    def store(self):
+        """
+        pyramid_oereb.core.cache.BaseCache: The store keeping the extracts.
+        """
+        return self._store_
+
+    def get_data_version(self):
+        """
+        Returns the current data version. It is a hash of the latest data integration dates of all PLR
+        sources.
+
+        Returns:
+            str: The data version.
+        """
+        dates = [self._data_integration_dates_.get(plr_source) for plr_source in self._plr_sources_]
+        return hashlib.sha1('|'.join(dates).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get_real_estate_version(real_estate):
+        """
+        Returns a hash of the real estate data used in the extract.
+
+        Args:
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real estate.
+
+        Returns:
+            str: The version of the real estate.
+        """
+        values = [
+            real_estate.type,
+            real_estate.canton,
+            real_estate.municipality,
+            real_estate.fosnr,
+            real_estate.land_registry_area,
+            real_estate.subunit_of_land_register,
+            real_estate.subunit_of_land_register_designation,
+            real_estate.metadata_of_geographical_base_data,
+            real_estate.limit.wkt
+        ]
+        return hashlib.sha1('|'.join([str(value) for value in values]).encode('utf-8')).hexdigest()
+
+    def get_key(self, params, real_estate, application_url):
+        """
+        Returns the cache key of an extract.
+
+        Args:
+            params (pyramid_oereb.views.webservice.Parameter): The parameters of the extract request.
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real estate of the
+                extract.
+            application_url (str): The URL of the application, which is used in the processed extract.
+
+        Returns:
+            str: The cache key.
+        """
+        return '|'.join([
+            'extract',
+            self.get_data_version(),
+            Config.get_extract_data_version(),
+            self.get_real_estate_version(real_estate),
+            str(real_estate.egrid),
+            str(real_estate.identdn),
+            str(real_estate.number),
+            str(params.as_of_date),
+            str(params.format),
+            str(params.language),
+            ','.join(sorted(params.topics or [])),
+            str(params.with_geometry),
+            str(params.images),
+            str(params.signed),
+            application_url
+        ])
+
+    def get(self, key):
+        """
+        Returns a shallow copy of the cached extract with a new identifier and creation date. The other
+        records are shared with the cached extract, so the parts built from the records kept by the
+        configuration (e.g. the glossary) are reused by the renderers. Stores which serialize the extracts
+        (DiskCache, RedisCache) return new records anyway.
+
+        Args:
+            key (str): The cache key of the extract.
+
+        Returns:
+            pyramid_oereb.lib.records.extract.ExtractRecord or None: The cached extract or None if it is
+            not cached.
+        """
+        extract = self._store_.get(key)
+        if extract is None:
+            return None
+        extract = copy.copy(extract)
+        extract.reissue()
+        return extract
+
+    def set(self, key, extract):
+        """
+        Stores a processed extract. It is shared by all requests getting it from the cache, so it must not
+        be modified anymore.
+
+        Args:
+            key (str): The cache key of the extract.
+            extract (pyramid_oereb.lib.records.extract.ExtractRecord): The extract to cache.
+        """
+        self._store_.set(key, extract)
+
+
+class PlrRecordCache(object):
+    """
+    Caches the records read by a PLR source for a real estate. The records are language neutral and can be
+    used for all formats and languages of the extract, except for sources which declare their records as
+    language dependent. The cache keys contain the latest data integration date of the theme, so a new data
+    integration of a theme only affects the records of this theme. They also contain a hash of the real estate
+    data, because the records are calculated on its limit, and the date the records are published at,
+    because the sources only read the records published at this date.
+
+    The cached records are copied when they are stored and when they are returned, because the records are
+    modified while the extract is processed.
+
+    Args:
+        store (pyramid_oereb.core.cache.BaseCache): The store keeping the records.
+        data_check_interval (int): The number of seconds the data integration date of a theme is reused
+            before it is queried again.
+    """
+
+    def __init__(self, store, data_check_interval=60):
+        self._store_ = store
+        self._data_integration_dates_ = DataIntegrationDates(data_check_interval)
+
+    @property
+    def store(self):
+        """
+        pyramid_oereb.core.cache.BaseCache: The store keeping the records.
+        """
+        return self._store_
+
+    def get_key(self, plr_source, params, real_estate):
+        """
+        Returns the cache key of the records of a source for a real estate.
+
+        Args:
+            plr_source (pyramid_oereb.core.sources.plr.PlrBaseSource): The PLR source.
+            params (pyramid_oereb.views.webservice.Parameter): The parameters of the extract request.
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real estate.
+
+        Returns:
+            str: The cache key.
+        """
+        parts = [
+            'plr',
+            str(plr_source.info.get('code')),
+            self._data_integration_dates_.get(plr_source),
+            str(real_estate.egrid),
+            str(real_estate.identdn),
+            str(real_estate.number),
+            ExtractCache.get_real_estate_version(real_estate),
+            str(params.as_of_date)
+        ]
+        if plr_source.language_dependent_records:
+            parts.append(str(params.language))
+        return '|'.join(parts)
+
+    def get(self, key):
+        """
+        Returns a copy of the cached records.
+
+        Args:
+            key (str): The cache key of the records.
+
+        Returns:
+            list or None: The records or None if they are not cached.
+        """
+        records = self._store_.get(key)
+        if records is None:
+            return None
+        return copy.deepcopy(records)
+
+    def set(self, key, records):
+        """
+        Stores a copy of the records.
+
+        Args:
+            key (str): The cache key of the records.
+            records (list): The records read by the source.
+        """
+        self._store_.set(key, copy.deepcopy(records))
+
+
+class SourceRecordCache(object):
+    """
+    Keeps records built from the static data of a PLR source in memory, e.g. the legend entries with their
+    decoded symbols. The records are shared between all requests, so they must not be modified. All records
+    are dropped as soon as the latest data integration date of the source changes.
+
+    Args:
+        data_check_interval (int): The number of seconds the data integration date of the source is reused
+            before it is queried again.
+    """
+
+    def __init__(self, data_check_interval=60):
+        self._data_integration_dates_ = DataIntegrationDates(data_check_interval)
+        self._records_ = dict()
+        self._version_ = None
+        self._lock_ = threading.Lock()
+
+    def validate(self, plr_source):
+        """
+        Drops all records if the data of the source has been integrated again since they have been built.
+
+        Args:
+            plr_source (pyramid_oereb.core.sources.plr.PlrBaseSource): The PLR source.
+        """
+        version = self._data_integration_dates_.get(plr_source)
+        with self._lock_:
+            if version != self._version_:
+                self._records_ = dict()
+                self._version_ = version
+
+    def get(self, key, build):
+        """
+        Returns the record of the passed key. It is built and kept if it is not available yet.
+
+        Args:
+            key (hashable): The key of the record, e.g. the id in the database.
+            build (callable): The function building the record. It is called without arguments.
+
+        Returns:
+            *: The record.
+        """
+        with self._lock_:
+            record = self._records_.get(key)
+        if record is None:
+            record = build()
+            with self._lock_:
+                self._records_[key] = record
+        return record
+
+    def __contains__(self, key):
+        with self._lock_:
+            return key in self._records_
+
+    def __len__(self):
+        with self._lock_:
+            return len(self._records_)
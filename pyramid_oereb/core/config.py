@@ -2,6 +2,8 @@
 import os
 
 import logging
+import threading
+import time
 import yaml
 from io import open as ioopen
 from pyramid.config import ConfigurationError
@@ -20,6 +22,9 @@ from pyramid_oereb.core.readers.document import DocumentReader
 from pyramid_oereb.core.readers.office import OfficeReader
 from pyramid_oereb.core.readers.general_information import GeneralInformationReader
 from pyramid_oereb.core.readers.map_layering import MapLayeringReader
+from pyramid_oereb.core.readers.municipality import MunicipalityReader
+from pyramid_oereb.core.readers.disclaimer import DisclaimerReader
+from pyramid_oereb.core.readers.glossary import GlossaryReader
 from sqlalchemy.exc import ProgrammingError
 
 log = logging.getLogger(__name__)
@@ -43,6 +48,12 @@ class Config(object):
     map_layering = None
     theme_document = None
     offices = None
+    municipalities = None
+    disclaimers = None
+    glossaries = None
+    _municipalities_by_fosnr = dict()
+    _extract_data_loaded = None
+    _extract_data_lock = threading.Lock()
 
     @staticmethod
     def init(configfile, configsection, c2ctemplate_style=False, init_data=False):
@@ -68,6 +79,7 @@ class Config(object):
             Config.init_map_layering()
             Config.init_logos()
             Config.assemble_relation_themes_documents()
+            Config.init_extract_data()
 
     @staticmethod
     def get_config():
@@ -206,6 +218,165 @@ class Config(object):
         )
         return office_reader.read()
 
+    @staticmethod
+    def init_municipalities():
+        try:
+            municipalities = Config._read_municipalities()
+        except ProgrammingError:
+            municipalities = None
+        Config._municipalities_by_fosnr = {
+            int(municipality.fosnr): municipality for municipality in municipalities or []
+        }
+        Config.municipalities = municipalities
+
+    @staticmethod
+    def init_disclaimers():
+        try:
+            Config.disclaimers = Config._read_disclaimers()
+        except ProgrammingError:
+            Config.disclaimers = None
+
+    @staticmethod
+    def init_glossaries():
+        try:
+            Config.glossaries = Config._read_glossaries()
+        except ProgrammingError:
+            Config.glossaries = None
+
+    @staticmethod
+    def init_extract_data():
+        """
+        Loads the municipalities, the disclaimers and the glossary, which are used by every extract.
+        """
+        Config.init_municipalities()
+        Config.init_disclaimers()
+        Config.init_glossaries()
+        Config._extract_data_loaded = time.time()
+
+    @staticmethod
+    def refresh_extract_data(force=False):
+        """
+        Reloads the municipalities, the disclaimers and the glossary if they have not been loaded yet, if
+        one of them could not be read (e.g. because the tables did not exist yet at startup) or if they are
+        older than the configured `extract_data_refresh_interval` (in seconds). Without this setting, they are
+        kept until the application is restarted or the reload is forced.
+
+        Args:
+            force (bool): Reload the data regardless of the refresh interval, e.g. after an update of
+                the municipalities.
+        """
+        loaded = Config._extract_data_loaded
+        missing = Config.municipalities is None or Config.disclaimers is None or Config.glossaries is None
+        if not force and not missing and loaded is not None:
+            interval = Config.get('extract_data_refresh_interval')
+            if interval is None or time.time() - loaded < interval:
+                return
+        with Config._extract_data_lock:
+            # Another thread may have reloaded the data while we were waiting for the lock.
+            if Config._extract_data_loaded == loaded:
+                Config.init_extract_data()
+
+    @staticmethod
+    def get_extract_data_version():
+        """
+        Returns the version of the municipalities, the disclaimers and the glossary after refreshing them.
+        It changes with every reload of the data.
+
+        Returns:
+            str: The version of the extract data.
+        """
+        Config.refresh_extract_data()
+        return str(Config._extract_data_loaded)
+
+    @staticmethod
+    def _read_municipalities():
+        municipality_config = Config.get_municipality_config()
+        if municipality_config is None:
+            raise ConfigurationError("Missing configuration for municipalities")
+        municipality_reader = MunicipalityReader(
+            municipality_config.get('source').get('class'),
+            **municipality_config.get('source').get('params')
+        )
+        return municipality_reader.read(None)
+
+    @staticmethod
+    def _read_disclaimers():
+        disclaimer_config = Config.get_disclaimer_config()
+        if disclaimer_config is None:
+            raise ConfigurationError("Missing configuration for disclaimers")
+        disclaimer_reader = DisclaimerReader(
+            disclaimer_config.get('source').get('class'),
+            **disclaimer_config.get('source').get('params')
+        )
+        return disclaimer_reader.read(None)
+
+    @staticmethod
+    def _read_glossaries():
+        glossary_config = Config.get_glossary_config()
+        if glossary_config is None:
+            raise ConfigurationError("Missing configuration for glossary")
+        glossary_reader = GlossaryReader(
+            glossary_config.get('source').get('class'),
+            **glossary_config.get('source').get('params')
+        )
+        return glossary_reader.read(None)
+
+    @staticmethod
+    def get_municipalities():
+        """
+        Returns all municipalities.
+
+        Returns:
+            list of pyramid_oereb.core.records.municipality.MunicipalityRecord: The municipalities.
+        """
+        assert Config._config is not None
+        Config.refresh_extract_data()
+        return Config.municipalities
+
+    @staticmethod
+    def get_municipality_by_fosnr(fosnr):
+        """
+        Returns the municipality with the specified federal number.
+
+        Args:
+            fosnr (int): The federal number of the municipality defined by the statistics office.
+
+        Returns:
+            pyramid_oereb.core.records.municipality.MunicipalityRecord or None: The municipality or
+            None if there is no municipality with this number.
+        """
+        assert Config._config is not None
+        Config.refresh_extract_data()
+        try:
+            fosnr = int(fosnr)
+        except (TypeError, ValueError):
+            return None
+        return Config._municipalities_by_fosnr.get(fosnr)
+
+    @staticmethod
+    def get_disclaimers():
+        """
+        Returns all disclaimers.
+
+        Returns:
+            list of pyramid_oereb.core.records.disclaimer.DisclaimerRecord: The disclaimers.
+        """
+        assert Config._config is not None
+        Config.refresh_extract_data()
+        return Config.disclaimers
+
+    @staticmethod
+    def get_glossaries():
+        """
+        Returns all glossary entries.
+
+        Returns:
+            list of pyramid_oereb.core.records.glossary.GlossaryRecord: The glossary entries.
+        """
+        assert Config._config is not None
+        Config.refresh_extract_data()
+        return Config.glossaries
+
     @staticmethod
     def get_general_information():
         """
@@ -895,7 +1066,7 @@ class Config(object):
         """
         assert Config._config is not None
 
-        return Config._config.get('models')
+        return Config._config.get('oereblex')
 
     @staticmethod
     def get(key, default=None):
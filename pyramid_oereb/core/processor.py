@@ -1,26 +1,33 @@
 # -*- coding: utf-8 -*-
 import logging
+import os
+import threading
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from operator import attrgetter
 
 from pyramid.path import DottedNameResolver
 
+from pyramid_oereb.core.cache import ExtractCache, create_cache
 from pyramid_oereb.core.config import Config
 from pyramid_oereb.core.records.plr import PlrRecord
-from pyramid_oereb.core.readers.disclaimer import DisclaimerReader
 from pyramid_oereb.core.readers.extract import ExtractReader
-from pyramid_oereb.core.readers.glossary import GlossaryReader
-from pyramid_oereb.core.readers.municipality import MunicipalityReader
 from pyramid_oereb.core.readers.real_estate import RealEstateReader
+from pyramid_oereb.core.records.view_service import ViewServiceRecord
+from pyramid_oereb.core.timing import get_timings
 
 
 log = logging.getLogger(__name__)
 
+_processor = None
+_processor_pid = None
+_processor_lock = threading.Lock()
+
 
 class Processor(object):
 
-    def __init__(self, real_estate_reader, municipality_reader, disclaimer_reader,
-                 glossary_reader, plr_sources, extract_reader):
+    def __init__(self, real_estate_reader, plr_sources, extract_reader, extract_cache=None):
         """
         The Processor class is directly bound to the get_extract_by_id service in this application. It's task
         is to unsnarl the difficult model of the oereb extract and handle all objects inside this extract
@@ -30,26 +37,28 @@ class Processor(object):
         Args:
             real_estate_reader (pyramid_oereb.lib.readers.real_estate.RealEstateReader): The
                 real estate reader instance for runtime use.
-            municipality_reader (pyramid_oereb.lib.readers.municipality.MunicipalityReader): The
-                municipality reader instance for runtime use.
-            disclaimer_reader
-                (pyramid_oereb.core.readers.disclaimer.DisclaimerReader):
-                The disclaimer of liability reader instance for runtime use.
-            glossary_reader (pyramid_oereb.lib.readers.glossary.GlossaryReader): The glossary
-                reader instance for runtime use.
             plr_sources (list of pyramid_oereb.standard.sources.plr.DatabaseSource): The
                 public law restriction source instances for runtime use wrapped in a list.
             extract_reader (pyramid_oereb.lib.readers.extract.ExtractReader): The extract reader
                 instance for runtime use.
+            extract_cache (pyramid_oereb.core.cache.ExtractCache or None): The cache of the processed
+                extracts. None if extracts are not cached.
         """
         self._real_estate_reader_ = real_estate_reader
-        self._municipality_reader_ = municipality_reader
-        self._disclaimer_reader_ = disclaimer_reader
-        self._glossary_reader_ = glossary_reader
         self._plr_sources_ = plr_sources
         self._extract_reader_ = extract_reader
-
-    def filter_published_documents(self, record):
+        self._extract_cache_ = extract_cache
+        # The WMS images of all extracts are downloaded by one pool, so the number of download threads does
+        # not grow with the number of concurrent requests.
+        self._wms_executor_ = None
+        wms_max_workers = (Config.get('wms_download') or {}).get('max_workers') or 1
+        if wms_max_workers > 1:
+            self._wms_executor_ = ThreadPoolExecutor(
+                max_workers=wms_max_workers,
+                thread_name_prefix='wms_download'
+            )
+
+    def filter_published_documents(self, record, as_of_date=None):
         """
         Filter only published documents.
 
@@ -57,18 +66,20 @@ class Processor(object):
             record (pyramid_oereb.core.records.plr.PlrRecord or
                 pyramid_oereb.core.records.documents.DocumentRecord): The public law restriction or
                 document record.
+            as_of_date (datetime.date or None): The date of the extract the documents have to be
+                published at. Defaults to today.
         """
         published_docs = list()
         if isinstance(record, PlrRecord):
             for doc in record.documents:
-                if doc.published:
+                if doc.published_at(as_of_date):
                     published_docs.append(doc)
                 else:
                     log.debug("filtering out non-published document {}".format(doc))
             record.documents = published_docs
         return record
 
-    def plr_tolerance_check(self, extract):
+    def plr_tolerance_check(self, extract, as_of_date=None):
         """
         The function checking if the found plr results exceed the minimal surface or length
         value defined in the configuration and should therefor be represented in the extract
@@ -77,6 +88,8 @@ class Processor(object):
         Args:
             extract (pyramid_oereb.lib.records.extract.ExtractRecord): The extract in it's
                 unvalidated form
+            as_of_date (datetime.date or None): The date of the extract the records have to be
+                published at. Defaults to today.
 
         Returns:
             pyramid_oereb.lib.records.extract.ExtractRecord: Returns the updated extract
@@ -87,12 +100,13 @@ class Processor(object):
         outside_plrs = []
 
         for public_law_restriction in real_estate.public_law_restrictions:
-            if isinstance(public_law_restriction, PlrRecord) and public_law_restriction.published:
+            if isinstance(public_law_restriction, PlrRecord) and \
+                    public_law_restriction.published_at(as_of_date):
                 # Test if the geometries list is now empty - if so remove plr from plr list
-                if public_law_restriction.calculate(real_estate):
+                if public_law_restriction.calculate(real_estate, as_of_date):
                     log.debug("plr_tolerance_check: keeping as potentially concerned plr {}".
                               format(public_law_restriction))
-                    inside_plrs.append(self.filter_published_documents(public_law_restriction))
+                    inside_plrs.append(self.filter_published_documents(public_law_restriction, as_of_date))
                 else:
                     log.debug("plr_tolerance_check: removing from the concerned plrs {}".
                               format(public_law_restriction))
@@ -122,11 +136,12 @@ class Processor(object):
             # Need to reorder, because order must stay exactly as defined in configuration
             extract.not_concerned_theme = sorted(extract.not_concerned_theme, key=attrgetter('extract_index'))
 
-        real_estate.public_law_restrictions = self.get_legend_entries(inside_plrs, outside_plrs)
+        with get_timings().measure('legend'):
+            real_estate.public_law_restrictions = self.get_legend_entries(inside_plrs, outside_plrs)
         return extract
 
     @staticmethod
-    def view_service_handling(real_estate, images, format, language):
+    def view_service_handling(real_estate, images, format, language, executor=None):
         """
         Handles all view service related stuff. In the moment this is:
             * construction of the correct url (reference_wms, multilingual) depending on the real estate
@@ -139,23 +154,68 @@ class Processor(object):
             format (string): The format currently used. For 'pdf' format,
                 the used map size will be adapted to the pdf format.
             language (string or None): Which language of the reference WMS should be used
+            executor (concurrent.futures.ThreadPoolExecutor or None): The pool downloading the images
+                concurrently. The images are downloaded one after another without pool.
 
         Returns:
             pyramid_oereb.lib.records.real_estate.RealEstateRecord: The updated extract.
         """
         language = language or Config.get('default_language')
-        real_estate.plan_for_land_register.get_full_wms_url(real_estate, format, language)
-        real_estate.plan_for_land_register_main_page.get_full_wms_url(real_estate, format, language)
+        view_services = [
+            real_estate.plan_for_land_register,
+            real_estate.plan_for_land_register_main_page
+        ]
+        view_services.extend([
+            public_law_restriction.view_service
+            for public_law_restriction in real_estate.public_law_restrictions
+        ])
+        for view_service in view_services:
+            view_service.get_full_wms_url(real_estate, format, language)
         if images:
-            real_estate.plan_for_land_register.download_wms_content(language)
-            real_estate.plan_for_land_register_main_page.download_wms_content(language)
-
-        for public_law_restriction in real_estate.public_law_restrictions:
-            public_law_restriction.view_service.get_full_wms_url(real_estate, format, language)
-            if images:
-                public_law_restriction.view_service.download_wms_content(language)
+            with get_timings().measure('wms_download'):
+                Processor.download_images(view_services, language, executor)
         return real_estate
 
+    @staticmethod
+    def download_images(view_services, language, executor=None):
+        """
+        Downloads the images of the passed view services for the requested language. Each distinct WMS URL
+        is only requested once. If an executor is passed, the images are downloaded concurrently by its
+        threads. The processor uses a pool of `wms_download.max_workers` threads shared by all extracts.
+
+        Args:
+            view_services (list of pyramid_oereb.core.records.view_service.ViewServiceRecord): The view
+                services to download the images for.
+            language (string): The language for which the images should be downloaded.
+            executor (concurrent.futures.ThreadPoolExecutor or None): The pool downloading the images
+                concurrently. The images are downloaded one after another without pool.
+
+        Raises:
+            LookupError: Raised if an image could not be downloaded.
+            AttributeError: Raised if a WMS URL isn't valid at all.
+        """
+        downloads = OrderedDict()
+        for view_service in view_services:
+            wms_language = view_service.get_wms_language(language)
+            wms = view_service.reference_wms.get(wms_language)
+            downloads.setdefault(wms, []).append((view_service, wms_language))
+
+        if executor is not None and len(downloads) > 1:
+            futures = [executor.submit(ViewServiceRecord.download_image, wms) for wms in downloads]
+            try:
+                # Results are collected in order, so the first failing URL raises like in the
+                # sequential download.
+                images = [future.result() for future in futures]
+            finally:
+                for future in futures:
+                    future.cancel()
+        else:
+            images = [ViewServiceRecord.download_image(wms) for wms in downloads]
+
+        for targets, image in zip(downloads.values(), images):
+            for view_service, wms_language in targets:
+                view_service.image[wms_language] = image
+
     @staticmethod
     def get_legend_entries(inside_plrs, outside_plrs):
         """
@@ -220,48 +280,37 @@ class Processor(object):
         return self._real_estate_reader_
 
     @property
-    def municipality_reader(self):
+    def plr_sources(self):
         """
         Returns:
-            pyramid_oereb.lib.readers.municipality.MunicipalityReader: The municipality reader
-            reader instance.
+            list of pyramid_oereb.core.sources.plr.DatabaseSource: The list of plr
+            source instances.
         """
-        return self._municipality_reader_
+        return self._plr_sources_
 
     @property
-    def disclaimer_reader(self):
+    def extract_reader(self):
         """
         Returns:
-            pyramid_oereb.lib.readers.disclaimer.DisclaimerReader:
-            The disclaimer reader reader instance.
+            pyramid_oereb.lib.readers.extract.ExtractReader: The extract reader instance.
         """
-        return self._disclaimer_reader_
+        return self._extract_reader_
 
-    @property
-    def glossary_reader(self):
+    def shutdown(self):
         """
-        Returns:
-            pyramid_oereb.lib.readers.glossary.GlossaryReader: The glossary reader reader
-            instance.
+        Stops the thread pools of the processor, e.g. when it is replaced by a new one.
         """
-        return self._glossary_reader_
+        self._extract_reader_.shutdown()
+        if self._wms_executor_ is not None:
+            self._wms_executor_.shutdown(wait=False)
 
     @property
-    def plr_sources(self):
+    def extract_cache(self):
         """
         Returns:
-            list of pyramid_oereb.core.sources.plr.DatabaseSource: The list of plr
-            source instances.
+            pyramid_oereb.core.cache.ExtractCache or None: The cache of the processed extracts.
         """
-        return self._plr_sources_
-
-    @property
-    def extract_reader(self):
-        """
-        Returns:
-            pyramid_oereb.lib.readers.extract.ExtractReader: The extract reader instance.
-        """
-        return self._extract_reader_
+        return self._extract_cache_
 
     def process(self, real_estate, params, sld_url):
         """
@@ -279,17 +328,27 @@ class Processor(object):
             pyramid_oereb.lib.records.extract.ExtractRecord: The generated extract record.
         """
         log.debug("process() start")
-        municipality = self._municipality_reader_.read(params, real_estate.fosnr)[0]
-        disclaimers = self._disclaimer_reader_.read(params)
-        glossaries = self._glossary_reader_.read(params)
-        extract_raw = self._extract_reader_.read(params, real_estate, municipality)
-        extract = self.plr_tolerance_check(extract_raw)
+        timings = get_timings()
+        # The municipalities, the disclaimers and the glossary are kept in memory by the configuration.
+        with timings.measure('municipality'):
+            municipality = Config.get_municipality_by_fosnr(real_estate.fosnr)
+            if municipality is None:
+                raise LookupError('No municipality found with fosnr {0}'.format(real_estate.fosnr))
+        with timings.measure('disclaimer'):
+            disclaimers = Config.get_disclaimers()
+        with timings.measure('glossary'):
+            glossaries = Config.get_glossaries()
+        with timings.measure('plr'):
+            extract_raw = self._extract_reader_.read(params, real_estate, municipality)
+        with timings.measure('tolerance_check'):
+            extract = self.plr_tolerance_check(extract_raw, params.as_of_date)
 
         resolver = DottedNameResolver()
         sort_within_themes_method_string = Config.get('extract').get('sort_within_themes_method')
         if sort_within_themes_method_string:
             sort_within_themes_method = resolver.resolve(sort_within_themes_method_string)
-            extract = sort_within_themes_method(extract)
+            with timings.measure('sort_within_themes'):
+                extract = sort_within_themes_method(extract)
         else:
             log.info("No configuration is provided for extract sort_within_themes_method;"
                      " no further sorting is applied.")
@@ -298,7 +357,14 @@ class Processor(object):
         # care about the circumstance that after tolerance check plrs will be dismissed which were
         # recognized as intersecting before. To avoid this the tolerance check is gathering all plrs
         # intersecting and not intersecting and starts the legend entry sorting after.
-        self.view_service_handling(extract.real_estate, params.images, params.format, params.language)
+        with timings.measure('view_service'):
+            self.view_service_handling(
+                extract.real_estate,
+                params.images,
+                params.format,
+                params.language,
+                self._wms_executor_
+            )
 
         extract.disclaimers = disclaimers
         extract.glossaries = glossaries
@@ -309,17 +375,14 @@ class Processor(object):
 def create_processor():
     """
     Creates and returns a processor based on the application configuration.
-    You should use one (and only one) processor per request. Otherwise some results can be mixed or
-    missing.
+    Creating a processor instantiates all readers and sources, which is expensive. Use
+    :func:`get_processor` to obtain the processor shared by all requests of this process.
 
     Returns:
         pyramid_oereb.lib.processor.Processor: A processor.
     """
 
     real_estate_config = Config.get_real_estate_config()
-    municipality_config = Config.get_municipality_config()
-    disclaimer_config = Config.get_disclaimer_config()
-    glossary_config = Config.get_glossary_config()
 
     plr_cadastre_authority = Config.get_plr_cadastre_authority()
 
@@ -328,21 +391,6 @@ def create_processor():
         **real_estate_config.get('source').get('params')
     )
 
-    municipality_reader = MunicipalityReader(
-        municipality_config.get('source').get('class'),
-        **municipality_config.get('source').get('params')
-    )
-
-    disclaimer_reader = DisclaimerReader(
-        disclaimer_config.get('source').get('class'),
-        **disclaimer_config.get('source').get('params')
-    )
-
-    glossary_reader = GlossaryReader(
-        glossary_config.get('source').get('class'),
-        **glossary_config.get('source').get('params')
-    )
-
     plr_sources = []
     for plr in Config.get('plrs'):
         plr_source_class = DottedNameResolver().maybe_resolve(plr.get('source').get('class'))
@@ -353,11 +401,59 @@ def create_processor():
         plr_cadastre_authority
     )
 
+    extract_cache = None
+    extract_cache_config = (Config.get_extract_config() or {}).get('cache')
+    extract_cache_store = create_cache(extract_cache_config)
+    if extract_cache_store is not None:
+        extract_cache = ExtractCache(
+            extract_cache_store,
+            plr_sources,
+            data_check_interval=extract_cache_config.get('data_check_interval', 60)
+        )
+
     return Processor(
         real_estate_reader=real_estate_reader,
-        municipality_reader=municipality_reader,
-        disclaimer_reader=disclaimer_reader,
-        glossary_reader=glossary_reader,
         plr_sources=plr_sources,
         extract_reader=extract_reader,
+        extract_cache=extract_cache,
     )
+
+
+def init_processor():
+    """
+    Creates the processor which is shared by all requests of this process. It may be called to rebuild the
+    processor, e.g. after the configuration has been changed. The replaced processor is shut down.
+
+    Returns:
+        pyramid_oereb.core.processor.Processor: The shared processor.
+    """
+    global _processor, _processor_pid
+    with _processor_lock:
+        previous = _processor if _processor_pid == os.getpid() else None
+        _processor = create_processor()
+        _processor_pid = os.getpid()
+    if previous is not None:
+        previous.shutdown()
+    return _processor
+
+
+def get_processor():
+    """
+    Returns the processor shared by all requests of this process. It is created on first use in each
+    process, so the processes of a server forking its workers after loading the application (e.g.
+    gunicorn with `--preload`) do not share the thread pools and the connections of their sources. All per
+    request state is kept in thread local contexts of the sources, so the returned instance can be used by
+    concurrent requests.
+
+    Returns:
+        pyramid_oereb.core.processor.Processor: The shared processor.
+    """
+    global _processor, _processor_pid
+    if _processor is None or _processor_pid != os.getpid():
+        with _processor_lock:
+            if _processor is None or _processor_pid != os.getpid():
+                # A processor inherited from the parent process is not shut down, its threads do not
+                # exist in this process.
+                _processor = create_processor()
+                _processor_pid = os.getpid()
+    return _processor
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+This package provides the on demand profiling of single requests. It is configured in the extract section
+of the configuration::
+
+    extract:
+      profiling:
+        enabled: true
+        secret: a-long-random-string
+        path: /tmp/pyramid_oereb_profiles
+
+A request is profiled if it passes the secret in the `X-Oereb-Profile` header or the `PROFILE` parameter.
+The statistics of the profiled request are written with :mod:`cProfile` to a pstats file in the configured
+directory, which can be analyzed with :mod:`pstats` or visualized with tools like snakeviz.
+
+Only the thread handling the request is profiled. Work delegated to thread pools (like the concurrent
+reading of the PLR sources) appears as waiting time.
+"""
+import cProfile
+import hmac
+import logging
+import os
+import re
+import time
+
+log = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Oereb-Profile'
+PROFILE_PARAMETER = 'PROFILE'
+
+_invalid_file_name_characters = re.compile(r'[^A-Za-z0-9_.\-]')
+
+
+def is_profiling_requested(request, profiling_config):
+    """
+    Checks if the request asks for profiling and profiling is enabled.
+
+    Args:
+        request (pyramid.request.Request): The request.
+        profiling_config (dict or None): The profiling configuration.
+
+    Returns:
+        bool: True if the request has to be profiled.
+    """
+    if not profiling_config or not profiling_config.get('enabled', False):
+        return False
+    secret = profiling_config.get('secret')
+    if not secret or not profiling_config.get('path'):
+        log.warning('Profiling is enabled, but no secret or path is configured. No request is profiled.')
+        return False
+    token = request.headers.get(PROFILE_HEADER)
+    if token is None:
+        params = {k.upper(): v for k, v in request.params.items()}
+        token = params.get(PROFILE_PARAMETER)
+    if token is None:
+        return False
+    return hmac.compare_digest(str(token).encode('utf-8'), str(secret).encode('utf-8'))
+
+
+def profile_call(func, path, tag):
+    """
+    Calls the passed function with a profiler and writes the statistics to the passed directory.
+
+    Args:
+        func (callable): The function to profile. It is called without arguments.
+        path (str): The directory of the statistics files. It is created if it does not exist.
+        tag (str): The tag used in the file name, e.g. the EGRID and the format of the extract.
+
+    Returns:
+        *: The result of the function.
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        os.makedirs(path, exist_ok=True)
+        file_name = os.path.join(path, '{0}_{1}.pstats'.format(
+            _invalid_file_name_characters.sub('_', tag),
+            int(time.time() * 1000)
+        ))
+        profiler.dump_stats(file_name)
+        log.info(u'Profile of the request written to {0}'.format(file_name))
@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from pyramid.path import DottedNameResolver
 
 from shapely.geometry import box
+from sqlalchemy import literal, select, union_all
 from timeit import default_timer as timer
 
+from pyramid_oereb.core.cache import PlrRecordCache, create_cache
 from pyramid_oereb.core.config import Config
 from pyramid_oereb.core.records.extract import ExtractRecord
 from pyramid_oereb.core.records.plr import PlrRecord, EmptyPlrRecord
 from pyramid_oereb.core.records.view_service import ViewServiceRecord
+from pyramid_oereb.core.timing import bind_timings, get_timings
 
 log = logging.getLogger(__name__)
 
@@ -19,10 +24,20 @@ class ExtractReader(object):
     (:ref:`api-pyramid_oereb-core-records-extract-extractrecord`). This is the point where all necessary
     and extract related components are bound together.
 
-    Attributes:
-        extract (pyramid_oereb.lib.records.extract.ExtractRecord or None): The extract as a record
-            representation. On initialisation this is None. It will be set by calling the read method of the
-            instance.
+    The reader is shared by all requests of a process. It does not keep any state of a particular
+    extract, the created record is only returned by the read method.
+
+    The PLR sources are read one after another by default. If `extract.plr_sources.max_workers` is
+    configured with a value greater than 1, the sources are read concurrently by a thread pool of this
+    size which is shared by all requests of the process. The result is merged in the order of the
+    configured sources, so the extract is the same as in the sequential mode.
+
+    If `extract.plr_sources.probe` is enabled, the sources sharing a database are probed by one query for
+    public law restrictions on the real estate before they are read. Only the sources with public law
+    restrictions on the real estate are read then.
+
+    If `extract.plr_cache` is configured, the records read by a source for a real estate are cached
+    together with the result of their tolerance check and reused for all formats and languages.
     """
 
     def __init__(self, plr_sources, plr_cadastre_authority):
@@ -33,10 +48,36 @@ class ExtractReader(object):
             plr_cadastre_authority (pyramid_oereb.lib.records.office.OfficeRecord): The authority responsible
                 for the PLR cadastre.
         """
-        self.extract = None
         self._plr_sources_ = plr_sources
         self._plr_cadastre_authority_ = plr_cadastre_authority
         self.law_status = Config.get_law_status_codes()
+        extract_config = Config.get_extract_config() or {}
+        plr_sources_config = extract_config.get('plr_sources') or {}
+        self._max_workers_ = plr_sources_config.get('max_workers') or 1
+        self._timeout_ = plr_sources_config.get('timeout')
+        self._probe_ = plr_sources_config.get('probe', False)
+        self._executor_ = None
+        if self._max_workers_ > 1:
+            self._executor_ = ThreadPoolExecutor(
+                max_workers=self._max_workers_,
+                thread_name_prefix='plr_source'
+            )
+        self._plr_cache_ = None
+        plr_cache_config = extract_config.get('plr_cache')
+        plr_cache_store = create_cache(plr_cache_config)
+        if plr_cache_store is not None:
+            self._plr_cache_ = PlrRecordCache(
+                plr_cache_store,
+                data_check_interval=plr_cache_config.get('data_check_interval', 60)
+            )
+
+    def shutdown(self):
+        """
+        Stops the thread pool reading the PLR sources, e.g. when the reader is replaced. Running reads are
+        finished, but no new reads are accepted.
+        """
+        if self._executor_ is not None:
+            self._executor_.shutdown(wait=False)
 
     @property
     def plr_cadastre_authority(self):
@@ -80,11 +121,27 @@ class ExtractReader(object):
 
         if municipality.published:
 
-            for plr_source in self._plr_sources_:
-                if not params.skip_topic(plr_source.info.get('code')):
-                    plr_source.read(params, real_estate, bbox)
-
-                    real_estate.public_law_restrictions.extend(plr_source.records)
+            plr_sources = [
+                plr_source for plr_source in self._plr_sources_
+                if not params.skip_topic(plr_source.info.get('code'))
+            ]
+            not_concerned = set()
+            if self._probe_:
+                with get_timings().measure('probe'):
+                    not_concerned = self._probe_plr_sources(plr_sources, real_estate)
+            read_records = iter(self._read_plr_sources(
+                [plr_source for plr_source in plr_sources if plr_source not in not_concerned],
+                params,
+                real_estate,
+                bbox
+            ))
+            for plr_source in plr_sources:
+                if plr_source in not_concerned:
+                    real_estate.public_law_restrictions.append(EmptyPlrRecord(
+                        Config.get_theme_by_code_sub_code(plr_source.info.get('code'))
+                    ))
+                else:
+                    real_estate.public_law_restrictions.extend(next(read_records))
 
             for plr in real_estate.public_law_restrictions:
 
@@ -124,7 +181,7 @@ class ExtractReader(object):
         canton_logo = Config.get_canton_logo()
         municipality_logo = Config.get_municipality_logo(municipality.fosnr)
 
-        self.extract = ExtractRecord(
+        extract = ExtractRecord(
             real_estate,
             oereb_logo,
             confederation_logo,
@@ -139,7 +196,128 @@ class ExtractReader(object):
         )
 
         log.debug("read() done")
-        return self.extract
+        return extract
+
+    def _read_plr_source(self, plr_source, params, real_estate, bbox, timings):
+        """
+        Reads a single PLR source and returns its records. The records of a source are bound to the
+        thread which has read them, so they have to be fetched within the same thread. If the records are
+        cached, the source is not read at all. Records which are put into the cache are calculated on the
+        real estate before, so the tolerance check of the processor can reuse the result.
+
+        Args:
+            plr_source (pyramid_oereb.lib.sources.plr.PlrBaseSource): The PLR source to read.
+            params (pyramid_oereb.views.webservice.Parameter): The parameters of the extract request.
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real estate.
+            bbox (shapely.geometry.Polygon): The bounding box of the real estate.
+            timings (pyramid_oereb.core.timing.Timings): The timings of the request, which are bound to
+                the reading thread.
+
+        Returns:
+            list of pyramid_oereb.lib.records.plr.PlrRecord or pyramid_oereb.lib.records.plr.EmptyPlrRecord:
+            The records found by the source.
+        """
+        with bind_timings(timings), timings.measure(plr_source.info.get('code')):
+            if self._plr_cache_ is None:
+                plr_source.read(params, real_estate, bbox)
+                return plr_source.records
+
+            cache_key = self._plr_cache_.get_key(plr_source, params, real_estate)
+            records = self._plr_cache_.get(cache_key)
+            if records is None:
+                plr_source.read(params, real_estate, bbox)
+                records = plr_source.records
+                for record in records:
+                    if isinstance(record, PlrRecord) and record.published_at(params.as_of_date):
+                        record.calculate(real_estate, params.as_of_date)
+                self._plr_cache_.set(cache_key, records)
+            return records
+
+    @staticmethod
+    def _probe_plr_sources(plr_sources, real_estate):
+        """
+        Probes the passed PLR sources for public law restrictions on the real estate. The probes of all
+        sources sharing a database are combined by `UNION ALL` to one query.
+
+        Args:
+            plr_sources (list of pyramid_oereb.lib.sources.plr.PlrBaseSource): The PLR sources to probe.
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real estate.
+
+        Returns:
+            set of pyramid_oereb.lib.sources.plr.PlrBaseSource: The sources without public law
+            restrictions on the real estate. Sources which cannot be probed are never contained.
+        """
+        from pyramid_oereb import database_adapter
+
+        probes = OrderedDict()
+        for plr_source in plr_sources:
+            probe = plr_source.get_probe(real_estate)
+            if probe is not None:
+                db_connection, clause = probe
+                probes.setdefault(db_connection, []).append((plr_source, clause))
+        not_concerned = set()
+        for db_connection, sources in probes.items():
+            statement = union_all(*[
+                select(literal(index)).where(clause) for index, (_, clause) in enumerate(sources)
+            ])
+            session = database_adapter.get_session(db_connection)
+            try:
+                concerned = set([row[0] for row in session.execute(statement)])
+            finally:
+                session.close()
+            not_concerned.update([
+                plr_source for index, (plr_source, _) in enumerate(sources) if index not in concerned
+            ])
+        return not_concerned
+
+    def _read_plr_sources(self, plr_sources, params, real_estate, bbox):
+        """
+        Reads the passed PLR sources, concurrently if a thread pool is configured.
+
+        Args:
+            plr_sources (list of pyramid_oereb.lib.sources.plr.PlrBaseSource): The PLR sources to read.
+            params (pyramid_oereb.views.webservice.Parameter): The parameters of the extract request.
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real estate.
+            bbox (shapely.geometry.Polygon): The bounding box of the real estate.
+
+        Returns:
+            list of list: The records of each source, in the same order as the passed sources.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the sources did not deliver their records within the
+                configured timeout, measured from their submission.
+        """
+        timings = get_timings()
+        if self._executor_ is None:
+            return [
+                self._read_plr_source(plr_source, params, real_estate, bbox, timings)
+                for plr_source in plr_sources
+            ]
+
+        futures = [
+            self._executor_.submit(self._read_plr_source, plr_source, params, real_estate, bbox, timings)
+            for plr_source in plr_sources
+        ]
+        # All sources share one deadline, so the extract does not wait for the timeout of each source in turn.
+        deadline = None if self._timeout_ is None else timer() + self._timeout_
+        results = list()
+        try:
+            for plr_source, future in zip(plr_sources, futures):
+                try:
+                    remaining = None if deadline is None else max(deadline - timer(), 0)
+                    results.append(future.result(timeout=remaining))
+                except TimeoutError:
+                    log.error(
+                        u'Reading PLR source {0} did not finish within {1} seconds'.format(
+                            plr_source.info.get('code'),
+                            self._timeout_
+                        )
+                    )
+                    raise
+        finally:
+            for future in futures:
+                future.cancel()
+        return results
 
     def _sort_plr_law_status(self, plr_element):
         """
@@ -115,22 +115,45 @@ class DocumentRecord(object):
         Returns:
             bool: True if document is published.
         """
+        return self.published_at()
+
+    def published_at(self, as_of_date=None):
+        """
+        Returns true if its not a future or past document at the passed date.
+
+        Args:
+            as_of_date (datetime.date or None): The date of the extract. Defaults to now. Publication
+                dates with a time are compared by their date if a date is passed, like the database filters
+                do.
+
+        Returns:
+            bool: True if document is published at this date.
+        """
         result = True
+        now = datetime.datetime.now()
+        today = as_of_date or now.date()
+        published_from = self.published_from
+        published_until = self.published_until
+        if as_of_date is not None:
+            if isinstance(published_from, datetime.datetime):
+                published_from = published_from.date()
+            if isinstance(published_until, datetime.datetime):
+                published_until = published_until.date()
 
         # Check for published_from
-        if isinstance(self.published_from, datetime.datetime):
-            if datetime.datetime.now() < self.published_from:
+        if isinstance(published_from, datetime.datetime):
+            if now < published_from:
                 result = False
-        elif isinstance(self.published_from, datetime.date):
-            if datetime.date.today() < self.published_from:
+        elif isinstance(published_from, datetime.date):
+            if today < published_from:
                 result = False
 
         # Check for published_until
-        if isinstance(self.published_until, datetime.datetime):
-            if datetime.datetime.now() > self.published_until:
+        if isinstance(published_until, datetime.datetime):
+            if now > published_until:
                 result = False
-        elif isinstance(self.published_until, datetime.date):
-            if datetime.date.today() > self.published_until:
+        elif isinstance(published_until, datetime.date):
+            if today > published_until:
                 result = False
 
         log.debug("DocumentRecord.published() returning {} for document {}"
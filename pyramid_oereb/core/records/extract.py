@@ -63,7 +63,6 @@ class ExtractRecord(object):
 
         self.update_date_os = update_date_os
         self.general_information = general_information
-        self.extract_identifier = str(uuid.uuid4())
         self.real_estate = real_estate
         if concerned_theme:
             self.concerned_theme = concerned_theme
@@ -77,7 +76,7 @@ class ExtractRecord(object):
             self.theme_without_data = theme_without_data
         else:
             self.theme_without_data = []
-        self.creation_date = datetime.now()
+        self.reissue()
         self.logo_plr_cadastre = logo_plr_cadastre
         self.federal_logo = federal_logo
         self.cantonal_logo = cantonal_logo
@@ -91,3 +90,11 @@ class ExtractRecord(object):
             self.glossaries = glossaries
         else:
             self.glossaries = []
+
+    def reissue(self):
+        """
+        Gives the extract a new identifier and creation date, e.g. when a cached extract is delivered
+        again.
+        """
+        self.extract_identifier = str(uuid.uuid4())
+        self.creation_date = datetime.now()
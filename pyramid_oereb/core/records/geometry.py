@@ -52,11 +52,21 @@ class GeometryRecord(object):
     @property
     def published(self):
         """bool: True if geometry is published."""
-        if self.published_until is None:
-            return self.published_from <= datetime.now().date()
-        else:
-            return self.published_from <= datetime.now().date() and \
-                   self.published_until >= datetime.now().date()
+        return self.published_at()
+
+    def published_at(self, as_of_date=None):
+        """
+        Checks if the geometry is published at the passed date.
+
+        Args:
+            as_of_date (datetime.date or None): The date of the extract. Defaults to today.
+
+        Returns:
+            bool: True if geometry is published at this date.
+        """
+        as_of_date = as_of_date or datetime.now().date()
+        return self.published_from <= as_of_date and \
+            (self.published_until is None or self.published_until >= as_of_date)
 
     @staticmethod
     def geom_dim(geom):
@@ -115,7 +125,7 @@ class GeometryRecord(object):
         else:
             return result
 
-    def calculate(self, real_estate, min_length, min_area, length_unit, area_unit):
+    def calculate(self, real_estate, min_length, min_area, length_unit, area_unit, as_of_date=None):
         """
         Entry method for calculation. It checks if the geometry type of this instance is a geometry
         collection which has to be unpacked first in case of collection.
@@ -126,15 +136,19 @@ class GeometryRecord(object):
             min_area (float): The threshold to consider or not a surface element.
             length_unit (unicode): The thresholds unit for area calculation.
             area_unit (unicode): The thresholds unit for area calculation.
+            as_of_date (datetime.date or None): The date of the extract the geometry has to be published
+                at. Defaults to today.
 
         Returns:
             bool: True if intersection fits the limits.
         """
+        if self.calculated:
+            return self._test_passed
         geometry_types = Config.get('geometry_types')
         line_types = geometry_types.get('line').get('types')
         polygon_types = geometry_types.get('polygon').get('types')
         point_types = geometry_types.get('point').get('types')
-        if self.published:
+        if self.published_at(as_of_date):
             intersection = self.geom.intersection(real_estate.limit)
             # TODO upon update to Shapely 1.7, a check for result.is_emtpy will be needed (see PR#1037)
             # differentiate between Points and MultiPoint
@@ -183,6 +197,24 @@ class GeometryRecord(object):
         self.calculated = True
         return self._test_passed
 
+    def set_shares(self, area_share=None, length_share=None, nr_of_points=None, units=None):
+        """
+        Sets the shares on the real estate if they have been calculated elsewhere, e.g. by the database. The
+        geometry is considered as passing the limits and :meth:`calculate` does not calculate it again.
+
+        Args:
+            area_share (float or None): The area of the geometry on the real estate.
+            length_share (float or None): The length of the geometry on the real estate.
+            nr_of_points (int or None): The number of points of the geometry on the real estate.
+            units (unicode or None): The unit of the area or length share.
+        """
+        self._area_share = area_share
+        self._length_share = length_share
+        self._nr_of_points = nr_of_points
+        self._units = units
+        self._test_passed = True
+        self.calculated = True
+
     @property
     def area_share(self):
         """
@@ -95,6 +95,7 @@ class PlrRecord(EmptyPlrRecord):
         self._part_in_percent = None
         self._length_share = None
         self._nr_of_points = None
+        self._calculation_result = None
         self.symbol = symbol
         self.view_service_id = view_service_id
 
@@ -105,11 +106,21 @@ class PlrRecord(EmptyPlrRecord):
     @property
     def published(self):
         """bool: True if PLR is published."""
-        if self.published_until is None:
-            return self.published_from <= datetime.now().date()
-        else:
-            return self.published_from <= datetime.now().date() \
-                   and self.published_until >= datetime.now().date()
+        return self.published_at()
+
+    def published_at(self, as_of_date=None):
+        """
+        Checks if the PLR is published at the passed date.
+
+        Args:
+            as_of_date (datetime.date or None): The date of the extract. Defaults to today.
+
+        Returns:
+            bool: True if PLR is published at this date.
+        """
+        as_of_date = as_of_date or datetime.now().date()
+        return self.published_from <= as_of_date and \
+            (self.published_until is None or self.published_until >= as_of_date)
 
     def _sum_length(self):
         """
@@ -172,14 +183,30 @@ class PlrRecord(EmptyPlrRecord):
         """float or None: Returns the number of points of all related geometry records of this PLR."""
         return self._nr_of_points
 
-    def calculate(self, real_estate):
+    def calculate(self, real_estate, as_of_date=None):
+        """
+        Checks which geometries of this record exceed the configured thresholds on the real estate, keeps
+        only those and calculates the shares of this record on the real estate. The calculation is done only
+        once per record, further calls return the result of the first one.
+
+        Args:
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real estate record.
+            as_of_date (datetime.date or None): The date of the extract the geometries have to be
+                published at. Defaults to today.
+
+        Returns:
+            bool: True if at least one geometry of this record is concerning the real estate.
+        """
+        if self._calculation_result is not None:
+            return self._calculation_result
         tested_geometries = []
         inside = False
         for geometry in self.geometries:
-            if geometry.published and geometry.calculate(
+            if geometry.published_at(as_of_date) and geometry.calculate(
                     real_estate,
                     self.min_length, self.min_area,
-                    self.length_unit, self.area_unit
+                    self.length_unit, self.area_unit,
+                    as_of_date
             ):
                 tested_geometries.append(geometry)
                 inside = True
@@ -205,6 +232,7 @@ class PlrRecord(EmptyPlrRecord):
                 ((float(self._area_share) / float(real_estate.land_registry_area)) * 100),
                 1
             )
+        self._calculation_result = inside
         return inside
 
     def __str__(self):
@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 import warnings
 import logging
+import threading
 import requests
 
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
 from pyramid.config import ConfigurationError
 from pyramid_oereb.core.records.image import ImageRecord
 from pyramid_oereb.core.url import add_url_params, parse_url
@@ -13,6 +17,33 @@ from pyramid_oereb.core import get_multilingual_element
 
 log = logging.getLogger(__name__)
 
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+
+@contextmanager
+def host_connection_limit(url):
+    """
+    Limits the number of concurrent connections of this process to the host of the passed URL. The limit
+    is read from `wms_download.max_connections_per_host` in the configuration. Without this setting the
+    number of connections is not limited.
+
+    Args:
+        url (str): The URL which is about to be requested.
+    """
+    limit = (Config.get('wms_download') or {}).get('max_connections_per_host')
+    if not limit:
+        yield
+        return
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        semaphore = _host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(limit)
+            _host_semaphores[host] = semaphore
+    with semaphore:
+        yield
+
 
 class LegendEntryRecord(object):
     """
@@ -221,11 +252,7 @@ class ViewServiceRecord(object):
 
         map_size = self.get_map_size(image_format)
         bbox = self.get_bbox(real_estate.limit)
-
-        if language not in self.reference_wms:
-            msg = f"No WMS reference found for the requested language ({language}), using default language"
-            log.info(msg)
-            language = Config.get('default_language')
+        language = self.get_wms_language(language)
 
         self.reference_wms[language] = add_url_params(
             get_multilingual_element(self.reference_wms, language), {
@@ -239,6 +266,23 @@ class ViewServiceRecord(object):
 
         return self.reference_wms
 
+    def get_wms_language(self, language):
+        """
+        Returns the language of the reference WMS which is used for the requested language. This is the
+        requested language itself or the default language if there is no WMS for the requested one.
+
+        Args:
+            language (string): The requested language.
+
+        Returns:
+            string: The language of the reference WMS to be used.
+        """
+        if language not in self.reference_wms:
+            msg = f"No WMS reference found for the requested language ({language}), using default language"
+            log.info(msg)
+            language = Config.get('default_language')
+        return language
+
     def download_wms_content(self, language):
         """
         Downloads the image found behind the URL stored in the instance attribute "reference_wms"
@@ -252,19 +296,32 @@ class ViewServiceRecord(object):
                 doesn't contains type "image".
             AttributeError: Raised if the URL itself isn't valid at all.
         """
-        main_msg = "Image for WMS couldn't be retrieved."
+        language = self.get_wms_language(language)
+        self.image[language] = self.download_image(self.reference_wms.get(language))
 
-        if language not in self.reference_wms:
-            msg = f"No WMS reference found for the requested language ({language}), using default language"
-            log.info(msg)
-            language = Config.get('default_language')
+    @staticmethod
+    def download_image(wms):
+        """
+        Downloads the image found behind the passed WMS URL.
 
-        wms = self.reference_wms.get(language)
+        Args:
+            wms (str): The WMS GetMap URL.
+
+        Returns:
+            pyramid_oereb.core.records.image.ImageRecord: The downloaded image.
+
+        Raises:
+            LookupError: Raised if the response is not code 200 or content-type
+                doesn't contains type "image".
+            AttributeError: Raised if the URL itself isn't valid at all.
+        """
+        main_msg = "Image for WMS couldn't be retrieved."
 
         if uri_validator(wms):
             log.debug(f"Downloading image, url: {wms}")
             try:
-                response = requests.get(wms, proxies=Config.get('proxies'))
+                with host_connection_limit(wms):
+                    response = requests.get(wms, proxies=Config.get('proxies'))
             except Exception as ex:
                 dedicated_msg = f"An image could not be downloaded. URL was: {wms}, error was {ex}"
                 log.error(dedicated_msg)
@@ -272,7 +329,7 @@ class ViewServiceRecord(object):
 
             content_type = response.headers.get('content-type', '')
             if response.status_code == 200 and content_type.find('image') > -1:
-                self.image[language] = ImageRecord(response.content)
+                return ImageRecord(response.content)
             else:
                 dedicated_msg = f"The image could not be downloaded. URL was: {wms}, " \
                     f"Response was {response.content.decode('utf-8')}"
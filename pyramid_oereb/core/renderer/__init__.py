@@ -28,6 +28,7 @@ class Base(object):
         """
         self._info_ = info
         self._language = str(Config.get('default_language')).lower()
+        self._static_fragments_ = dict()
 
     @classmethod
     def get_symbol_ref(cls, request, record):
@@ -100,6 +101,29 @@ class Base(object):
             return dt.strftime('%Y-%m-%dT%H:%M:%S')
         return dt
 
+    def get_static_fragment(self, name, records, build):
+        """
+        Returns a part of the extract which does not depend on the real estate, like the glossary or the
+        disclaimers. The part is built once per language and reused as long as it is built from the same
+        records, which are kept in memory by the configuration.
+
+        Args:
+            name (str): The name of the part.
+            records (tuple): The records the part is built from. The part is built again if one of them
+                has been replaced, e.g. after the data has been reloaded.
+            build (callable): The function building the part. It is called without arguments.
+
+        Returns:
+            *: The built part. It is shared by all extracts and must not be modified.
+        """
+        key = (name, self._language)
+        entry = self._static_fragments_.get(key)
+        if entry is None or len(entry[0]) != len(records) or \
+                any(cached is not record for cached, record in zip(entry[0], records)):
+            entry = (tuple(records), build())
+            self._static_fragments_[key] = entry
+        return entry[1]
+
     @property
     def info(self):
         """ pyramid.interfaces.IRendererInfo: The passed renderer info object."""
@@ -89,7 +89,11 @@ class Renderer(Base):
             'CreationDate': self.date_time(extract.creation_date),
             'ExtractIdentifier': extract.extract_identifier,
             'UpdateDateCS': self.date_time(extract.update_date_os),
-            'PLRCadastreAuthority': self.format_office(extract.plr_cadastre_authority),
+            'PLRCadastreAuthority': self.get_static_fragment(
+                'PLRCadastreAuthority',
+                (extract.plr_cadastre_authority,),
+                lambda: self.format_office(extract.plr_cadastre_authority)
+            ),
             'RealEstate': self.format_real_estate(extract.real_estate),
             'ConcernedTheme': [self.format_theme(theme) for theme in extract.concerned_theme],
             'NotConcernedTheme': [self.format_theme(theme) for theme in extract.not_concerned_theme],
@@ -161,43 +165,88 @@ class Renderer(Base):
             extract_dict['QRCode'] = extract.qr_code
 
         if isinstance(extract.general_information, list) and len(extract.general_information) > 0:
-            general_information = list()
-            for info in extract.general_information:
-                general_information.append(
-                    self.get_multilingual_text(info.content)
-                )
-            extract_dict['GeneralInformation'] = general_information
+            extract_dict['GeneralInformation'] = self.get_static_fragment(
+                'GeneralInformation',
+                (extract.general_information,),
+                lambda: self.format_general_information(extract.general_information)
+            )
 
         if isinstance(extract.disclaimers, list) and len(extract.disclaimers) > 0:
-            disclaimers = list()
-            for disclaimer in extract.disclaimers:
-                disclaimers.append({
-                    'Title': self.get_multilingual_text(disclaimer.title),
-                    'Content': self.get_multilingual_text(disclaimer.content)
-                })
-            extract_dict['Disclaimer'] = disclaimers
+            extract_dict['Disclaimer'] = self.get_static_fragment(
+                'Disclaimer',
+                (extract.disclaimers,),
+                lambda: self.format_disclaimers(extract.disclaimers)
+            )
 
         if isinstance(extract.glossaries, list) and len(extract.glossaries) > 0:
-            glossaries = list()
-            for gls in extract.glossaries:
-                gls_title = self.get_multilingual_text(gls.title, False)
-                gls_title_text = gls_title[0]['Text']
-                if gls_title_text is not None:
-                    glossaries.append({
-                        'Title': gls_title,
-                        'Content': self.get_multilingual_text(gls.content, False)
-                    })
-                else:
-                    log.warning("glossary entry in requested language missing for title {}".format(gls.title))
-
-            # Sort glossary by requested language alphabetically
-            extract_dict['Glossary'] = self.sort_by_localized_text(
-                glossaries,
-                lambda element: element['Title'][0]['Text']
+            extract_dict['Glossary'] = self.get_static_fragment(
+                'Glossary',
+                (extract.glossaries,),
+                lambda: self.format_glossaries(extract.glossaries)
             )
         log.debug("_render() done.")
         return extract_dict
 
+    def format_general_information(self, general_information):
+        """
+        Formats the general information for rendering according to the federal specification.
+
+        Args:
+            general_information
+                (list of pyramid_oereb.core.records.general_information.GeneralInformationRecord): The
+                general information records to be formatted.
+
+        Returns:
+            list: The formatted list for rendering.
+        """
+        return [self.get_multilingual_text(info.content) for info in general_information]
+
+    def format_disclaimers(self, disclaimers):
+        """
+        Formats the disclaimers for rendering according to the federal specification.
+
+        Args:
+            disclaimers (list of pyramid_oereb.core.records.disclaimer.DisclaimerRecord): The disclaimer
+                records to be formatted.
+
+        Returns:
+            list of dict: The formatted dictionaries for rendering.
+        """
+        return [{
+            'Title': self.get_multilingual_text(disclaimer.title),
+            'Content': self.get_multilingual_text(disclaimer.content)
+        } for disclaimer in disclaimers]
+
+    def format_glossaries(self, glossaries):
+        """
+        Formats the glossary for rendering according to the federal specification. The entries are
+        sorted alphabetically by their title in the requested language.
+
+        Args:
+            glossaries (list of pyramid_oereb.core.records.glossary.GlossaryRecord): The glossary
+                records to be formatted.
+
+        Returns:
+            list of dict: The formatted dictionaries for rendering.
+        """
+        formatted = list()
+        for gls in glossaries:
+            gls_title = self.get_multilingual_text(gls.title, False)
+            gls_title_text = gls_title[0]['Text']
+            if gls_title_text is not None:
+                formatted.append({
+                    'Title': gls_title,
+                    'Content': self.get_multilingual_text(gls.content, False)
+                })
+            else:
+                log.warning("glossary entry in requested language missing for title {}".format(gls.title))
+
+        # Sort glossary by requested language alphabetically
+        return self.sort_by_localized_text(
+            formatted,
+            lambda element: element['Title'][0]['Text']
+        )
+
     def format_real_estate(self, real_estate):
         """
         Formats a real estate record for rendering according to the federal specification.
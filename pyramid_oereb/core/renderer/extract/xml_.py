@@ -84,6 +84,7 @@ class Renderer(Base):
             'request': self._request,
             'get_symbol_ref': self.get_symbol_ref,
             'get_gml_id': self._get_gml_id,
+            'get_static_fragment': self.get_static_fragment,
             'date_format': '%Y-%m-%dT%H:%M:%S'
         })
         return content
@@ -103,6 +103,16 @@ def includeme(config):  # pragma: no cover
         # TODO reactivate after fix of issue #1293: , decorator=log_response
     )
 
+    # Get extracts of several real estates
+    config.add_route('{0}/extract/batch'.format(route_prefix),
+                     '/extract/batch/{format}')
+    config.add_view(
+        PlrWebservice,
+        attr='get_extract_batch',
+        route_name='{0}/extract/batch'.format(route_prefix),
+        request_method=('GET', 'POST')
+    )
+
     # Get extract by id
     config.add_route('{0}/extract'.format(route_prefix),
                      '/extract/{format}')
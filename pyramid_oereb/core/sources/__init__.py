@@ -4,6 +4,7 @@ This is package provides the minimum requirements on the classes which can be us
 """
 import time
 import logging
+import threading
 from pyramid.config import ConfigurationError
 from pyramid.path import DottedNameResolver
 
@@ -15,10 +16,36 @@ class Base(object):
     The basic source class. This is not meant to be used directly as a source at runtime. But more as a basic
     class for inherit in special designed classes.
 
+    Source instances are created once per process and shared by all requests. Everything which belongs to
+    the request currently processed (like the read records) is therefore kept in a thread local context.
+
     Attributes:
         records (list): The list which will be filled up with records in the process.
     """
-    records = list()
+
+    @property
+    def _context_(self):
+        """
+        threading.local: The context of the request which is currently processed by this thread.
+        """
+        context = self.__dict__.get('_context_local_')
+        if context is None:
+            context = self.__dict__.setdefault('_context_local_', threading.local())
+        return context
+
+    @property
+    def records(self):
+        """
+        list: The records read by the current thread.
+        """
+        context = self._context_
+        if not hasattr(context, 'records'):
+            context.records = list()
+        return context.records
+
+    @records.setter
+    def records(self, value):
+        self._context_.records = value
 
 
 class BaseDatabaseSource(Base):
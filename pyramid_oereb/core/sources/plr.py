@@ -24,6 +24,8 @@ class PlrBaseSource(Base):
             records.
         datasource (list of pyramid_oereb.lib.records.embeddable.DatasourceRecord): List of data source
             records used for the additional data in flavour `embeddable`.
+        language_dependent_records (bool): True if the read records depend on the requested language. This
+            is taken into account when the records are cached.
     """
     _documents_record_class = DocumentRecord
     _disclaimer_record_class = DisclaimerRecord
@@ -37,6 +39,7 @@ class PlrBaseSource(Base):
     _datasource_record_class = DatasourceRecord
 
     datasource = list()
+    language_dependent_records = False
 
     def __init__(self, **kwargs):
         """
@@ -70,6 +73,31 @@ class PlrBaseSource(Base):
         """
         return self._plr_info
 
+    def get_data_integration_date(self):
+        """
+        Returns the date of the latest data integration of this source. It is used to detect data
+        updates, e.g. to invalidate cached extracts. Sources which are not able to tell it return None.
+
+        Returns:
+            datetime.datetime or None: The date of the latest data integration.
+        """
+        return None
+
+    def get_probe(self, real_estate):
+        """
+        Returns a probe which tells if the source has any public law restriction on the real estate. The
+        probes of the sources sharing a database are combined to one query by the extract reader, so the
+        sources without public law restrictions on the real estate do not have to be read at all. Sources
+        which cannot be probed return None and are always read.
+
+        Args:
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real estate.
+
+        Returns:
+            tuple or None: The database connection string and the probe as SQLAlchemy `EXISTS` clause.
+        """
+        return None
+
     def read(self, params, real_estate, bbox):
         """
         Every public law restriction source has to implement a read method. This method must accept the two
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+This package provides the timing instrumentation of the extract processing. The timings of the request
+currently processed are collected by the :class:`Timings` bound to the current thread. Code which wants to
+contribute a measurement simply uses::
+
+    with get_timings().measure('municipality'):
+        ...
+
+If timing is not enabled, :func:`get_timings` returns a collector which does nothing, so the
+instrumentation costs next to nothing. Threads started to process a part of the request have to be bound
+to the collector of the request explicitly by :func:`bind_timings`.
+"""
+import re
+import threading
+
+from contextlib import contextmanager
+from timeit import default_timer as timer
+
+_context = threading.local()
+
+
+class Timings(object):
+    """
+    Collects the durations of the stages of one request. It is safe to use from several threads.
+    """
+
+    _invalid_name_characters = re.compile(r'[^A-Za-z0-9_.\-]')
+
+    def __init__(self):
+        self._entries_ = list()
+        self._lock_ = threading.Lock()
+
+    @property
+    def enabled(self):
+        """
+        bool: True if the measurements are collected.
+        """
+        return True
+
+    @property
+    def entries(self):
+        """
+        list of tuple: The collected measurements as tuples of name and duration in seconds, in the order
+        they have been finished.
+        """
+        with self._lock_:
+            return list(self._entries_)
+
+    def add(self, name, duration):
+        """
+        Adds a measurement.
+
+        Args:
+            name (str): The name of the measured stage.
+            duration (float): The duration in seconds.
+        """
+        with self._lock_:
+            self._entries_.append((name, duration))
+
+    @contextmanager
+    def measure(self, name):
+        """
+        Measures the duration of the wrapped block.
+
+        Args:
+            name (str): The name of the measured stage.
+        """
+        start = timer()
+        try:
+            yield
+        finally:
+            self.add(name, timer() - start)
+
+    def as_dict(self):
+        """
+        Returns the measurements in milliseconds. Measurements of the same name are summed up.
+
+        Returns:
+            dict: The durations in milliseconds by name.
+        """
+        result = dict()
+        for name, duration in self.entries:
+            result[name] = round(result.get(name, 0.0) + duration * 1000, 1)
+        return result
+
+    def get_server_timing(self):
+        """
+        Returns the measurements as value of a `Server-Timing` HTTP header.
+
+        Returns:
+            str: The header value.
+        """
+        return ', '.join([
+            '{0};dur={1}'.format(self._invalid_name_characters.sub('_', name), duration)
+            for name, duration in self.as_dict().items()
+        ])
+
+
+class NoTimings(object):
+    """
+    The collector used if timing is not enabled. It does not measure anything.
+    """
+
+    enabled = False
+    entries = []
+
+    def add(self, name, duration):
+        pass
+
+    @contextmanager
+    def measure(self, name):
+        yield
+
+    def as_dict(self):
+        return dict()
+
+    def get_server_timing(self):
+        return ''
+
+
+_no_timings = NoTimings()
+
+
+def get_timings():
+    """
+    Returns the collector of the request processed by the current thread.
+
+    Returns:
+        pyramid_oereb.core.timing.Timings or pyramid_oereb.core.timing.NoTimings: The collector.
+    """
+    return getattr(_context, 'timings', _no_timings)
+
+
+@contextmanager
+def bind_timings(timings):
+    """
+    Binds the passed collector to the current thread for the wrapped block.
+
+    Args:
+        timings (pyramid_oereb.core.timing.Timings or pyramid_oereb.core.timing.NoTimings): The
+            collector of the request.
+    """
+    previous = getattr(_context, 'timings', None)
+    _context.timings = timings
+    try:
+        yield timings
+    finally:
+        if previous is None:
+            del _context.timings
+        else:
+            _context.timings = previous
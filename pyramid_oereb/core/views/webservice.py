@@ -1,21 +1,31 @@
 # -*- coding: utf-8 -*-
 
+import copy
+import datetime
+import json
 import logging
+import re
+import zipfile
+
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from pyramid.httpexceptions import HTTPBadRequest, HTTPFound, HTTPInternalServerError, HTTPNoContent, \
     HTTPNotFound
 from pyramid.path import DottedNameResolver
 from shapely.geometry import Point
-from pyramid.renderers import render_to_response
+from pyramid.renderers import render, render_to_response
 from pyramid.response import Response
 
 from pyramid_oereb import route_prefix
 from pyramid_oereb import Config
 from pyreproj import Reprojector
 
-from pyramid_oereb.core.processor import create_processor
+from pyramid_oereb.core.processor import get_processor
+from pyramid_oereb.core.profiling import is_profiling_requested, profile_call
 from pyramid_oereb.core.readers.address import AddressReader
 from pyramid_oereb.core.renderer import Base as Renderer
+from pyramid_oereb.core.timing import Timings, bind_timings, get_timings
 from timeit import default_timer as timer
 
 # TODO reactivate after fix of issue #1293: all usages of OerebStats in this file
@@ -24,6 +34,32 @@ from timeit import default_timer as timer
 log = logging.getLogger(__name__)
 
 
+class _ZipStream(object):
+    """
+    A write only file object collecting the data written by :class:`zipfile.ZipFile`, which allows to
+    stream an archive while it is built.
+    """
+
+    def __init__(self):
+        self._chunks = list()
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        """
+        Returns:
+            bytes: The data written since the last call.
+        """
+        data = b''.join(self._chunks)
+        self._chunks = list()
+        return data
+
+
 class PlrWebservice(object):
     """
     This class provides the PLR webservice methods.
@@ -38,6 +74,8 @@ class PlrWebservice(object):
     _EXTRACT_FORMATS = _DEFAULT_FORMATS + ['pdf', 'url']
     """list of str: The formats for the extract responses."""
 
+    _invalid_file_name_characters = re.compile(r'[^A-Za-z0-9_.\-]')
+
     def __init__(self, request):
         self._request = request
         self._params = {k.upper(): v for k, v in request.params.items()}
@@ -83,7 +121,6 @@ class PlrWebservice(object):
         """
 
         output_format = self.__validate_format_param__(self._DEFAULT_FORMATS)
-        params = Parameter(output_format)
 
         supported_languages = Config.get_language()
         themes = list()
@@ -99,11 +136,10 @@ class PlrWebservice(object):
                 'Code': theme.code,
                 'Text': text
             })
-        processor = create_processor()
         capabilities = {
             u'GetCapabilitiesResponse': {
                 u'topic': themes,
-                u'municipality': [record.fosnr for record in processor.municipality_reader.read(params)],
+                u'municipality': [record.fosnr for record in Config.get_municipalities()],
                 u'flavour': Config.get_flavour(),
                 u'language': supported_languages,
                 u'crs': [Config.get_crs()]
@@ -189,7 +225,7 @@ class PlrWebservice(object):
                     Config.get('srid'),
                     self.__parse_gnss__(gnss).wkt
                 )
-            processor = create_processor()
+            processor = get_processor()
             return processor.real_estate_reader.read(params, **{'geometry': geom_wkt})
         else:
             raise HTTPBadRequest('EN or GNSS must be defined.')
@@ -208,7 +244,7 @@ class PlrWebservice(object):
         identdn = self._params.get('IDENTDN')
         number = self._params.get('NUMBER')
         if identdn and number:
-            processor = create_processor()
+            processor = get_processor()
             return processor.real_estate_reader.read(
                 params,
                 **{
@@ -245,7 +281,7 @@ class PlrWebservice(object):
                 srid=Config.get('srid'),
                 wkt=addresses[0].geom.wkt
             )
-            processor = create_processor()
+            processor = get_processor()
             return processor.real_estate_reader.read(params, **{'geometry': geometry})
         else:
             raise HTTPBadRequest('POSTALCODE, LOCALISATION and NUMBER must be defined.')
@@ -254,6 +290,61 @@ class PlrWebservice(object):
         """
         Returns the extract in the specified format and flavour.
 
+        If `extract.timing.enabled` is set in the configuration, the duration of each processing stage is
+        measured. The measurements are logged and returned in the `Server-Timing` header of the response
+        (unless `extract.timing.server_timing` is false).
+
+        Returns:
+            pyramid.response.Response: The `extract` response.
+        """
+        timing_config = (Config.get_extract_config() or {}).get('timing') or {}
+        if not timing_config.get('enabled', False):
+            return self.__profile_extract_by_id__()
+
+        with bind_timings(Timings()) as timings:
+            with timings.measure('total'):
+                response = self.__profile_extract_by_id__()
+        durations = timings.as_dict()
+        log.info(
+            'GetExtractById timings: {0}'.format(json.dumps(durations)),
+            extra={
+                'service': 'GetExtractById',
+                'egrid': self._params.get('EGRID'),
+                'format': self._request.matchdict.get('format'),
+                'status': response.status_code,
+                'timings': durations
+            }
+        )
+        if timing_config.get('server_timing', True):
+            response.headers['Server-Timing'] = timings.get_server_timing()
+        return response
+
+    def __profile_extract_by_id__(self):
+        """
+        Returns the extract. If profiling is configured in `extract.profiling` and requested by the
+        secret header or parameter, the request is profiled and the statistics are written to the
+        configured directory.
+
+        Returns:
+            pyramid.response.Response: The `extract` response.
+        """
+        profiling_config = (Config.get_extract_config() or {}).get('profiling')
+        if not is_profiling_requested(self._request, profiling_config):
+            return self.__get_extract_by_id__()
+        real_estate_id = self._params.get('EGRID') or '{0}-{1}'.format(
+            self._params.get('IDENTDN'),
+            self._params.get('NUMBER')
+        )
+        return profile_call(
+            self.__get_extract_by_id__,
+            profiling_config.get('path'),
+            '{0}_{1}'.format(real_estate_id, self._request.matchdict.get('format'))
+        )
+
+    def __get_extract_by_id__(self):
+        """
+        Returns the extract in the specified format and flavour.
+
         Returns:
             pyramid.response.Response: The `extract` response.
         """
@@ -261,19 +352,20 @@ class PlrWebservice(object):
         log.debug("get_extract_by_id() start")
         try:
             params = self.__validate_extract_params__()
-            processor = create_processor()
+            processor = get_processor()
             # read the real estate from configured source by the passed parameters
             real_estate_reader = processor.real_estate_reader
-            if params.egrid:
-                real_estate_records = real_estate_reader.read(params, egrid=params.egrid)
-            elif params.identdn and params.number:
-                real_estate_records = real_estate_reader.read(
-                    params,
-                    nb_ident=params.identdn,
-                    number=params.number
-                )
-            else:
-                raise HTTPBadRequest("Missing required argument")
+            with get_timings().measure('real_estate'):
+                if params.egrid:
+                    real_estate_records = real_estate_reader.read(params, egrid=params.egrid)
+                elif params.identdn and params.number:
+                    real_estate_records = real_estate_reader.read(
+                        params,
+                        nb_ident=params.identdn,
+                        number=params.number
+                    )
+                else:
+                    raise HTTPBadRequest("Missing required argument")
             # check if result is strictly one (we queried with primary keys)
             if len(real_estate_records) == 1:
 
@@ -282,34 +374,9 @@ class PlrWebservice(object):
                     log.debug("get_extract_by_id() calling url")
                     return self.__redirect_to_dynamic_client__(real_estate_records[0])
 
-                extract = processor.process(
-                    real_estate_records[0],
-                    params,
-                    self._request.route_url('{0}/sld'.format(route_prefix))
-                )
-                if params.format == 'json':
-                    log.debug("get_extract_by_id() calling json")
-                    response = render_to_response(
-                        'pyramid_oereb_extract_json',
-                        (extract, params),
-                        request=self._request
-                    )
-                elif params.format == 'xml':
-                    log.debug("get_extract_by_id() calling xml")
-                    response = render_to_response(
-                        'pyramid_oereb_extract_xml',
-                        (extract, params),
-                        request=self._request
-                    )
-                elif params.format == 'pdf':
-                    log.debug("get_extract_by_id() calling pdf")
-                    response = render_to_response(
-                        'pyramid_oereb_extract_print',
-                        (extract, params),
-                        request=self._request
-                    )
-                else:
-                    raise HTTPBadRequest("The format '{}' is wrong".format(params.format))
+                extract = self.__process_extract__(processor, real_estate_records[0], params)
+                with get_timings().measure('render'):
+                    response = self.__render_extract_record__(extract, params)
                 end_time = timer()
                 log.debug("DONE with extract, time spent: {} seconds".format(end_time - start_time))
             else:
@@ -334,6 +401,230 @@ class PlrWebservice(object):
         #         response.extras = OerebStats(service='GetExtractById')
         return response
 
+    def __process_extract__(self, processor, real_estate, params):
+        """
+        Processes the extract of the passed real estate or takes it from the extract cache if there is one.
+
+        Args:
+            processor (pyramid_oereb.core.processor.Processor): The processor of the application.
+            real_estate (pyramid_oereb.lib.records.real_estate.RealEstateRecord): The real estate.
+            params (pyramid_oereb.views.webservice.Parameter): The parameters of the extract request.
+
+        Returns:
+            pyramid_oereb.lib.records.extract.ExtractRecord: The processed extract.
+        """
+        extract_cache = processor.extract_cache
+        if extract_cache is not None:
+            cache_key = extract_cache.get_key(params, real_estate, self._request.application_url)
+            extract = extract_cache.get(cache_key)
+            if extract is not None:
+                log.debug("get_extract_by_id() using cached extract")
+                return extract
+        extract = processor.process(
+            real_estate,
+            params,
+            self._request.route_url('{0}/sld'.format(route_prefix))
+        )
+        if extract_cache is not None:
+            extract_cache.set(cache_key, extract)
+        return extract
+
+    def __render_extract_record__(self, extract, params):
+        """
+        Renders the extract record in the requested format.
+
+        Args:
+            extract (pyramid_oereb.lib.records.extract.ExtractRecord): The extract record.
+            params (pyramid_oereb.views.webservice.Parameter): The parameters of the extract request.
+
+        Returns:
+            pyramid.response.Response: The rendered extract.
+        """
+        if params.format == 'json':
+            log.debug("get_extract_by_id() calling json")
+            response = render_to_response(
+                'pyramid_oereb_extract_json',
+                (extract, params),
+                request=self._request
+            )
+        elif params.format == 'xml':
+            log.debug("get_extract_by_id() calling xml")
+            response = render_to_response(
+                'pyramid_oereb_extract_xml',
+                (extract, params),
+                request=self._request
+            )
+        elif params.format == 'pdf':
+            log.debug("get_extract_by_id() calling pdf")
+            response = render_to_response(
+                'pyramid_oereb_extract_print',
+                (extract, params),
+                request=self._request
+            )
+        else:
+            raise HTTPBadRequest("The format '{}' is wrong".format(params.format))
+        return response
+
+    def get_extract_batch(self):
+        """
+        Returns the extracts of several real estates. The real estates are passed as comma separated list
+        in the `EGRID` parameter, which can also be sent as form data of a POST request. All other
+        parameters are the same as for `get_extract_by_id` and apply to all extracts.
+
+        The extracts are processed concurrently by a pool of threads (`extract.batch.max_workers`) and
+        streamed as soon as each one is ready, so the order of the extracts is not defined. A new extract
+        is only started when a processed one is streamed, so at most one extract per thread is kept in
+        memory.
+
+        For format `json` each line of the response is a JSON object with the `egrid` and either the
+        `response` (the GetExtractById response) or an `error`. For format `xml`, or with the parameter
+        `ZIP=true`, the response is a ZIP archive with one document per real estate and a `.error.txt`
+        file for each real estate which could not be processed.
+
+        Returns:
+            pyramid.response.Response: The streamed extracts.
+        """
+        batch_config = (Config.get_extract_config() or {}).get('batch') or {}
+        try:
+            params = self.__validate_extract_params__()
+            if params.format not in self._DEFAULT_FORMATS:
+                raise HTTPBadRequest('Invalid format: {0}'.format(params.format))
+            egrids = list(OrderedDict.fromkeys([
+                egrid.strip() for egrid in (params.egrid or '').split(',') if egrid.strip()
+            ]))
+            if len(egrids) == 0:
+                raise HTTPBadRequest('Invalid parameters. EGRID has to be defined.')
+            max_egrids = batch_config.get('max_egrids', 500)
+            if len(egrids) > max_egrids:
+                raise HTTPBadRequest('Too many real estates, at most {0} are allowed.'.format(max_egrids))
+        except HTTPBadRequest as err:
+            return HTTPBadRequest('{}'.format(err))
+
+        results = self.__process_batch__(params, egrids, batch_config.get('max_workers', 4))
+        if params.format == 'xml' or self._params.get('ZIP', 'false').lower() == 'true':
+            response = Response(app_iter=self.__zip_batch__(results), content_type='application/zip')
+            response.content_disposition = 'attachment; filename="extracts.zip"'
+        else:
+            response = Response(app_iter=self.__ndjson_batch__(results), content_type='application/x-ndjson')
+        return response
+
+    def __process_batch__(self, params, egrids, max_workers):
+        """
+        Processes the extracts of the passed real estates concurrently.
+
+        Args:
+            params (pyramid_oereb.views.webservice.Parameter): The parameters of the extracts.
+            egrids (list of str): The EGRIDs of the real estates.
+            max_workers (int): The maximum number of extracts processed at the same time.
+
+        Yields:
+            tuple: The EGRID, the parameters, the extract record and an error message for each real estate
+            as soon as it is processed. Either the extract or the error message is None.
+        """
+        processor = get_processor()
+        sld_url = self._request.route_url('{0}/sld'.format(route_prefix))
+
+        def process(egrid):
+            egrid_params = copy.copy(params)
+            egrid_params.set_egrid(egrid)
+            real_estate_records = processor.real_estate_reader.read(egrid_params, egrid=egrid)
+            if len(real_estate_records) != 1:
+                return egrid, egrid_params, None, 'No real estate found'
+            extract = processor.process(real_estate_records[0], egrid_params, sld_url)
+            return egrid, egrid_params, extract, None
+
+        workers = min(max_workers, len(egrids))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch')
+        remaining = iter(egrids)
+        pending = dict()
+
+        def submit_next():
+            egrid = next(remaining, None)
+            if egrid is not None:
+                pending[executor.submit(process, egrid)] = egrid
+
+        # At most one extract per worker is pending, so the processed extracts do not pile up in memory
+        # if the client reads the response slower than they are processed.
+        for _ in range(workers):
+            submit_next()
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    egrid = pending.pop(future)
+                    submit_next()
+                    try:
+                        result = future.result()
+                    except Exception as ex:
+                        log.exception(u'Extract of {0} could not be processed'.format(egrid))
+                        result = egrid, None, None, 'Extract could not be processed: {0}'.format(ex)
+                    yield result
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def __render_batch_extract__(self, extract, params):
+        """
+        Renders an extract of a batch in the requested format.
+
+        Args:
+            extract (pyramid_oereb.lib.records.extract.ExtractRecord): The extract record.
+            params (pyramid_oereb.views.webservice.Parameter): The parameters of the extract.
+
+        Returns:
+            str: The rendered extract.
+        """
+        renderer_name = 'pyramid_oereb_extract_{0}'.format(params.format)
+        content = render(renderer_name, (extract, params), request=self._request)
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        return content
+
+    def __ndjson_batch__(self, results):
+        """
+        Streams the results of a batch as newline delimited JSON.
+
+        Args:
+            results (generator): The results of the batch.
+
+        Yields:
+            bytes: One line per real estate.
+        """
+        for egrid, params, extract, error in results:
+            if extract is None:
+                line = json.dumps({'egrid': egrid, 'error': error})
+            else:
+                line = '{{"egrid": {0}, "response": {1}}}'.format(
+                    json.dumps(egrid),
+                    self.__render_batch_extract__(extract, params)
+                )
+            yield (line + '\n').encode('utf-8')
+
+    def __zip_batch__(self, results):
+        """
+        Streams the results of a batch as ZIP archive.
+
+        Args:
+            results (generator): The results of the batch.
+
+        Yields:
+            bytes: The archive, one chunk per real estate.
+        """
+        stream = _ZipStream()
+        with zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for egrid, params, extract, error in results:
+                file_name = self._invalid_file_name_characters.sub('_', egrid)
+                if extract is None:
+                    archive.writestr('{0}.error.txt'.format(file_name), error)
+                else:
+                    archive.writestr(
+                        '{0}.{1}'.format(file_name, params.format),
+                        self.__render_batch_extract__(extract, params)
+                    )
+                yield stream.pop()
+        yield stream.pop()
+
     def __validate_extract_params__(self):
         """
         Validates the input parameters for get_extract_by_id.
@@ -581,7 +872,7 @@ class PlrWebservice(object):
 
 class Parameter(object):
     def __init__(self, response_format, with_geometry=False, images=False, signed=False, identdn=None,
-                 number=None, egrid=None, language=None, topics=None):
+                 number=None, egrid=None, language=None, topics=None, as_of_date=None):
         """
         Creates a new parameter instance.
 
@@ -595,6 +886,8 @@ class Parameter(object):
             egrid (str): The EGRID as real estate identifier.
             language (str): The requested language.
             topics (list of str): The list of requested topics.
+            as_of_date (datetime.date or None): The date the extracted data has to be published at.
+                Defaults to the current date.
         """
         self.__format__ = response_format
         self.__with_geometry__ = with_geometry
@@ -605,6 +898,7 @@ class Parameter(object):
         self.__egrid__ = egrid
         self.__language__ = language
         self.__topics__ = topics
+        self.__as_of_date__ = as_of_date or datetime.date.today()
 
     def set_identdn(self, identdn):
         """
@@ -723,6 +1017,15 @@ class Parameter(object):
         """
         return self.__topics__
 
+    @property
+    def as_of_date(self):
+        """
+        Returns:
+            datetime.date: The date the extracted data has to be published at. It is the same for all
+            parts of the request, even if the request is processed over midnight.
+        """
+        return self.__as_of_date__
+
     def skip_topic(self, theme_code):
         """
         Check if the topic should be skipped in extract.
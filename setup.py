@@ -56,6 +56,8 @@ setup(
             'create_standard_tables = pyramid_oereb.contrib.data_sources.create_tables:create_standard_tables',  # noqa: E501
             'create_example_yaml = dev.config.create_yaml:create_yaml',
             'create_theme_tables = pyramid_oereb.contrib.data_sources.create_tables:create_theme_tables',
+            'create_interlis_indexes = pyramid_oereb.contrib.data_sources.interlis_2_3.create_indexes:create_interlis_indexes',  # noqa: E501
+            'create_interlis_flat_views = pyramid_oereb.contrib.data_sources.interlis_2_3.create_flat_views:create_interlis_flat_views',  # noqa: E501
             'create_legend_entries = pyramid_oereb.contrib.data_sources.standard.load_legend_entries:run',
             'create_stats_tables = pyramid_oereb.contrib.data_sources.contrib.stats.scripts.create_stats_tables:create_stats_tables'  # noqa: E501
         ]
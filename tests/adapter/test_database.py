@@ -43,3 +43,19 @@ def test_get_connection_fail():
     adapter = DatabaseAdapter()
     with pytest.raises(ArgumentError):
         adapter.get_session('not_a_connection_string')
+
+
+def test_connection_of_other_process(monkeypatch):
+    db_url = 'sqlite://'
+    adapter = DatabaseAdapter()
+    adapter.add_connection(db_url)
+    engine = adapter.get_connections().get(db_url).get('engine')
+    with engine.connect() as connection:
+        parent_connection = connection.connection.dbapi_connection
+    with engine.connect() as connection:
+        assert connection.connection.dbapi_connection is parent_connection
+    # The connection opened before a fork is not used by the forked process.
+    monkeypatch.setattr('pyramid_oereb.core.adapter.os.getpid', lambda: -1)
+    with engine.connect() as connection:
+        assert connection.connection.dbapi_connection is not parent_connection
+    adapter.get_connections().pop(db_url)
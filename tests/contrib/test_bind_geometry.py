@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from geoalchemy2 import Geometry
+from shapely.geometry import Polygon
+from sqlalchemy import column, func, or_, select
+from sqlalchemy.dialects import postgresql
+
+from pyramid_oereb.contrib.data_sources import bind_geometry
+
+
+def test_bind_geometry():
+    limit = Polygon([(0, 0), (0, 10), (10, 10), (10, 0)])
+    geometry = bind_geometry(limit, 2056)
+    geom = column('geom', Geometry)
+    statement = select(func.bool_or(geom.ST_Intersects(geometry))).where(or_(
+        func.ST_Intersects(func.ST_CollectionExtract(geom, 2), geometry),
+        func.ST_Intersects(func.ST_CollectionExtract(geom, 3), geometry)
+    ))
+    compiled = statement.compile(dialect=postgresql.dialect())
+    geometry_params = [value for value in compiled.params.values() if value == limit.wkb]
+    assert len(geometry_params) == 1
+    assert limit.wkt not in str(compiled)
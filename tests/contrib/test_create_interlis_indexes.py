@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+from pyramid_oereb.contrib.data_sources.interlis_2_3.create_indexes import create_indexes_sql
+from pyramid_oereb.contrib.data_sources.interlis_2_3.models.theme import model_factory_integer_pk
+
+
+def test_create_indexes_sql():
+    models = model_factory_integer_pk('plr', 'GEOMETRYCOLLECTION', 2056, 'postgresql://user@host/db')
+    sqls = create_indexes_sql(models)
+    for column in ['punkt', 'linie', 'flaeche']:
+        assert 'CREATE INDEX IF NOT EXISTS geometrie_{0}_oereb_idx ON plr.geometrie USING gist ({0});'.format(
+            column
+        ) in sqls
+    assert 'CREATE INDEX IF NOT EXISTS hinweisvorschrift_vorschrift_oereb_idx ON plr.hinweisvorschrift ' \
+           'USING btree (vorschrift);' in sqls
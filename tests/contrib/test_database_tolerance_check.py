@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import datetime
+from collections import namedtuple
+
+import pytest
+from shapely.geometry import MultiPolygon, Polygon
+
+from pyramid_oereb.contrib.data_sources.interlis_2_3.sources.plr import DatabaseSource as InterlisSource
+from pyramid_oereb.contrib.data_sources.standard.sources.plr import DatabaseSource as StandardSource
+from pyramid_oereb.core.cache import SourceRecordCache
+from pyramid_oereb.core.records.real_estate import RealEstateRecord
+from pyramid_oereb.core.views.webservice import Parameter
+
+PublicLawRestriction = namedtuple('PublicLawRestriction', ['id', 't_id', 'geometries'])
+
+
+class DummySession(object):
+
+    def close(self):
+        pass
+
+
+class DummyAdapter(object):
+
+    def get_session(self, key):
+        return DummySession()
+
+
+def create_source(source_class):
+    source = source_class.__new__(source_class)
+    source._plr_info = {'code': 'ch.Nutzungsplanung'}
+    source.availabilities = []
+    source._adapter_ = DummyAdapter()
+    source._key_ = 'db'
+    source._legend_entry_records_ = SourceRecordCache()
+    source._database_tolerance_check_ = True
+    source._max_records_ = None
+    source._max_geometry_size_ = None
+    source._language_projection_ = False
+    source.loaded_plr_ids = None
+    source.get_data_integration_date = lambda: datetime.datetime(2021, 1, 1)
+    # The public law restriction 2 is not published, but its geometry is.
+    source.collect_related_plr_ids = lambda *args: ([1], [10])
+    source.collect_calculated_geometry_records = lambda *args: {1: ['geometry 1'], 2: ['geometry 2']}
+    source.collect_legend_entries = lambda *args: []
+
+    def collect_public_law_restrictions(session, plr_ids, *args):
+        source.loaded_plr_ids = plr_ids
+        return [PublicLawRestriction(plr_id, plr_id, []) for plr_id in plr_ids]
+
+    source.collect_public_law_restrictions = collect_public_law_restrictions
+    source.from_db_to_plr_record = lambda params, plr, legend_entries, geometry_records: geometry_records
+    return source
+
+
+@pytest.mark.parametrize('source_class', [StandardSource, InterlisSource], ids=['standard', 'interlis'])
+def test_unpublished_plr_with_published_geometry(source_class):
+    source = create_source(source_class)
+    real_estate = RealEstateRecord(u'test', u'BL', u'Laufen', 2770, 1000,
+                                   MultiPolygon([Polygon([(0, 0), (4, 4), (4, 0)])]), None, egrid=u'CH1234')
+    source.read(Parameter('JSON'), real_estate, real_estate.limit)
+    assert source.loaded_plr_ids == [1]
+    assert source.records == [['geometry 1']]
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from shapely.geometry import Polygon
+
+from pyramid_oereb.contrib.data_sources import filter_geometry_shares
+from pyramid_oereb.core.records.real_estate import RealEstateRecord
+
+
+def test_filter_geometry_shares():
+    limit = Polygon([(0, 0), (0, 10), (10, 10), (10, 0)])
+    real_estate = RealEstateRecord('Liegenschaft', 'BL', 'Aesch BL', 2761, 200, limit)
+    thresholds = {
+        'length': {'limit': 1.0, 'unit': 'm'},
+        'area': {'limit': 20.0, 'unit': 'm2'}
+    }
+    geometry_shares = [
+        (1, 10, 1, 0, 2),
+        (2, 10, 1, 1, 0.5),
+        (2, 10, 2, 1, 3.0),
+        (3, 11, 1, 2, 15.0),
+        (4, 12, 1, 2, 0.0),
+        (5, 12, 1, 0, 0)
+    ]
+    assert filter_geometry_shares(geometry_shares, real_estate, thresholds) == {
+        (1, 1): {'nr_of_points': 2},
+        (2, 2): {'length_share': 3.0, 'units': 'm'},
+        # The area is compensated by the ratio of the land registry area to the area of the limit.
+        (3, 1): {'area_share': 30.0, 'units': 'm2'}
+    }
+
+
+def test_filter_geometry_shares_clipped():
+    limit = Polygon([(0, 0), (0, 10), (10, 10), (10, 0)])
+    real_estate = RealEstateRecord('Liegenschaft', 'BL', 'Aesch BL', 2761, 100, limit)
+    thresholds = {
+        'length': {'limit': 1.0, 'unit': 'm'},
+        'area': {'limit': 1.0, 'unit': 'm2'}
+    }
+    # The clipped part appended by collect_geometry_shares does not change the result.
+    assert filter_geometry_shares([(1, 10, 1, 2, 15.0, 'clipped')], real_estate, thresholds) == {
+        (1, 1): {'area_share': 15.0, 'units': 'm2'}
+    }
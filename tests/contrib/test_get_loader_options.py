@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import pytest
+from pyramid.config import ConfigurationError
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine, event
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship, sessionmaker
+
+from pyramid_oereb.contrib.data_sources import get_loader_options
+from pyramid_oereb.contrib.data_sources.interlis_2_3.models.theme import \
+    model_factory_integer_pk as interlis_model_factory
+from pyramid_oereb.contrib.data_sources.interlis_2_3.sources.plr import DatabaseSource as InterlisSource
+from pyramid_oereb.contrib.data_sources.oereblex.sources.plr_oereblex import DatabaseOEREBlexSource
+from pyramid_oereb.contrib.data_sources.standard.models.theme import \
+    model_factory_integer_pk as standard_model_factory
+from pyramid_oereb.contrib.data_sources.standard.sources.plr import DatabaseSource
+
+
+Base = declarative_base()
+
+
+class Office(Base):
+    __tablename__ = 'office'
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+class Document(Base):
+    __tablename__ = 'document'
+    id = Column(Integer, primary_key=True)
+    responsible_office_id = Column(ForeignKey(Office.id))
+    responsible_office = relationship(Office)
+
+
+class ViewService(Base):
+    __tablename__ = 'view_service'
+    id = Column(Integer, primary_key=True)
+
+
+class LegendEntry(Base):
+    __tablename__ = 'legend_entry'
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String)
+
+
+class PublicLawRestriction(Base):
+    __tablename__ = 'public_law_restriction'
+    id = Column(Integer, primary_key=True)
+    view_service_id = Column(ForeignKey(ViewService.id))
+    view_service = relationship(ViewService, backref='public_law_restrictions')
+    office_id = Column(ForeignKey(Office.id))
+    responsible_office = relationship(Office)
+    legend_entry_id = Column(ForeignKey(LegendEntry.id))
+    legend_entry = relationship(LegendEntry, backref='public_law_restrictions')
+
+
+class Geometry(Base):
+    __tablename__ = 'geometry'
+    id = Column(Integer, primary_key=True)
+    public_law_restriction_id = Column(ForeignKey(PublicLawRestriction.id))
+    public_law_restriction = relationship(PublicLawRestriction, backref='geometries')
+
+
+class PublicLawRestrictionDocument(Base):
+    __tablename__ = 'public_law_restriction_document'
+    id = Column(Integer, primary_key=True)
+    public_law_restriction_id = Column(ForeignKey(PublicLawRestriction.id))
+    plr = relationship(PublicLawRestriction, backref='legal_provisions')
+    document_id = Column(ForeignKey(Document.id))
+    document = relationship(Document)
+
+
+def count_statements(plr_count, options):
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for i in range(plr_count):
+        plr = PublicLawRestriction(
+            view_service=ViewService(),
+            responsible_office=Office(name='Office {0}'.format(i)),
+            legend_entry=LegendEntry(symbol='symbol')
+        )
+        session.add_all([Geometry(public_law_restriction=plr), Geometry(public_law_restriction=plr)])
+        for j in range(2):
+            session.add(PublicLawRestrictionDocument(
+                plr=plr,
+                document=Document(responsible_office=Office(name='Document office'))
+            ))
+    session.commit()
+    session.close()
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    session = sessionmaker(bind=engine)()
+    plrs = session.query(PublicLawRestriction).options(*options).order_by(PublicLawRestriction.id).all()
+    # Access the related objects like DatabaseSource.from_db_to_plr_record does.
+    for plr in plrs:
+        assert plr.legend_entry.symbol == 'symbol'
+        assert plr.view_service.id is not None
+        assert plr.responsible_office.name.startswith('Office')
+        assert len(plr.geometries) == 2
+        for legal_provision in plr.legal_provisions:
+            assert legal_provision.document.responsible_office.name == 'Document office'
+    session.close()
+    return len(statements)
+
+
+def test_constant_number_of_statements():
+    options = get_loader_options(PublicLawRestriction, DatabaseSource.default_loader_strategies)
+    assert count_statements(1, options) == count_statements(20, options)
+    assert count_statements(1, []) < count_statements(20, [])
+
+
+@pytest.mark.parametrize('source_class,model_factory,schema_name', [
+    (DatabaseSource, standard_model_factory, 'loader_options_standard'),
+    (DatabaseOEREBlexSource, standard_model_factory, 'loader_options_oereblex'),
+    (InterlisSource, interlis_model_factory, 'loader_options_interlis')
+], ids=['standard', 'oereblex', 'interlis'])
+def test_default_loader_strategies(source_class, model_factory, schema_name, caplog):
+    models = model_factory(schema_name, 'GEOMETRYCOLLECTION', 2056, 'postgresql://user@host/db')
+    options = get_loader_options(models.PublicLawRestriction, source_class.default_loader_strategies)
+    # Every configured path matches the relationships of the models, none is ignored.
+    paths = ['.'.join([attribute.key for attribute in option.path]) for option in options]
+    assert sorted(paths) == sorted(source_class.default_loader_strategies.keys())
+    assert [record for record in caplog.records if record.levelname == 'WARNING'] == []
+
+
+def test_unknown_relationship_is_ignored():
+    assert len(get_loader_options(PublicLawRestriction, {'legend_entry.unknown': 'joined'})) == 0
+
+
+def test_unknown_strategy():
+    with pytest.raises(ConfigurationError):
+        get_loader_options(PublicLawRestriction, {'legend_entry': 'eager'})
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+from sqlalchemy import Column, Date, Integer, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+from pyramid_oereb.contrib.data_sources import get_published_filter
+
+
+Base = declarative_base()
+
+
+class Geometry(Base):
+    __tablename__ = 'geometry'
+    id = Column(Integer, primary_key=True)
+    published_from = Column(Date, nullable=False)
+    published_until = Column(Date, nullable=True)
+
+
+def test_get_published_filter():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Geometry(id=1, published_from=datetime.date(2020, 1, 1)),
+        Geometry(id=2, published_from=datetime.date(2020, 1, 1), published_until=datetime.date(2021, 6, 30)),
+        Geometry(id=3, published_from=datetime.date(2020, 1, 1), published_until=datetime.date(2021, 1, 1)),
+        Geometry(id=4, published_from=datetime.date(2021, 1, 2))
+    ])
+    session.commit()
+    as_of_date = datetime.date(2021, 1, 1)
+    ids = [geometry.id for geometry in session.query(Geometry).filter(
+        get_published_filter(Geometry, as_of_date)
+    ).order_by(Geometry.id)]
+    assert ids == [1, 2, 3]
+    session.close()
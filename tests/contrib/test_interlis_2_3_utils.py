@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from sqlalchemy import Column, Integer, Text, create_engine, event
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import defer, sessionmaker
+
+from pyramid_oereb.contrib.data_sources.interlis_2_3.interlis_2_3_utils import \
+    from_multilingual_attributes_to_dict, get_other_language_attributes
+
+
+Base = declarative_base()
+
+
+class Office(Base):
+    __tablename__ = 'amt'
+    t_id = Column(Integer, primary_key=True)
+    name_de = Column('aname_de', Text, nullable=True)
+    name_fr = Column('aname_fr', Text, nullable=True)
+    name_it = Column('aname_it', Text, nullable=True)
+    name_rm = Column('aname_rm', Text, nullable=True)
+    name_en = Column('aname_en', Text, nullable=True)
+    sub_theme = Column(Text, nullable=True)
+
+
+def test_get_other_language_attributes():
+    attributes = get_other_language_attributes(Office, ('de', 'fr'))
+    assert set([attribute.key for attribute in attributes]) == set(['name_it', 'name_rm', 'name_en'])
+
+
+def test_from_multilingual_attributes_to_dict():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Office(t_id=1, name_de='Amt', name_fr='Office', name_it='Ufficio'))
+    session.commit()
+    session.close()
+    statements = []
+    session = sessionmaker(bind=engine)()
+    office = session.query(Office).options(
+        *[defer(attribute) for attribute in get_other_language_attributes(Office, ('fr',))]
+    ).one()
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    assert from_multilingual_attributes_to_dict(office, 'name') == {'fr': 'Office'}
+    assert len(statements) == 0
+    session.close()
+    session = sessionmaker(bind=engine)()
+    office = session.query(Office).one()
+    assert from_multilingual_attributes_to_dict(office, 'name') == {
+        'de': 'Amt',
+        'fr': 'Office',
+        'it': 'Ufficio'
+    }
+    session.close()
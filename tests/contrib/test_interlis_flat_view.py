@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import datetime
+from collections import namedtuple
+
+from sqlalchemy.dialects import postgresql
+
+from pyramid_oereb.contrib.data_sources.interlis_2_3.models.flat import create_flat_view_sql, \
+    get_flat_table, refresh_flat_view_sql
+from pyramid_oereb.contrib.data_sources.interlis_2_3.models.theme import model_factory_integer_pk
+from pyramid_oereb.contrib.data_sources.interlis_2_3.sources.plr import DatabaseSource
+from pyramid_oereb.contrib.data_sources.interlis_2_3.sources.plr_flat import FlatDatabaseSource, \
+    from_json_to_date, from_json_to_dict
+from tests.mockrequest import MockParameter
+
+LegendEntry = namedtuple('LegendEntry', ['t_id'])
+Row = namedtuple('Row', ['public_law_restriction_id', 'legend_entry_id'])
+
+
+class DummySession(object):
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, statement):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+def test_create_flat_view_sql():
+    models = model_factory_integer_pk('flat', 'GEOMETRYCOLLECTION', 2056, 'postgresql://user@host/db')
+    sqls = create_flat_view_sql(models, postgresql.dialect())
+    assert sqls[0].startswith('CREATE MATERIALIZED VIEW IF NOT EXISTS flat.flat_public_law_restriction AS')
+    # The view keeps the geometries, not their WKB.
+    assert 'flat.geometrie.punkt AS point' in sqls[0]
+    assert 'CREATE UNIQUE INDEX IF NOT EXISTS flat_public_law_restriction_geometry_id_idx ON ' \
+           'flat.flat_public_law_restriction (geometry_id);' in sqls
+    assert refresh_flat_view_sql(models) == \
+        'REFRESH MATERIALIZED VIEW CONCURRENTLY flat.flat_public_law_restriction;'
+
+
+def test_get_flat_table():
+    models = model_factory_integer_pk('flat', 'GEOMETRYCOLLECTION', 2056, 'postgresql://user@host/db')
+    flat_table = get_flat_table(models)
+    assert flat_table.fullname == 'flat.flat_public_law_restriction'
+    assert flat_table.c.surface.type is models.Geometry.surface.type
+    assert 'ST_AsEWKB' in str(flat_table.select().compile(dialect=postgresql.dialect()))
+
+
+def test_from_json():
+    assert from_json_to_dict(None) is None
+    assert from_json_to_dict({}) is None
+    assert from_json_to_dict({'de': 'Text', 'fr': 'Texte'}, ('fr',)) == {'fr': 'Texte'}
+    assert from_json_to_dict({'de': 'Text'}, ('fr',)) is None
+    assert from_json_to_date(None) is None
+    assert from_json_to_date('2021-01-31').isoformat() == '2021-01-31'
+
+
+def test_legend_entry_outside_of_visible_extent(monkeypatch):
+    models = model_factory_integer_pk('flat', 'GEOMETRYCOLLECTION', 2056, 'postgresql://user@host/db')
+    existing_ids = [1, 2]
+    monkeypatch.setattr(DatabaseSource, 'collect_legend_entries', lambda self, session, ids, languages=None: [
+        LegendEntry(legend_entry_id) for legend_entry_id in ids if legend_entry_id in existing_ids
+    ])
+    source = FlatDatabaseSource.__new__(FlatDatabaseSource)
+    source.models = models
+    source.flat_table = get_flat_table(models)
+    source._database_tolerance_check_ = False
+    source._plr_info = {'code': 'ch.Nutzungsplanung'}
+    session = DummySession([Row(10, 1), Row(11, 2), Row(12, 3)])
+    legend_entries = source.collect_legend_entries(session, [1])
+    public_law_restrictions = source.collect_public_law_restrictions(
+        session,
+        [10, 11, 12],
+        datetime.date.today()
+    )
+    assert [plr.t_id for plr in public_law_restrictions] == [10, 11, 12]
+    assert source.get_legend_entry_from_db(1, legend_entries) == LegendEntry(1)
+    # The legend entry 2 is not in the visible extent, it is loaded with the rows.
+    assert source.get_legend_entry_from_db(2, legend_entries) == LegendEntry(2)
+    # The legend entry 3 does not exist anymore, the public law restriction is skipped.
+    assert source.get_legend_entry_from_db(3, legend_entries) is None
+    assert source.from_db_to_plr_record(MockParameter(), public_law_restrictions[2], legend_entries) is None
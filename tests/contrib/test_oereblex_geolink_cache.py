@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import pytest
+
+from pyramid_oereb.contrib.data_sources.oereblex.sources.plr_oereblex import DatabaseOEREBlexSource
+from pyramid_oereb.core.sources import Base
+from tests.mockrequest import MockParameter
+
+
+class DummyOEREBlexSource(Base):
+
+    _language = 'de'
+    _version = '1.2.2'
+    _url_param_config = None
+
+    def __init__(self, delay=0):
+        self.calls = 0
+        self.delay = delay
+
+    def read(self, params, geolink, oereblex_params=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        self.records = [{'geolink': geolink, 'language': params.language or self._language}]
+
+
+def create_source(code='ch.Nutzungsplanung', delay=0, timeout=None):
+    source = DatabaseOEREBlexSource.__new__(DatabaseOEREBlexSource)
+    source._plr_info = {'code': code}
+    source._oereblex_source = DummyOEREBlexSource(delay=delay)
+    source._oereblex_config_ = {'host': 'http://oereblex.example.com'}
+    source._prefetch_timeout_ = timeout
+    return source
+
+
+@pytest.fixture
+def geolink_cache():
+    DatabaseOEREBlexSource._geolink_cache_ = None
+    DatabaseOEREBlexSource.init_geolink_cache({'max_size': 10, 'ttl': 60})
+    yield DatabaseOEREBlexSource._geolink_cache_
+    DatabaseOEREBlexSource._geolink_cache_ = None
+
+
+def test_geolink_cache(geolink_cache):
+    source = create_source()
+    params = MockParameter()
+    records = source.document_records_from_oereblex(params, 100, None)
+    assert records == [{'geolink': 100, 'language': 'de'}]
+    # Another request gets the documents from the cache.
+    other = create_source()
+    assert other.document_records_from_oereblex(params, 100, None) == records
+    assert other._oereblex_source.calls == 0
+    other._queried_geolinks.clear()
+    assert other.document_records_from_oereblex(params, 100, 'oereb_id=5') == records
+    assert other._oereblex_source.calls == 1
+    params.set_language('fr')
+    assert other.document_records_from_oereblex(params, 100, None) == [{'geolink': 100, 'language': 'fr'}]
+    assert other._oereblex_source.calls == 2
+    # The records depend on the theme.
+    theme_source = create_source(code='ch.Planungszonen')
+    theme_source.document_records_from_oereblex(MockParameter(), 100, None)
+    assert theme_source._oereblex_source.calls == 1
+
+
+def test_without_geolink_cache():
+    DatabaseOEREBlexSource.init_geolink_cache(None)
+    assert DatabaseOEREBlexSource._geolink_cache_ is None
+    for i in range(2):
+        source = create_source()
+        source.document_records_from_oereblex(MockParameter(), 100, None)
+        assert source._oereblex_source.calls == 1
+
+
+@pytest.fixture
+def prefetch_executor():
+    DatabaseOEREBlexSource._prefetch_executor_ = ThreadPoolExecutor(max_workers=4)
+    yield DatabaseOEREBlexSource._prefetch_executor_
+    DatabaseOEREBlexSource._prefetch_executor_.shutdown()
+    DatabaseOEREBlexSource._prefetch_executor_ = None
+
+
+def test_prefetch_geolinks(prefetch_executor):
+    source = create_source(delay=0.2)
+    params = MockParameter()
+    start = time.time()
+    source.prefetch_geolinks(params, [1, 2, 3, 4, 2], None)
+    assert time.time() - start < 0.6
+    assert source._oereblex_source.calls == 4
+    for geolink in [1, 2, 3, 4]:
+        assert source.document_records_from_oereblex(params, geolink, None) == [
+            {'geolink': geolink, 'language': 'de'}
+        ]
+    source.prefetch_geolinks(params, [1, 5], None)
+    assert source._oereblex_source.calls == 5
+
+
+def test_prefetch_geolinks_timeout(prefetch_executor):
+    source = create_source(delay=0.5, timeout=0.1)
+    with pytest.raises(TimeoutError):
+        source.prefetch_geolinks(MockParameter(), [1, 2], None)
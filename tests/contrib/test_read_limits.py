@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import pytest
+from geoalchemy2.shape import from_shape
+from pyramid.httpexceptions import HTTPInternalServerError
+from shapely.geometry import Point
+
+from pyramid_oereb.contrib.data_sources import ReadLimits
+
+
+def test_read_limits():
+    geometry = from_shape(Point(0, 0), srid=2056)
+    limits = ReadLimits('ch.Nutzungsplanung', max_records=2, max_geometry_size=2 * len(geometry.data))
+    limits.add_records(2)
+    limits.add_geometry(geometry)
+    limits.add_geometry(None)
+    limits.add_geometry(geometry)
+    with pytest.raises(HTTPInternalServerError):
+        limits.add_geometry(geometry)
+    with pytest.raises(HTTPInternalServerError):
+        limits.add_records(1)
+
+
+def test_read_limits_unlimited():
+    limits = ReadLimits('ch.Nutzungsplanung')
+    limits.add_records(1000000)
+    limits.add_geometry(from_shape(Point(0, 0), srid=2056))
+    assert limits.records == 1000000
+    assert limits.geometry_size > 0
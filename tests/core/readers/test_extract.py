@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import time
+from concurrent.futures import TimeoutError
+
 import pytest
 from pyramid.path import DottedNameResolver
 from shapely.geometry import MultiPolygon, Polygon
@@ -68,3 +71,160 @@ def test_read(plr_sources, plr_cadastre_authority, real_estate, municipality):
     assert isinstance(plrs[0], PlrRecord)
     assert plrs[3].theme.code == 'ch.BaulinienNationalstrassen'
     assert plrs[3].law_status.code == 'inForce'
+
+
+class DummyPlrSource(object):
+
+    language_dependent_records = False
+
+    def __init__(self, code, delay=0):
+        self.info = {'code': code}
+        self.delay = delay
+        self.records = None
+        self.reads = 0
+
+    def read(self, params, real_estate, bbox):
+        time.sleep(self.delay)
+        self.reads += 1
+        self.records = [self.info.get('code')]
+
+    def get_data_integration_date(self):
+        return None
+
+
+@pytest.fixture
+def extract_config(monkeypatch):
+    from pyramid_oereb.core.config import Config
+
+    def set_config(plr_sources_config, plr_cache_config=None):
+        monkeypatch.setattr(Config, 'get_law_status_codes', lambda: [])
+        monkeypatch.setattr(Config, 'get_extract_config', lambda: {
+            'plr_sources': plr_sources_config,
+            'plr_cache': plr_cache_config
+        })
+    yield set_config
+
+
+@pytest.mark.parametrize('plr_sources_config', [
+    None,
+    {'max_workers': 1},
+    {'max_workers': 4, 'timeout': 5}
+])
+def test_read_plr_sources_order(extract_config, plr_sources_config):
+    from pyramid_oereb.core.readers.extract import ExtractReader
+
+    extract_config(plr_sources_config)
+    plr_sources = [
+        DummyPlrSource('ch.Nutzungsplanung', delay=0.2),
+        DummyPlrSource('ch.Planungszonen', delay=0.1),
+        DummyPlrSource('ch.Laermempfindlichkeitsstufen')
+    ]
+    reader = ExtractReader(plr_sources, None)
+    results = reader._read_plr_sources(plr_sources, MockParameter(), None, None)
+    assert results == [
+        ['ch.Nutzungsplanung'],
+        ['ch.Planungszonen'],
+        ['ch.Laermempfindlichkeitsstufen']
+    ]
+
+
+def test_read_plr_sources_timeout(extract_config):
+    from pyramid_oereb.core.readers.extract import ExtractReader
+
+    extract_config({'max_workers': 2, 'timeout': 0.1})
+    plr_sources = [
+        DummyPlrSource('ch.Nutzungsplanung'),
+        DummyPlrSource('ch.Planungszonen', delay=1)
+    ]
+    reader = ExtractReader(plr_sources, None)
+    with pytest.raises(TimeoutError):
+        reader._read_plr_sources(plr_sources, MockParameter(), None, None)
+
+
+def test_read_plr_sources_deadline(extract_config):
+    from pyramid_oereb.core.readers.extract import ExtractReader
+
+    extract_config({'max_workers': 2, 'timeout': 0.4})
+    # Each source finishes within the timeout, but not all of them within the timeout from their submission.
+    plr_sources = [
+        DummyPlrSource('ch.Nutzungsplanung', delay=0.3),
+        DummyPlrSource('ch.Planungszonen', delay=0.6)
+    ]
+    reader = ExtractReader(plr_sources, None)
+    with pytest.raises(TimeoutError):
+        reader._read_plr_sources(plr_sources, MockParameter(), None, None)
+
+
+def test_read_plr_sources_cached(extract_config, real_estate):
+    from pyramid_oereb.core.readers.extract import ExtractReader
+
+    extract_config(None, {'class': 'pyramid_oereb.core.cache.MemoryCache'})
+    plr_sources = [
+        DummyPlrSource('ch.Nutzungsplanung'),
+        DummyPlrSource('ch.Planungszonen')
+    ]
+    reader = ExtractReader(plr_sources, None)
+    params_fr = MockParameter()
+    params_fr.set_language('fr')
+    results = reader._read_plr_sources(plr_sources, MockParameter(), real_estate, None)
+    assert results == reader._read_plr_sources(plr_sources, params_fr, real_estate, None)
+    assert [plr_source.reads for plr_source in plr_sources] == [1, 1]
+
+
+def test_read_plr_sources_timings(extract_config):
+    from pyramid_oereb.core.readers.extract import ExtractReader
+    from pyramid_oereb.core.timing import Timings, bind_timings
+
+    extract_config({'max_workers': 2})
+    plr_sources = [
+        DummyPlrSource('ch.Nutzungsplanung'),
+        DummyPlrSource('ch.Planungszonen')
+    ]
+    reader = ExtractReader(plr_sources, None)
+    with bind_timings(Timings()) as timings:
+        reader._read_plr_sources(plr_sources, MockParameter(), None, None)
+    assert set(timings.as_dict().keys()) == {'ch.Nutzungsplanung', 'ch.Planungszonen'}
+
+
+class ProbedPlrSource(DummyPlrSource):
+
+    def __init__(self, code, db_connection, table, concerned):
+        super(ProbedPlrSource, self).__init__(code)
+        self.db_connection = db_connection
+        self.table = table
+        self.concerned = concerned
+
+    def get_probe(self, real_estate):
+        from sqlalchemy import select
+        if self.db_connection is None:
+            return None
+        return self.db_connection, select(self.table.c.id).where(self.table.c.id == self.concerned).exists()
+
+
+def test_probe_plr_sources(monkeypatch):
+    import pyramid_oereb
+    from sqlalchemy import Column, Integer, MetaData, Table, create_engine
+    from sqlalchemy.orm import sessionmaker
+    from pyramid_oereb.core.readers.extract import ExtractReader
+
+    engine = create_engine('sqlite://')
+    table = Table('geometry', MetaData(), Column('id', Integer, primary_key=True))
+    table.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(table.insert().values(id=1))
+    statements = []
+
+    class Adapter(object):
+        def get_session(self, key):
+            statements.append(key)
+            return sessionmaker(bind=engine)()
+
+    monkeypatch.setattr(pyramid_oereb, 'database_adapter', Adapter())
+    plr_sources = [
+        ProbedPlrSource('ch.Nutzungsplanung', 'db', table, 1),
+        ProbedPlrSource('ch.Planungszonen', 'db', table, 2),
+        ProbedPlrSource('ch.Laermempfindlichkeitsstufen', None, table, 2)
+    ]
+    not_concerned = ExtractReader._probe_plr_sources(plr_sources, None)
+    assert not_concerned == {plr_sources[1]}
+    assert statements == ['db']
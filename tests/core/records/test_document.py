@@ -70,6 +70,22 @@ def test_past_document():
     assert not record.published
 
 
+def test_published_at():
+    office_record = OfficeRecord({'en': 'name'})
+    law_status = LawStatusRecord(u'inKraft', {u'de': u'Rechtskräftig'})
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    record = DocumentRecord(
+        DocumentTypeRecord('Hinweis', {'de': 'Hinweis'}),
+        1, law_status, {'en': 'title'}, office_record,
+        datetime.datetime.combine(tomorrow, datetime.time(12, 0)),
+        text_at_web={'en': 'http://my.document.com'}
+    )
+    assert not record.published
+    assert not record.published_at(datetime.date.today())
+    # Publication dates with time are compared by their date, like in the database filters.
+    assert record.published_at(tomorrow)
+
+
 def test_legal_provision():
     office_record = OfficeRecord({'en': 'name'})
     law_status = Config.get_law_status_by_law_status_code(u'inKraft')
@@ -310,3 +310,37 @@ def test_published(published_from, published_until, published):
         'test'
     )
     assert geometry_record.published == published
+
+
+def test_published_at():
+    geometry_record = GeometryRecord(
+        LawStatusRecord("inKraft", {u'de': u'BlaBla'}),
+        date.today() + timedelta(days=1),
+        None,
+        Polygon([(0, 0), (0, 10), (10, 10), (10, 0)]),
+        'test'
+    )
+    real_estate = RealEstateRecord('Liegenschaft', 'BL', 'Aesch BL', 2761, 100,
+                                   Polygon([(0, 0), (0, 10), (10, 10), (10, 0)]))
+    assert not geometry_record.published
+    assert not geometry_record.published_at(date.today())
+    assert geometry_record.published_at(date.today() + timedelta(days=1))
+    # The geometry is calculated for the date of the extract, not for today.
+    assert geometry_record.calculate(real_estate, 1.0, 1.0, 'm', 'm2', date.today() + timedelta(days=1))
+
+
+def test_set_shares():
+    geometry_record = GeometryRecord(
+        LawStatusRecord("inKraft", {u'de': u'BlaBla'}),
+        datetime.date(1985, 8, 29),
+        None,
+        Polygon([(0, 0), (0, 10), (10, 10), (10, 0)]),
+        'test'
+    )
+    real_estate = RealEstateRecord('Liegenschaft', 'BL', 'Aesch BL', 2761, 100,
+                                   Polygon([(20, 20), (20, 30), (30, 30), (30, 20)]))
+    geometry_record.set_shares(area_share=42.0, units='m2')
+    assert geometry_record.calculate(real_estate, 1.0, 1.0, 'm', 'm2')
+    assert geometry_record.area_share == 42.0
+    assert geometry_record.length_share is None
+    assert geometry_record.nr_of_points is None
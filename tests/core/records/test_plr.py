@@ -6,6 +6,7 @@ from shapely.geometry import Point
 
 from pyramid_oereb.core.records.geometry import GeometryRecord
 from pyramid_oereb.core.records.image import ImageRecord
+from pyramid_oereb.core.records.law_status import LawStatusRecord
 from pyramid_oereb.core.records.office import OfficeRecord
 from pyramid_oereb.core.records.plr import PlrRecord
 from pyramid_oereb.core.records.theme import ThemeRecord
@@ -79,3 +80,29 @@ def test_published(published_from, published_until, published):
         ViewServiceRecord({'de': 'http://my.wms.com'}, 1, 1.0),
         [GeometryRecord(law_status, datetime.date.today(), None, Point(1, 1))])
     assert plr_record.published == published
+
+
+def test_published_at():
+    law_status = LawStatusRecord(u'inKraft', {u'de': u'Rechtskräftig'})
+    theme = ThemeRecord('code', dict(), 100)
+    tomorrow = date.today() + timedelta(days=1)
+    plr_record = PlrRecord(
+        theme,
+        LegendEntryRecord(
+            ImageRecord('1'.encode('utf-8')),
+            {'en': 'Content'},
+            'CodeA',
+            None,
+            theme,
+            view_service_id=1
+        ),
+        law_status,
+        tomorrow,
+        None,
+        OfficeRecord({'en': 'Office'}),
+        ImageRecord('1'.encode('utf-8')),
+        ViewServiceRecord({'de': 'http://my.wms.com'}, 1, 1.0),
+        [GeometryRecord(law_status, tomorrow, None, Point(1, 1))])
+    assert not plr_record.published
+    assert not plr_record.published_at(date.today())
+    assert plr_record.published_at(tomorrow)
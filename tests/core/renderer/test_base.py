@@ -9,6 +9,7 @@ from pyramid.testing import DummyRequest
 
 from pyramid_oereb.core.adapter import FileAdapter
 from pyramid_oereb.core.config import Config
+from pyramid_oereb.core.records.glossary import GlossaryRecord
 from pyramid_oereb.core.records.image import ImageRecord
 from pyramid_oereb.core.records.theme import ThemeRecord
 from pyramid_oereb.core.records.view_service import LegendEntryRecord
@@ -204,3 +205,27 @@ def test_get_symbol_ref(theme_code):
             record.view_service_id,
             record.type_code
         )
+
+
+def test_get_static_fragment(DummyRenderInfo):
+    renderer = Renderer(DummyRenderInfo())
+    glossaries = [GlossaryRecord({'de': u'Zeta', 'fr': u'Alpha'}, {'de': u'Test'}),
+                  GlossaryRecord({'de': u'Alpha', 'fr': u'Zeta'}, {'de': u'Test'})]
+    builds = []
+
+    def build():
+        builds.append(renderer._language)
+        return renderer.format_glossaries(glossaries)
+
+    renderer._language = 'de'
+    fragment = renderer.get_static_fragment('Glossary', (glossaries,), build)
+    assert [gls['Title'][0]['Text'] for gls in fragment] == [u'Alpha', u'Zeta']
+    assert renderer.get_static_fragment('Glossary', (glossaries,), build) is fragment
+    renderer._language = 'fr'
+    fragment_fr = renderer.get_static_fragment('Glossary', (glossaries,), build)
+    assert [gls['Title'][0]['Text'] for gls in fragment_fr] == [u'Alpha', u'Zeta']
+    assert builds == ['de', 'fr']
+    # A reloaded list of records is rendered again
+    glossaries = list(glossaries)
+    renderer.get_static_fragment('Glossary', (glossaries,), build)
+    assert builds == ['de', 'fr', 'fr']
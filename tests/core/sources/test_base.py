@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from pyramid_oereb.core.sources import Base
+
+
+def test_records_default():
+    source = Base()
+    assert source.records == []
+    source.records.append('record')
+    assert source.records == ['record']
+
+
+def test_records_per_instance():
+    source_1 = Base()
+    source_2 = Base()
+    source_1.records = ['record']
+    assert source_2.records == []
+
+
+def test_records_per_thread():
+    source = Base()
+    source.records = ['main']
+    thread_records = []
+
+    def read():
+        source.records = ['thread']
+        thread_records.extend(source.records)
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    thread.join()
+    assert thread_records == ['thread']
+    assert source.records == ['main']
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+import datetime
+import time
+
+import pytest
+from shapely.geometry import MultiPolygon, Polygon
+
+from pyramid_oereb.core.cache import MemoryCache, DiskCache, ExtractCache, PlrRecordCache, \
+    SourceRecordCache, TieredCache, create_cache
+from pyramid_oereb.core.config import Config
+from pyramid_oereb.core.records.extract import ExtractRecord
+from pyramid_oereb.core.records.office import OfficeRecord
+from pyramid_oereb.core.records.real_estate import RealEstateRecord
+from pyramid_oereb.core.views.webservice import Parameter
+from tests.mockrequest import MockParameter
+
+
+class DummyPlrSource(object):
+
+    language_dependent_records = False
+
+    def __init__(self, date, code='ch.Nutzungsplanung'):
+        self.info = {'code': code}
+        self.date = date
+        self.calls = 0
+
+    def get_data_integration_date(self):
+        self.calls += 1
+        return self.date
+
+
+@pytest.fixture
+def real_estate():
+    yield RealEstateRecord(u'test', u'BL', u'Laufen', 2770, 1000,
+                           MultiPolygon([Polygon([(0, 0), (4, 4), (4, 0)])]), None, egrid=u'CH1234')
+
+
+@pytest.fixture
+def extract_data_version(monkeypatch):
+    version = {'value': '1'}
+    monkeypatch.setattr(Config, 'get_extract_data_version', lambda: version['value'])
+    yield version
+
+
+def test_memory_cache():
+    cache = MemoryCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+    cache.clear()
+    assert cache.get('a', 'default') == 'default'
+
+
+def test_memory_cache_ttl():
+    cache = MemoryCache(ttl=0.05)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    time.sleep(0.1)
+    assert cache.get('a') is None
+
+
+def test_disk_cache(tmpdir):
+    cache = DiskCache(str(tmpdir), ttl=0.1)
+    cache.set('a', {'content': b'1'})
+    assert cache.get('a') == {'content': b'1'}
+    assert DiskCache(str(tmpdir)).get('a') == {'content': b'1'}
+    time.sleep(0.15)
+    assert cache.get('a') is None
+    cache.set('b', 2)
+    cache.clear()
+    assert cache.get('b') is None
+
+
+def test_tiered_cache(tmpdir):
+    shared = DiskCache(str(tmpdir))
+    cache = TieredCache(MemoryCache(), shared)
+    cache.set('a', 1)
+    assert shared.get('a') == 1
+    other = TieredCache(MemoryCache(), shared)
+    assert other.get('a') == 1
+    shared.clear()
+    assert other.get('a') == 1
+    assert other.get('b', 'default') == 'default'
+    assert TieredCache(MemoryCache()).get('a') is None
+
+
+def test_create_cache():
+    assert create_cache(None) is None
+    cache = create_cache({
+        'class': 'pyramid_oereb.core.cache.MemoryCache',
+        'params': {'max_size': 10}
+    })
+    assert isinstance(cache, MemoryCache)
+
+
+def test_extract_cache_key(real_estate, extract_data_version):
+    plr_source = DummyPlrSource(datetime.datetime(2021, 1, 1))
+    extract_cache = ExtractCache(MemoryCache(), [plr_source], data_check_interval=60)
+    key = extract_cache.get_key(MockParameter(), real_estate, 'http://example.com')
+    assert key == extract_cache.get_key(MockParameter(), real_estate, 'http://example.com')
+    assert plr_source.calls == 1
+    assert key != extract_cache.get_key(MockParameter(), real_estate, 'http://other.com')
+    params = MockParameter()
+    params.set_language('fr')
+    assert key != extract_cache.get_key(params, real_estate, 'http://example.com')
+    params = Parameter('JSON', with_geometry=False, images=False, as_of_date=datetime.date(2021, 1, 1))
+    assert key != extract_cache.get_key(params, real_estate, 'http://example.com')
+    # A reload of the municipalities, disclaimers and glossary changes the key.
+    extract_data_version['value'] = '2'
+    assert key != extract_cache.get_key(MockParameter(), real_estate, 'http://example.com')
+    extract_data_version['value'] = '1'
+    # A changed real estate changes the key.
+    real_estate.limit = MultiPolygon([Polygon([(0, 0), (4, 4), (5, 0)])])
+    assert key != extract_cache.get_key(MockParameter(), real_estate, 'http://example.com')
+
+
+def test_extract_cache_reissue(real_estate):
+    extract = ExtractRecord(real_estate, None, None, None, None, OfficeRecord({'de': u'AGI'}),
+                            datetime.datetime(2021, 1, 1))
+    extract_cache = ExtractCache(MemoryCache(), [])
+    extract_cache.set('key', extract)
+    identifier = extract.extract_identifier
+    cached = extract_cache.get('key')
+    assert cached is not extract
+    # The records are shared, so the renderers can reuse the parts built from them.
+    assert cached.real_estate is extract.real_estate
+    assert cached.disclaimers is extract.disclaimers
+    # The cached extract is delivered as a new extract.
+    assert cached.extract_identifier != identifier
+    assert extract.extract_identifier == identifier
+    assert cached.creation_date >= extract.creation_date
+    assert extract_cache.get('key').extract_identifier != cached.extract_identifier
+    assert extract_cache.get('other') is None
+
+
+def test_extract_cache_data_version():
+    plr_source = DummyPlrSource(datetime.datetime(2021, 1, 1))
+    extract_cache = ExtractCache(
+        MemoryCache(),
+        [plr_source, DummyPlrSource(None, code='ch.Planungszonen')],
+        data_check_interval=0
+    )
+    version = extract_cache.get_data_version()
+    assert version == extract_cache.get_data_version()
+    plr_source.date = datetime.datetime(2021, 2, 1)
+    assert version != extract_cache.get_data_version()
+
+
+def test_plr_record_cache_key(real_estate):
+    plr_source1 = DummyPlrSource(datetime.datetime(2021, 1, 1))
+    plr_source2 = DummyPlrSource(datetime.datetime(2021, 1, 1), code='ch.Planungszonen')
+    plr_cache = PlrRecordCache(MemoryCache(), data_check_interval=0)
+    params_fr = MockParameter()
+    params_fr.set_language('fr')
+    key1 = plr_cache.get_key(plr_source1, MockParameter(), real_estate)
+    key2 = plr_cache.get_key(plr_source2, MockParameter(), real_estate)
+    assert key1 != key2
+    assert key1 == plr_cache.get_key(plr_source1, params_fr, real_estate)
+    plr_source1.language_dependent_records = True
+    assert key1 != plr_cache.get_key(plr_source1, params_fr, real_estate)
+    plr_source1.language_dependent_records = False
+    params_tomorrow = Parameter('JSON', as_of_date=datetime.date.today() + datetime.timedelta(days=1))
+    assert key1 != plr_cache.get_key(plr_source1, params_tomorrow, real_estate)
+    plr_source1.date = datetime.datetime(2021, 2, 1)
+    assert key1 != plr_cache.get_key(plr_source1, MockParameter(), real_estate)
+    assert key2 == plr_cache.get_key(plr_source2, MockParameter(), real_estate)
+
+
+def test_plr_record_cache_real_estate_limit(real_estate):
+    plr_source = DummyPlrSource(datetime.datetime(2021, 1, 1))
+    plr_cache = PlrRecordCache(MemoryCache(), data_check_interval=60)
+    plr_cache.set(plr_cache.get_key(plr_source, MockParameter(), real_estate), [{'code': 'a'}])
+    assert plr_cache.get(plr_cache.get_key(plr_source, MockParameter(), real_estate)) == [{'code': 'a'}]
+    # The records calculated on the previous limit are not used for the updated real estate.
+    real_estate.limit = MultiPolygon([Polygon([(0, 0), (4, 4), (5, 0)])])
+    assert plr_cache.get(plr_cache.get_key(plr_source, MockParameter(), real_estate)) is None
+
+
+def test_plr_record_cache_copy():
+    plr_cache = PlrRecordCache(MemoryCache())
+    records = [{'code': 'a'}]
+    plr_cache.set('key', records)
+    records[0]['code'] = 'b'
+    cached = plr_cache.get('key')
+    assert cached == [{'code': 'a'}]
+    cached[0]['code'] = 'c'
+    assert plr_cache.get('key') == [{'code': 'a'}]
+    assert plr_cache.get('other') is None
+
+
+def test_source_record_cache():
+    plr_source = DummyPlrSource(datetime.datetime(2021, 1, 1))
+    record_cache = SourceRecordCache(data_check_interval=0)
+    record_cache.validate(plr_source)
+    record = record_cache.get(1, lambda: {'id': 1})
+    assert record_cache.get(1, lambda: {'id': 2}) is record
+    assert 1 in record_cache
+    record_cache.validate(plr_source)
+    assert len(record_cache) == 1
+    plr_source.date = datetime.datetime(2021, 2, 1)
+    record_cache.validate(plr_source)
+    assert len(record_cache) == 0
+    assert record_cache.get(1, lambda: {'id': 2}) == {'id': 2}
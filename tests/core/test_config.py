@@ -2,9 +2,11 @@
 import pytest
 
 from pyramid.config import ConfigurationError
+from sqlalchemy.exc import ProgrammingError
 
 # from pyramid_oereb.core.adapter import FileAdapter
 from pyramid_oereb.core.config import Config
+from pyramid_oereb.core.records.municipality import MunicipalityRecord
 from pyramid_oereb.core.records.office import OfficeRecord
 
 
@@ -122,3 +124,63 @@ def test_get_real_estate_main_page_config():
         'https://wms.ch/?BBOX=2475000,1065000,2850000,1300000'
     assert plan_for_land_register_main_page_config.get('layer_index') == 2
     assert plan_for_land_register_main_page_config.get('layer_opacity') == 0.5
+
+
+def test_extract_data_refresh(monkeypatch):
+    reads = []
+
+    def read_municipalities():
+        reads.append('municipalities')
+        return [MunicipalityRecord(2770, u'Laufen', True), MunicipalityRecord(2829, u'Liestal', True)]
+
+    monkeypatch.setattr(Config, '_config', {'extract_data_refresh_interval': 60})
+    monkeypatch.setattr(Config, '_extract_data_loaded', None)
+    monkeypatch.setattr(Config, '_read_municipalities', read_municipalities)
+    monkeypatch.setattr(Config, '_read_disclaimers', lambda: [])
+    monkeypatch.setattr(Config, '_read_glossaries', lambda: [])
+    monkeypatch.setattr(Config, 'municipalities', None)
+    monkeypatch.setattr(Config, '_municipalities_by_fosnr', dict())
+
+    assert Config.get_municipality_by_fosnr(2829).name == u'Liestal'
+    assert Config.get_municipality_by_fosnr('2829').name == u'Liestal'
+    assert Config.get_municipality_by_fosnr(1234) is None
+    assert Config.get_municipality_by_fosnr(None) is None
+    assert len(Config.get_municipalities()) == 2
+    assert Config.get_disclaimers() == []
+    assert reads == ['municipalities']
+
+    Config.refresh_extract_data(force=True)
+    assert reads == ['municipalities', 'municipalities']
+
+    monkeypatch.setattr(Config, '_extract_data_loaded', Config._extract_data_loaded - 61)
+    version = str(Config._extract_data_loaded)
+    assert Config.get_extract_data_version() != version
+    assert reads == ['municipalities', 'municipalities', 'municipalities']
+    assert Config.get_extract_data_version() == Config.get_extract_data_version()
+    Config.get_glossaries()
+    assert reads == ['municipalities', 'municipalities', 'municipalities']
+
+
+def test_extract_data_reload_after_error(monkeypatch):
+    reads = []
+
+    def read_municipalities():
+        reads.append('municipalities')
+        if len(reads) == 1:
+            raise ProgrammingError('SELECT', {}, Exception('relation does not exist'))
+        return [MunicipalityRecord(2770, u'Laufen', True)]
+
+    monkeypatch.setattr(Config, '_config', {})
+    monkeypatch.setattr(Config, '_extract_data_loaded', None)
+    monkeypatch.setattr(Config, '_read_municipalities', read_municipalities)
+    monkeypatch.setattr(Config, '_read_disclaimers', lambda: [])
+    monkeypatch.setattr(Config, '_read_glossaries', lambda: [])
+    monkeypatch.setattr(Config, 'municipalities', None)
+    monkeypatch.setattr(Config, '_municipalities_by_fosnr', dict())
+
+    Config.init_extract_data()
+    assert Config.municipalities is None
+    # The municipalities could not be read at startup, they are read again without refresh interval.
+    assert Config.get_municipality_by_fosnr(2770).name == u'Laufen'
+    assert len(Config.get_municipalities()) == 1
+    assert reads == ['municipalities', 'municipalities']
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 import datetime
 import pytest
+import requests_mock
 from shapely.geometry import Point
 
-from pyramid_oereb.core.processor import Processor, create_processor
+from pyramid_oereb.core.config import Config
+from pyramid_oereb.core.processor import Processor, create_processor, get_processor, init_processor
 from pyramid_oereb.core.records.extract import ExtractRecord
 from pyramid_oereb.core.records.geometry import GeometryRecord
 from pyramid_oereb.core.records.image import ImageRecord
@@ -12,10 +14,7 @@ from pyramid_oereb.core.records.plr import PlrRecord
 from pyramid_oereb.core.records.theme import ThemeRecord
 from pyramid_oereb.core.records.law_status import LawStatusRecord
 from pyramid_oereb.core.records.view_service import ViewServiceRecord, LegendEntryRecord
-from pyramid_oereb.core.readers.disclaimer import DisclaimerReader
 from pyramid_oereb.core.readers.extract import ExtractReader
-from pyramid_oereb.core.readers.glossary import GlossaryReader
-from pyramid_oereb.core.readers.municipality import MunicipalityReader
 from pyramid_oereb.core.readers.real_estate import RealEstateReader
 from pyramid_oereb.core.views.webservice import PlrWebservice
 from tests.mockrequest import MockRequest
@@ -40,13 +39,44 @@ def test_missing_params():
 def test_properties():
     processor = create_processor()
     assert isinstance(processor.extract_reader, ExtractReader)
-    assert isinstance(processor.municipality_reader, MunicipalityReader)
-    assert isinstance(processor.disclaimer_reader, DisclaimerReader)
-    assert isinstance(processor.glossary_reader, GlossaryReader)
     assert isinstance(processor.plr_sources, list)
     assert isinstance(processor.real_estate_reader, RealEstateReader)
 
 
+def test_get_processor():
+    processor = get_processor()
+    assert isinstance(processor, Processor)
+    assert get_processor() is processor
+
+
+class DummyProcessor(object):
+
+    def __init__(self):
+        self.shut_down = False
+
+    def shutdown(self):
+        self.shut_down = True
+
+
+def test_get_processor_per_process(monkeypatch):
+    monkeypatch.setattr('pyramid_oereb.core.processor.create_processor', DummyProcessor)
+    monkeypatch.setattr('pyramid_oereb.core.processor._processor', None)
+    monkeypatch.setattr('pyramid_oereb.core.processor._processor_pid', None)
+    processor = get_processor()
+    assert get_processor() is processor
+    # A replaced processor is shut down.
+    replaced = init_processor()
+    assert replaced is not processor
+    assert processor.shut_down
+    assert get_processor() is replaced
+    # A forked process creates its own processor.
+    monkeypatch.setattr('pyramid_oereb.core.processor.os.getpid', lambda: -1)
+    forked = get_processor()
+    assert forked is not replaced
+    assert not replaced.shut_down
+    assert get_processor() is forked
+
+
 def test_process():
     request = MockRequest()
     request.matchdict.update(request_matchdict)
@@ -275,3 +305,57 @@ def test_processor_sort_by_law_status():
     assert plrs[1].law_status.code == 'changeWithoutPreEffect'
     assert plrs[2].theme.code == 'ch.BaulinienNationalstrassen'
     assert plrs[2].law_status.code == 'inForce'
+
+
+@pytest.mark.parametrize('wms_download', [None, {'max_workers': 4, 'max_connections_per_host': 2}])
+def test_processor_download_images(wms_download, monkeypatch):
+    monkeypatch.setattr(Config, '_config', {'default_language': 'de', 'wms_download': wms_download})
+    processor = Processor(None, [], None)
+    view_service1 = ViewServiceRecord({'de': 'http://my.wms.com/1'}, 1, 1.0)
+    view_service2 = ViewServiceRecord({'de': 'http://my.wms.com/2'}, 1, 1.0)
+    view_service3 = ViewServiceRecord({'de': 'http://my.wms.com/1'}, 1, 1.0)
+    with requests_mock.mock() as m:
+        m.get('http://my.wms.com/1', content=b'1', headers={'content-type': 'image/png'})
+        m.get('http://my.wms.com/2', content=b'2', headers={'content-type': 'image/png'})
+        Processor.download_images(
+            [view_service1, view_service2, view_service3],
+            'fr',
+            processor._wms_executor_
+        )
+        assert m.call_count == 2
+    assert view_service1.image['de'].content == b'1'
+    assert view_service2.image['de'].content == b'2'
+    assert view_service3.image['de'] is view_service1.image['de']
+
+
+@pytest.mark.parametrize('wms_download', [None, {'max_workers': 4}])
+def test_processor_download_images_error(wms_download, monkeypatch):
+    monkeypatch.setattr(Config, '_config', {'default_language': 'de', 'wms_download': wms_download})
+    processor = Processor(None, [], None)
+    view_services = [
+        ViewServiceRecord({'de': 'http://my.wms.com/1'}, 1, 1.0),
+        ViewServiceRecord({'de': 'http://my.wms.com/2'}, 1, 1.0),
+        ViewServiceRecord({'de': 'not a url'}, 1, 1.0)
+    ]
+    with requests_mock.mock() as m:
+        m.get('http://my.wms.com/1', content=b'1', headers={'content-type': 'image/png'})
+        m.get('http://my.wms.com/2', status_code=500, content=b'error')
+        with pytest.raises(LookupError):
+            Processor.download_images(view_services, 'de', processor._wms_executor_)
+
+
+class DummyExtractReader(object):
+
+    def shutdown(self):
+        pass
+
+
+def test_processor_wms_pool(monkeypatch):
+    monkeypatch.setattr(Config, '_config', {'wms_download': {'max_workers': 2}})
+    processor = Processor(None, [], DummyExtractReader())
+    executor = processor._wms_executor_
+    assert executor._max_workers == 2
+    processor.shutdown()
+    assert executor._shutdown
+    monkeypatch.setattr(Config, '_config', {})
+    assert Processor(None, [], None)._wms_executor_ is None
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+import os
+import pstats
+
+import pytest
+
+from pyramid_oereb.core.profiling import is_profiling_requested, profile_call
+from tests.mockrequest import MockRequest
+
+
+@pytest.mark.parametrize('profiling_config,headers,params,requested', [
+    (None, {'X-Oereb-Profile': 'secret'}, {}, False),
+    ({'enabled': False, 'secret': 'secret', 'path': '/tmp'}, {'X-Oereb-Profile': 'secret'}, {}, False),
+    ({'enabled': True, 'path': '/tmp'}, {'X-Oereb-Profile': 'secret'}, {}, False),
+    ({'enabled': True, 'secret': 'secret', 'path': '/tmp'}, {}, {}, False),
+    ({'enabled': True, 'secret': 'secret', 'path': '/tmp'}, {'X-Oereb-Profile': 'wrong'}, {}, False),
+    ({'enabled': True, 'secret': 'secret', 'path': '/tmp'}, {'X-Oereb-Profile': 'secret'}, {}, True),
+    ({'enabled': True, 'secret': 'secret', 'path': '/tmp'}, {}, {'profile': 'secret'}, True)
+])
+def test_is_profiling_requested(profiling_config, headers, params, requested):
+    request = MockRequest()
+    request.headers.update(headers)
+    request.params.update(params)
+    assert is_profiling_requested(request, profiling_config) == requested
+
+
+def test_profile_call(tmpdir):
+    path = str(tmpdir.join('profiles'))
+    assert profile_call(lambda: sum(range(10)), path, 'CH1234/56_json') == 45
+    files = os.listdir(path)
+    assert len(files) == 1
+    assert files[0].startswith('CH1234_56_json_')
+    assert files[0].endswith('.pstats')
+    pstats.Stats(os.path.join(path, files[0]))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from pyramid_oereb.core.timing import NoTimings, Timings, bind_timings, get_timings
+
+
+def test_no_timings():
+    timings = get_timings()
+    assert isinstance(timings, NoTimings)
+    assert not timings.enabled
+    with timings.measure('stage'):
+        pass
+    assert timings.as_dict() == {}
+    assert timings.get_server_timing() == ''
+
+
+def test_timings():
+    timings = Timings()
+    timings.add('plr', 0.1)
+    timings.add('plr', 0.05)
+    timings.add('ch.Nutzungsplanung', 0.2)
+    with timings.measure('render'):
+        pass
+    durations = timings.as_dict()
+    assert durations['plr'] == 150.0
+    assert durations['ch.Nutzungsplanung'] == 200.0
+    assert 'render' in durations
+    assert timings.get_server_timing().startswith('plr;dur=150.0, ch.Nutzungsplanung;dur=200.0, render;dur=')
+
+
+def test_bind_timings():
+    timings = Timings()
+    with bind_timings(timings):
+        assert get_timings() is timings
+
+        def measure():
+            assert isinstance(get_timings(), NoTimings)
+            with bind_timings(timings):
+                with get_timings().measure('thread'):
+                    pass
+
+        thread = threading.Thread(target=measure)
+        thread.start()
+        thread.join()
+    assert isinstance(get_timings(), NoTimings)
+    assert [name for name, _ in timings.entries] == ['thread']
@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
+import io
 import json
 import logging
+import time
+import zipfile
+
 import pytest
 from jsonschema import Draft4Validator
 from pyramid.httpexceptions import HTTPBadRequest, HTTPFound, HTTPNoContent
 
-from tests.mockrequest import MockRequest
+from tests.mockrequest import MockParameter, MockRequest
 from pyramid_oereb.core.views.webservice import PlrWebservice
 
 log = logging.getLogger('pyramid_oereb')
@@ -236,3 +240,110 @@ def test_format_url():
     response = service.get_extract_by_id()
     assert isinstance(response, HTTPFound)
     assert response.location == 'https://geoview.bl.ch/oereb/?egrid=TEST'
+
+
+@pytest.mark.parametrize('matchdict,params', [
+    ({'format': 'pdf'}, {'EGRID': 'egrid1,egrid2'}),
+    ({'format': 'json'}, {'IDENTDN': 'identdn', 'NUMBER': '1000'}),
+    ({'format': 'json'}, {'EGRID': ','.join(['egrid{0}'.format(i) for i in range(501)])})
+])
+def test_batch_invalid_params(matchdict, params):
+    request = MockRequest()
+    request.matchdict.update(matchdict)
+    request.params.update(params)
+    service = PlrWebservice(request)
+    response = service.get_extract_batch()
+    assert isinstance(response, HTTPBadRequest)
+
+
+def test_batch_ndjson_errors():
+    service = PlrWebservice(MockRequest())
+    results = [('egrid1', None, None, 'No real estate found')]
+    lines = list(service.__ndjson_batch__(iter(results)))
+    assert [json.loads(line) for line in lines] == [{'egrid': 'egrid1', 'error': 'No real estate found'}]
+
+
+def test_batch_zip_errors():
+    service = PlrWebservice(MockRequest())
+    results = [
+        ('egrid1', None, None, 'No real estate found'),
+        ('../egrid2', None, None, 'No real estate found')
+    ]
+    content = b''.join(service.__zip_batch__(iter(results)))
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        assert archive.namelist() == ['egrid1.error.txt', '.._egrid2.error.txt']
+        assert archive.read('egrid1.error.txt') == b'No real estate found'
+
+
+class DummyRealEstateReader(object):
+
+    def read(self, params, egrid=None):
+        if egrid == 'missing':
+            return []
+        return [egrid]
+
+
+class DummyProcessor(object):
+
+    def __init__(self):
+        self.real_estate_reader = DummyRealEstateReader()
+        self.processed = []
+
+    def process(self, real_estate, params, sld_url):
+        self.processed.append(real_estate)
+        return {'real_estate': real_estate}
+
+
+@pytest.fixture
+def batch_processor(monkeypatch):
+    processor = DummyProcessor()
+    monkeypatch.setattr('pyramid_oereb.core.views.webservice.get_processor', lambda: processor)
+    monkeypatch.setattr(
+        PlrWebservice,
+        '__render_batch_extract__',
+        lambda self, extract, params: json.dumps({'GetExtractByIdResponse': extract})
+    )
+    yield processor
+
+
+def create_batch_request(extract_format, params):
+    request = MockRequest()
+    request.route_url = lambda *args, **kwargs: 'http://example.com/sld'
+    request.matchdict.update({'format': extract_format})
+    request.params.update(params)
+    return request
+
+
+def test_batch_ndjson(batch_processor):
+    service = PlrWebservice(create_batch_request('json', {'EGRID': 'egrid1,egrid2,missing,egrid1'}))
+    response = service.get_extract_batch()
+    assert response.content_type == 'application/x-ndjson'
+    lines = [json.loads(line) for line in b''.join(response.app_iter).splitlines()]
+    assert sorted(lines, key=lambda line: line['egrid']) == [
+        {'egrid': 'egrid1', 'response': {'GetExtractByIdResponse': {'real_estate': 'egrid1'}}},
+        {'egrid': 'egrid2', 'response': {'GetExtractByIdResponse': {'real_estate': 'egrid2'}}},
+        {'egrid': 'missing', 'error': 'No real estate found'}
+    ]
+    assert sorted(batch_processor.processed) == ['egrid1', 'egrid2']
+
+
+def test_batch_zip(batch_processor):
+    service = PlrWebservice(create_batch_request('json', {'EGRID': 'egrid1,egrid2,missing', 'ZIP': 'true'}))
+    response = service.get_extract_batch()
+    assert response.content_type == 'application/zip'
+    with zipfile.ZipFile(io.BytesIO(b''.join(response.app_iter))) as archive:
+        assert sorted(archive.namelist()) == ['egrid1.json', 'egrid2.json', 'missing.error.txt']
+        extract = json.loads(archive.read('egrid2.json'))
+        assert extract == {'GetExtractByIdResponse': {'real_estate': 'egrid2'}}
+
+
+def test_batch_bounded(batch_processor):
+    service = PlrWebservice(create_batch_request('json', {}))
+    egrids = ['egrid{0}'.format(i) for i in range(10)]
+    results = service.__process_batch__(MockParameter(), egrids, 2)
+    next(results)
+    time.sleep(0.1)
+    # Only one extract is started for each streamed one, the others wait for the client.
+    assert len(batch_processor.processed) <= 3
+    assert len(list(results)) == 9
+    assert sorted(batch_processor.processed) == egrids
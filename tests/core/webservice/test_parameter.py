@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import datetime
 
 from pyramid_oereb.core.views.webservice import Parameter
 
@@ -19,3 +20,9 @@ def test_parameter():
     assert params.egrid == 'EGRID'
     assert params.language == 'de'
     assert params.topics == ['topic1', 'topic2']
+    assert params.as_of_date == datetime.date.today()
+
+
+def test_parameter_as_of_date():
+    params = Parameter('json', as_of_date=datetime.date(2021, 1, 1))
+    assert params.as_of_date == datetime.date(2021, 1, 1)